@@ -0,0 +1,1113 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Async Backend API Testing
+asyncio/aiohttp variant of OKUTransportAPITester with the same test methods and
+log_test reporting, plus a virtual-user mode that runs the suite scenarios as
+thousands of concurrent users from one process
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from backend_test import OKUTransportAPITester, endpoint_key, latency_stats, percentile
+from metrics import MetricsRegistry, add_metrics_arguments, export_metrics
+from traffic_log import TrafficRecorder
+
+# Mirrors the urllib3 Retry policy of the sync tester
+RETRY_STATUSES = (502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'PUT', 'OPTIONS')
+
+# Per-user journey for virtual-user mode (infrastructure checks run once, not per user).
+# A registered driver stays pending, so each user's admin approves it before the driver tests
+VIRTUAL_USER_SCENARIO = [
+    'test_user_registration',
+    'test_user_login',
+    'approve_registered_driver',
+    'test_protected_profile_route',
+    'test_driver_profile_apis',
+    'test_assignment_system',
+    'test_booking_system',
+    'test_driver_schedule',
+    'test_gps_tracking'
+]
+
+class AsyncResponse:
+    """Fully read aiohttp response exposing the parts of requests.Response the tests use"""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+class AsyncOKUTransportAPITester(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", http_session=None, pool_size=100, retries=3, backoff_factor=0.3):
+        super().__init__(base_url, pool_size, retries, backoff_factor)
+        self.http = http_session
+        self.owns_http = http_session is None
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        # Concurrent tests share one thread, so track timings per asyncio task
+        self.task_timings = contextvars.ContextVar(f"pending_timings_{id(self)}", default=None)
+
+    def create_session(self, pool_size, retries, backoff_factor):
+        """The async tester uses an aiohttp session opened inside the event loop"""
+        return None
+
+    async def open(self):
+        """Open the shared aiohttp session if one was not supplied"""
+        if self.http is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.http = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+
+    async def close(self):
+        if self.owns_http and self.http is not None:
+            await self.http.close()
+
+    def pending_timings(self):
+        """Return the request timings recorded by the current asyncio task"""
+        timings = self.task_timings.get()
+        if timings is None:
+            timings = []
+            self.task_timings.set(timings)
+        return timings
+
+    async def send_request(self, method, endpoint, data=None, headers=None, token=None):
+        """Send HTTP request without logging and return (response, timing)"""
+        url = f"{self.base_url}/{endpoint}"
+        request_headers = {'Content-Type': 'application/json'}
+        if headers:
+            request_headers.update(headers)
+        
+        token = token if token is not None else self.token
+        if token:
+            request_headers['Authorization'] = f'Bearer {token}'
+
+        started_at = time.time()
+        start = time.perf_counter()
+        response = None
+        error = None
+        for attempt in range(self.retries + 1):
+            retryable = False
+            try:
+                async with self.http.request(method, url, json=data, headers=request_headers) as raw:
+                    response = AsyncResponse(raw.status, raw.headers, await raw.read())
+                error = None
+                retryable = response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS
+            except aiohttp.ClientConnectorError as e:
+                # Nothing reached the server, so even POST is safe to retry
+                response, error, retryable = None, str(e), True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                response, error = None, str(e) or type(e).__name__
+                retryable = method in IDEMPOTENT_METHODS
+            
+            if not retryable or attempt == self.retries:
+                break
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+        
+        timing = {
+            'method': method,
+            'endpoint': endpoint_key(endpoint),
+            'status_code': response.status_code if response is not None else None,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'error': error
+        }
+        self.metrics.record_timing(timing)
+        if self.recorder:
+            self.recorder.record(started_at, method, endpoint, data, token, timing)
+        return response, timing
+
+    async def make_request(self, method, endpoint, data=None, headers=None, token=None):
+        """Make HTTP request with error handling"""
+        response, timing = await self.send_request(method, endpoint, data, headers, token)
+        self.pending_timings().append(timing)
+        
+        url = f"{self.base_url}/{endpoint}"
+        if response is None:
+            print(f"Request error for {method} {url}: {timing['error']}")
+        else:
+            print(f"Request: {method} {url} -> Status: {response.status_code}")
+        return response
+
+    def error_message(self, response, default):
+        """The error body's message; proxies and crashes can answer with HTML or nothing"""
+        if response is None:
+            return 'No response'
+        try:
+            return response.json().get('message', default)
+        except (ValueError, AttributeError):
+            return response.text[:200] or default
+
+    async def test_database_connection(self):
+        """Test MySQL database connection"""
+        # mysql.connector is blocking, so run the sync check off the event loop
+        return await asyncio.to_thread(OKUTransportAPITester.test_database_connection, self)
+
+    async def test_cors_headers(self):
+        """Test CORS configuration"""
+        print("\n🔍 Testing CORS Configuration...")
+        
+        try:
+            response = await self.make_request('OPTIONS', 'api/login',
+                                               headers={'Origin': 'http://localhost:3000'}, token='')
+            
+            if response.status_code == 200 or response.status_code == 204:
+                cors_headers = {
+                    'Access-Control-Allow-Origin': response.headers.get('Access-Control-Allow-Origin'),
+                    'Access-Control-Allow-Methods': response.headers.get('Access-Control-Allow-Methods'),
+                    'Access-Control-Allow-Headers': response.headers.get('Access-Control-Allow-Headers')
+                }
+                
+                return self.log_test(
+                    "CORS Configuration", 
+                    True, 
+                    "CORS headers present",
+                    cors_headers
+                )
+            else:
+                return self.log_test(
+                    "CORS Configuration", 
+                    False, 
+                    f"OPTIONS request failed with status {response.status_code}"
+                )
+        except Exception as e:
+            return self.log_test(
+                "CORS Configuration", 
+                False, 
+                f"CORS test failed: {str(e)}"
+            )
+
+    async def test_server_health(self):
+        """Test if server is running and responding"""
+        print("\n🔍 Testing Server Health...")
+        
+        response = await self.make_request('GET', 'api/profile', token='')
+        if response is not None and response.status_code == 401:
+            return self.log_test("Server Health Check", True, "Server is running and responding with correct auth error")
+        else:
+            return self.log_test("Server Health Check", False, f"Expected 401, got {response.status_code if response is not None else 'No response'}")
+
+    async def test_user_registration(self):
+        """Test user registration functionality for all user types"""
+        print("\n🔍 Testing User Registration...")
+        
+        # Test data for different user types; the random part keeps emails unique
+        # when several testers register in the same second
+        timestamp = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        test_users = [
+            {
+                "name": "Test OKU User",
+                "email": f"oku_test_{timestamp}@example.com",
+                "phone": "0123456789",
+                "password": "password123",
+                "userType": "OKU User"
+            },
+            {
+                "name": "Test Driver",
+                "email": f"driver_test_{timestamp}@example.com", 
+                "phone": "0123456790",
+                "password": "password123",
+                "userType": "Driver"
+            },
+            {
+                "name": "Test Company Admin",
+                "email": f"admin_test_{timestamp}@example.com",
+                "phone": "0123456791",
+                "password": "password123",
+                "userType": "Company Admin"
+            },
+            {
+                "name": "Test JKM Officer",
+                "email": f"jkm_test_{timestamp}@example.com",
+                "phone": "0123456792",
+                "password": "password123",
+                "userType": "JKM Officer"
+            }
+        ]
+        
+        registration_results = []
+        
+        for user_data in test_users:
+            response = await self.make_request('POST', 'api/register', user_data)
+            
+            if response is not None and response.status_code == 200:
+                response_data = response.json()
+                success = self.log_test(
+                    f"Register {user_data['userType']}", 
+                    True, 
+                    response_data.get('message', 'Registration successful'),
+                    response_data
+                )
+                # Store user data for later tests
+                user_data['userId'] = response_data.get('userId')
+                self.test_users.append(user_data)
+                registration_results.append({
+                    'user_data': user_data,
+                    'response': response_data,
+                    'success': success
+                })
+            else:
+                error_msg = self.error_message(response, 'Registration failed')
+                self.log_test(
+                    f"Register {user_data['userType']}", 
+                    False, 
+                    f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+                )
+        
+        return registration_results
+
+    async def test_user_login(self):
+        """Test user login functionality for different user types"""
+        print("\n🔍 Testing User Login...")
+        
+        login_results = []
+        
+        # Test login for each registered user type
+        for user in self.test_users:
+            test_credentials = {
+                "email": user["email"],
+                "password": user["password"]
+            }
+            
+            response = await self.make_request('POST', 'api/login', test_credentials)
+            
+            if response is not None and response.status_code == 200:
+                try:
+                    response_data = response.json()
+                    
+                    # Store tokens for different user types
+                    if user["userType"] == "OKU User":
+                        self.token = response_data.get('token')
+                        self.user_data = response_data.get('user')
+                    elif user["userType"] == "Driver":
+                        self.driver_token = response_data.get('token')
+                        self.driver_data = response_data.get('user')
+                    elif user["userType"] == "Company Admin":
+                        self.admin_token = response_data.get('token')
+                        self.admin_data = response_data.get('user')
+                    
+                    success = self.log_test(
+                        f"Login {user['userType']}", 
+                        True, 
+                        f"Login successful for {user['userType']}: {response_data.get('user', {}).get('name', 'Unknown')}",
+                        response_data
+                    )
+                    login_results.append(success)
+                except:
+                    success = self.log_test(
+                        f"Login {user['userType']}", 
+                        False, 
+                        f"Status: {response.status_code}, Error: Invalid JSON response"
+                    )
+                    login_results.append(success)
+            elif response is not None and response.status_code == 403 and user["userType"] == "Driver":
+                # Driver might be pending approval
+                try:
+                    error_data = response.json()
+                    success = self.log_test(
+                        f"Login {user['userType']}", 
+                        True, 
+                        f"Driver login correctly blocked: {error_data.get('message', 'pending approval')}",
+                        error_data
+                    )
+                except:
+                    success = self.log_test(
+                        f"Login {user['userType']}", 
+                        True, 
+                        "Driver login correctly blocked - pending approval"
+                    )
+                login_results.append(success)
+            else:
+                error_msg = self.error_message(response, 'Login failed')
+                success = self.log_test(
+                    f"Login {user['userType']}", 
+                    False, 
+                    f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+                )
+                login_results.append(success)
+        
+        return all(login_results)
+
+    async def approve_registered_driver(self):
+        """Approve this user's registered driver with the admin token, then log the driver in"""
+        driver = next((user for user in self.test_users if user['userType'] == 'Driver'), None)
+        if not driver or not self.admin_token:
+            return self.log_test("Approve Driver", False, "Registered driver and admin login required")
+        
+        response = await self.make_request('PUT', f"api/drivers/{driver['userId']}/status",
+                                           {"status": "approved"}, token=self.admin_token)
+        if response is None or response.status_code != 200:
+            return self.log_test(
+                "Approve Driver", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, "
+                f"Error: {self.error_message(response, 'Approval failed')}"
+            )
+        
+        response = await self.make_request('POST', 'api/login',
+                                           {"email": driver["email"], "password": driver["password"]})
+        if response is None or response.status_code != 200:
+            return self.log_test(
+                "Approve Driver", 
+                False, 
+                f"Approved driver could not log in: {self.error_message(response, 'Login failed')}"
+            )
+        response_data = response.json()
+        self.driver_token = response_data.get('token')
+        self.driver_data = response_data.get('user')
+        return self.log_test("Approve Driver", True, f"Driver {driver['userId']} approved and logged in")
+
+    async def test_invalid_login(self):
+        """Test login with invalid credentials"""
+        print("\n🔍 Testing Invalid Login...")
+        
+        invalid_credentials = {
+            "email": "nonexistent@example.com",
+            "password": "wrongpassword"
+        }
+        
+        response = await self.make_request('POST', 'api/login', invalid_credentials)
+        
+        if response is not None and response.status_code == 401:
+            return self.log_test(
+                "Invalid Login", 
+                True, 
+                "Correctly rejected invalid credentials"
+            )
+        else:
+            error_msg = self.error_message(response, 'Unknown error')
+            return self.log_test(
+                "Invalid Login", 
+                False, 
+                f"Expected 401, got {response.status_code if response is not None else 'No response'}: {error_msg}"
+            )
+
+    async def test_protected_profile_route(self):
+        """Test protected profile route"""
+        print("\n🔍 Testing Protected Profile Route...")
+        
+        if not self.token:
+            return self.log_test(
+                "Profile Route (Protected)", 
+                False, 
+                "No token available - login test must pass first"
+            )
+        
+        response = await self.make_request('GET', 'api/profile')
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            user = response_data.get('user', {})
+            return self.log_test(
+                "Profile Route (Protected)", 
+                True, 
+                f"Profile retrieved for user: {user.get('name', 'Unknown')}",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Profile fetch failed')
+            return self.log_test(
+                "Profile Route (Protected)", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+
+    async def test_protected_route_without_token(self):
+        """Test protected route without authentication token"""
+        print("\n🔍 Testing Protected Route Without Token...")
+        
+        response = await self.make_request('GET', 'api/profile', token='')
+        
+        if response is not None and response.status_code == 401:
+            return self.log_test(
+                "Protected Route Without Token", 
+                True, 
+                "Correctly rejected request without token"
+            )
+        else:
+            error_msg = self.error_message(response, 'Unknown error')
+            return self.log_test(
+                "Protected Route Without Token", 
+                False, 
+                f"Expected 401, got {response.status_code if response is not None else 'No response'}: {error_msg}"
+            )
+
+    async def test_driver_profile_apis(self):
+        """Test driver profile completion endpoints"""
+        print("\n🔍 Testing Driver Profile APIs...")
+        
+        if not self.driver_token:
+            return self.log_test(
+                "Driver Profile APIs", 
+                False, 
+                "No driver token available - driver login must pass first"
+            )
+        
+        # Test driver profile status endpoint
+        response = await self.make_request('GET', 'api/driver/profile/status', token=self.driver_token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            status_success = self.log_test(
+                "Driver Profile Status", 
+                True, 
+                f"Profile status retrieved: Complete={response_data.get('isComplete', False)}, Status={response_data.get('status', 'unknown')}",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Profile status failed')
+            status_success = self.log_test(
+                "Driver Profile Status", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        # Test driver profile update endpoint (without file upload for now)
+        profile_data = {
+            "licenseNumber": "D123456789",
+            "vehicleType": "MPV",
+            "vehicleNumber": "ABC1234",
+            "vehicleFeatures": '["wheelchair_accessible", "air_conditioning"]',
+            "experience": "5 years",
+            "languages": "English, Malay",
+            "emergencyContact": "Emergency Contact",
+            "emergencyPhone": "0123456789",
+            "address": "Test Address"
+        }
+        
+        response = await self.make_request('PUT', 'api/driver/profile', profile_data, token=self.driver_token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            profile_success = self.log_test(
+                "Driver Profile Update", 
+                True, 
+                response_data.get('message', 'Profile updated successfully'),
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Profile update failed')
+            profile_success = self.log_test(
+                "Driver Profile Update", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        return status_success and profile_success
+
+    async def test_assignment_system(self):
+        """Test assignment system APIs"""
+        print("\n🔍 Testing Assignment System...")
+        
+        if not self.admin_token or not self.token or not self.driver_data:
+            return self.log_test(
+                "Assignment System", 
+                False, 
+                "Missing required tokens/data - admin, OKU user, and driver must be available"
+            )
+        
+        # Test creating assignment (as admin)
+        assignment_data = {
+            "oku_id": self.user_data.get('id'),
+            "driver_id": self.driver_data.get('id'),
+            "effective_from": datetime.now().strftime('%Y-%m-%d'),
+            "effective_to": (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d'),
+            "notes": "Test assignment"
+        }
+        
+        response = await self.make_request('POST', 'api/assignments', assignment_data, token=self.admin_token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            create_success = self.log_test(
+                "Create Assignment", 
+                True, 
+                response_data.get('message', 'Assignment created successfully'),
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Assignment creation failed')
+            create_success = self.log_test(
+                "Create Assignment", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        # Test getting assignments (as OKU user)
+        response = await self.make_request('GET', 'api/assignments', token=self.token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            get_success = self.log_test(
+                "Get Assignments", 
+                True, 
+                f"Retrieved {len(response_data.get('assignments', []))} assignments",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Get assignments failed')
+            get_success = self.log_test(
+                "Get Assignments", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        return create_success and get_success
+
+    async def test_booking_system(self):
+        """Test booking system with conflict detection"""
+        print("\n🔍 Testing Booking System...")
+        
+        if not self.token or not self.driver_data:
+            return self.log_test(
+                "Booking System", 
+                False, 
+                "Missing required tokens/data - OKU user and driver must be available"
+            )
+        
+        # Test creating a booking
+        booking_data = {
+            "driver_id": self.driver_data.get('id'),
+            "booking_type": "daily",
+            "start_datetime": (datetime.now() + timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (datetime.now() + timedelta(hours=4)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Test Pickup Location",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Test Dropoff Location",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Medical appointment",
+            "special_instructions": "Test booking"
+        }
+        
+        response = await self.make_request('POST', 'api/bookings', booking_data)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            create_success = self.log_test(
+                "Create Booking", 
+                True, 
+                response_data.get('message', 'Booking created successfully'),
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Booking creation failed')
+            create_success = self.log_test(
+                "Create Booking", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        # Test getting bookings
+        response = await self.make_request('GET', 'api/bookings')
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            get_success = self.log_test(
+                "Get Bookings", 
+                True, 
+                f"Retrieved {len(response_data.get('bookings', []))} bookings",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Get bookings failed')
+            get_success = self.log_test(
+                "Get Bookings", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        # Test conflict detection by creating overlapping booking
+        conflicting_booking = booking_data.copy()
+        conflicting_booking["start_datetime"] = (datetime.now() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+        conflicting_booking["end_datetime"] = (datetime.now() + timedelta(hours=3)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        response = await self.make_request('POST', 'api/bookings', conflicting_booking)
+        
+        if response is not None and response.status_code == 409:
+            conflict_success = self.log_test(
+                "Booking Conflict Detection", 
+                True, 
+                "Correctly detected booking conflict",
+                response.json()
+            )
+        else:
+            conflict_success = self.log_test(
+                "Booking Conflict Detection", 
+                False, 
+                f"Expected 409 conflict, got {response.status_code if response is not None else 'No response'}"
+            )
+        
+        return create_success and get_success and conflict_success
+
+    async def test_driver_schedule(self):
+        """Test driver schedule endpoint"""
+        print("\n🔍 Testing Driver Schedule...")
+        
+        if not self.token or not self.driver_data:
+            return self.log_test(
+                "Driver Schedule", 
+                False, 
+                "Missing required tokens/data - OKU user and driver must be available"
+            )
+        
+        driver_id = self.driver_data.get('id')
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        # Test getting driver schedule
+        response = await self.make_request('GET', f'api/driver/{driver_id}/schedule?date={today}')
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            return self.log_test(
+                "Driver Schedule", 
+                True, 
+                f"Retrieved schedule with {len(response_data.get('schedule', []))} entries",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'Schedule fetch failed')
+            return self.log_test(
+                "Driver Schedule", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+
+    async def test_gps_tracking(self):
+        """Test GPS tracking endpoint"""
+        print("\n🔍 Testing GPS Tracking...")
+        
+        if not self.driver_token:
+            return self.log_test(
+                "GPS Tracking", 
+                False, 
+                "No driver token available - driver login must pass first"
+            )
+        
+        # Test GPS update (as driver)
+        gps_data = {
+            "lat": 5.3307,
+            "lng": 103.1324,
+            "speed": 45.5,
+            "heading": 180.0,
+            "accuracy": 5.0,
+            "booking_id": None
+        }
+        
+        response = await self.make_request('POST', 'api/gps/update', gps_data, token=self.driver_token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            update_success = self.log_test(
+                "GPS Update", 
+                True, 
+                response_data.get('message', 'GPS location updated successfully'),
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'GPS update failed')
+            update_success = self.log_test(
+                "GPS Update", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        # Test getting latest GPS locations
+        response = await self.make_request('GET', 'api/gps/latest', token=self.driver_token)
+        
+        if response is not None and response.status_code == 200:
+            response_data = response.json()
+            get_success = self.log_test(
+                "Get GPS Locations", 
+                True, 
+                f"Retrieved {len(response_data.get('locations', []))} GPS locations",
+                response_data
+            )
+        else:
+            error_msg = self.error_message(response, 'GPS locations failed')
+            get_success = self.log_test(
+                "Get GPS Locations", 
+                False, 
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
+            )
+        
+        return update_success and get_success
+
+    async def test_jwt_token_validation(self):
+        """Test JWT token validation"""
+        print("\n🔍 Testing JWT Token Validation...")
+        
+        if not self.token:
+            return self.log_test(
+                "JWT Token Validation", 
+                False, 
+                "No token available for validation test"
+            )
+        
+        # Test with invalid token
+        response = await self.make_request('GET', 'api/profile', token="invalid.jwt.token")
+        
+        if response is not None and response.status_code == 403:
+            return self.log_test(
+                "JWT Token Validation", 
+                True, 
+                "Invalid token correctly rejected"
+            )
+        else:
+            error_msg = self.error_message(response, 'Unknown error')
+            return self.log_test(
+                "JWT Token Validation", 
+                False, 
+                f"Expected 403 for invalid token, got {response.status_code if response is not None else 'No response'}: {error_msg}"
+            )
+
+    async def run_scheduled_tests(self, max_workers=None):
+        """Run tests concurrently as soon as their prerequisites have finished, at most
+        max_workers at a time (None for no limit)"""
+        graph = self.build_test_graph()
+        remaining = {test: set(prerequisites) for test, prerequisites in graph.items()}
+        return_values = {}
+        running = {}
+        slots = asyncio.Semaphore(max_workers) if max_workers else None
+        
+        async def run_task(test):
+            try:
+                if slots is None:
+                    return await getattr(self, test)()
+                async with slots:
+                    return await getattr(self, test)()
+            except Exception as e:
+                return self.log_test(test, False, f"Unexpected error: {str(e)}")
+        
+        while remaining or running:
+            ready = [test for test, prerequisites in remaining.items() if not prerequisites]
+            for test in ready:
+                del remaining[test]
+                running[asyncio.ensure_future(run_task(test))] = test
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                test = running.pop(future)
+                return_values[test] = future.result()
+                for prerequisites in remaining.values():
+                    prerequisites.discard(test)
+        
+        return return_values
+
+    async def run_sequential_tests(self):
+        """Run all backend tests one after the other in TEST_PLAN order"""
+        return_values = {}
+        for task in self.TEST_PLAN:
+            return_values[task['test']] = await getattr(self, task['test'])()
+        return return_values.get('test_user_registration') or []
+
+    async def run_all_tests(self, parallel=False, max_workers=None):
+        """Run all backend tests"""
+        print("=" * 80)
+        print("🚐 OKU TRANSPORT SYSTEM - COMPREHENSIVE BACKEND API TESTING (ASYNC)")
+        print("=" * 80)
+        
+        await self.open()
+        started = time.perf_counter()
+        try:
+            if parallel:
+                return_values = await self.run_scheduled_tests(max_workers)
+                registration_results = return_values.get('test_user_registration') or []
+            else:
+                registration_results = await self.run_sequential_tests()
+        finally:
+            await self.close()
+        elapsed = time.perf_counter() - started
+        
+        return self.summarize_results(registration_results, elapsed)
+
+    async def run_scenario(self, scenario):
+        """Run a list of test methods in order as one virtual user"""
+        for test in scenario:
+            try:
+                await getattr(self, test)()
+            except Exception as e:
+                self.log_test(test, False, f"Unexpected error: {str(e)}")
+
+async def run_virtual_users(base_url, users, pool_size, scenario=VIRTUAL_USER_SCENARIO, recorder=None):
+    """Run the scenario as many concurrent virtual users sharing one connection pool"""
+    print("=" * 80)
+    print(f"👥 OKU TRANSPORT SYSTEM - {users} ASYNC VIRTUAL USERS")
+    print("=" * 80)
+    
+    connector = aiohttp.TCPConnector(limit=pool_size)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as http:
+        testers = [AsyncOKUTransportAPITester(base_url, http_session=http) for _ in range(users)]
+        for tester in testers:
+            tester.recorder = recorder
+        started = time.perf_counter()
+        # Per-request output from thousands of users would swamp the terminal
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            await asyncio.gather(*(tester.run_scenario(scenario) for tester in testers))
+        elapsed = time.perf_counter() - started
+    
+    metrics = MetricsRegistry()
+    for tester in testers:
+        metrics.merge(tester.metrics)
+    tests_run = sum(tester.tests_run for tester in testers)
+    tests_passed = sum(tester.tests_passed for tester in testers)
+    samples = {}
+    failures = {}
+    for tester in testers:
+        for result in tester.test_results:
+            if "❌" in result['status']:
+                failures[result['test']] = failures.get(result['test'], 0) + 1
+            for timing in result['requests']:
+                samples.setdefault(f"{timing['method']} /{timing['endpoint']}", []).append(timing['latency_ms'])
+    requests_made = sum(len(values) for values in samples.values())
+    
+    print(f"Virtual users: {users} in {elapsed:.2f}s")
+    print(f"Checks: {tests_passed}/{tests_run} passed")
+    print(f"Requests: {requests_made} ({requests_made / elapsed:.1f} req/s)")
+    print("\n⏱️  ENDPOINT LATENCY:")
+    endpoint_latency = {endpoint: latency_stats(values) for endpoint, values in samples.items()}
+    for endpoint, stats in endpoint_latency.items():
+        print(f"   {endpoint}: {stats['count']} req, p50 {stats['p50_ms']}ms, "
+              f"p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms")
+    if failures:
+        print("\n🚨 FAILED CHECKS:")
+        for test, count in sorted(failures.items(), key=lambda item: -item[1]):
+            print(f"   • {test}: {count}")
+    
+    return {
+        'users': users,
+        'elapsed_s': round(elapsed, 3),
+        'total_tests': tests_run,
+        'passed_tests': tests_passed,
+        'failed_tests': tests_run - tests_passed,
+        'requests_per_sec': round(requests_made / elapsed, 2) if elapsed > 0 else 0,
+        'endpoint_latency': endpoint_latency,
+        'failures': failures,
+        'metrics': metrics
+    }
+
+# Auth benchmark workloads: name -> (expected status, server work isolated by comparing neighbours)
+AUTH_WORKLOADS = {
+    'no_token': (401, "routing only"),
+    'login_unknown_email': (401, "user lookup only"),
+    'login_wrong_password': (401, "user lookup + bcrypt.compare"),
+    'login': (200, "user lookup + bcrypt.compare + jwt.sign"),
+    'register': (200, "bcrypt.hash + insert"),
+    'bad_signature': (403, "jwt.verify only"),
+    'protected': (200, "jwt.verify + profile query")
+}
+
+class EventLoopProbe(threading.Thread):
+    """Times the unauthenticated 401 the health check uses; it touches neither MySQL nor JWT,
+    so anything above its idle latency is time spent queued behind other work on the server's
+    event loop. It runs on its own thread and connection so the benchmark's busy client loop
+    cannot delay it and pass client lag off as server lag"""
+
+    def __init__(self, base_url, interval_s):
+        super().__init__(daemon=True)
+        self.tester = OKUTransportAPITester(base_url, pool_size=1, retries=0)
+        self.interval_s = interval_s
+        self.stopped = threading.Event()
+        self.samples = []
+
+    def run(self):
+        while not self.stopped.is_set():
+            _, timing = self.tester.send_request('GET', 'api/profile', token='')
+            if timing['status_code'] == 401:
+                self.samples.append(timing['latency_ms'])
+            self.stopped.wait(self.interval_s)
+
+    async def finish(self):
+        """Stop probing and return the samples, without blocking the event loop on the join"""
+        self.stopped.set()
+        await asyncio.to_thread(self.join)
+        self.tester.session.close()
+        return self.samples
+
+async def run_auth_stage(tester, build_request, concurrency, stage_s):
+    """Closed loop: concurrency workers each send build_request() back to back for stage_s"""
+    deadline = time.perf_counter() + stage_s
+    timings = []
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            method, endpoint, data, token = build_request()
+            _, timing = await tester.send_request(method, endpoint, data, token=token)
+            timings.append(timing)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, time.perf_counter() - started
+
+async def run_auth_benchmark(base_url, levels, stage_s, pool_size, probe_interval_s, max_error_rate=0.01):
+    """Measure login/register and protected-route throughput per concurrency level, with event-loop lag"""
+    print("=" * 80)
+    print("🔐 OKU TRANSPORT SYSTEM - LOGIN/JWT THROUGHPUT BENCHMARK")
+    print("=" * 80)
+    
+    connector = aiohttp.TCPConnector(limit=pool_size)
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        tester = AsyncOKUTransportAPITester(base_url, http_session=http, retries=0)
+        
+        email = f"auth_bench_{uuid.uuid4().hex[:12]}@example.com"
+        account = {"name": "Auth Benchmark", "email": email, "phone": "0123456789",
+                   "password": "password123", "userType": "OKU User"}
+        await tester.send_request('POST', 'api/register', account)
+        response, _ = await tester.send_request('POST', 'api/login', {"email": email, "password": "password123"})
+        if response is None or response.status_code != 200:
+            tester.log_test("Auth Benchmark Account", False, "Could not register and log in benchmark user")
+            return {'failed_tests': 1, 'metrics': tester.metrics}
+        token = response.json()['token']
+        header, signature = token.rsplit('.', 1)
+        # Same header and claims, broken signature: jwt.verify does the full HMAC, then rejects
+        forged = f"{header}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+        
+        builders = {
+            'no_token': lambda: ('GET', 'api/profile', None, ''),
+            'login_unknown_email': lambda: ('POST', 'api/login', {
+                "email": f"nobody_{uuid.uuid4().hex[:12]}@example.com", "password": "password123"}, ''),
+            'login_wrong_password': lambda: ('POST', 'api/login', {"email": email, "password": "wrong-password"}, ''),
+            'login': lambda: ('POST', 'api/login', {"email": email, "password": "password123"}, ''),
+            'register': lambda: ('POST', 'api/register', {
+                **account, "email": f"auth_bench_{uuid.uuid4().hex[:12]}@example.com"}, ''),
+            'bad_signature': lambda: ('GET', 'api/profile', None, forged),
+            'protected': lambda: ('GET', 'api/profile', None, token)
+        }
+        
+        probe = EventLoopProbe(base_url, probe_interval_s)
+        probe.start()
+        await asyncio.sleep(max(1.0, probe_interval_s * 20))
+        idle = await probe.finish()
+        baseline = percentile(idle, 50) or 0
+        print(f"Idle probe latency p50: {baseline}ms")
+        
+        stages = []
+        for concurrency in levels:
+            print(f"\n🚀 Concurrency {concurrency}")
+            for name, (expected, work) in AUTH_WORKLOADS.items():
+                probe = EventLoopProbe(base_url, probe_interval_s)
+                probe.start()
+                timings, elapsed = await run_auth_stage(tester, builders[name], concurrency, stage_s)
+                lag_samples = await probe.finish()
+                
+                errors = sum(1 for timing in timings if timing['status_code'] != expected)
+                error_rate = errors / len(timings) if timings else 1.0
+                lags = [max(0.0, round(sample - baseline, 2)) for sample in lag_samples]
+                stage = {
+                    'workload': name,
+                    'work': work,
+                    'concurrency': concurrency,
+                    'requests': len(timings),
+                    'throughput_rps': round(len(timings) / elapsed, 1) if elapsed > 0 else 0,
+                    'error_rate': round(error_rate, 4),
+                    'latency': latency_stats([timing['latency_ms'] for timing in timings]),
+                    'event_loop_lag': latency_stats(lags)
+                }
+                stages.append(stage)
+                lag = stage['event_loop_lag']
+                print(f"   {name} ({work}): {stage['throughput_rps']} req/s, "
+                      f"p50 {stage['latency']['p50_ms']}ms, p95 {stage['latency']['p95_ms']}ms, "
+                      f"errors {error_rate:.2%}, loop lag p95 {lag.get('p95_ms')}ms max {lag.get('max_ms')}ms")
+                tester.log_test(f"Auth Stage {name} x{concurrency}", error_rate <= max_error_rate,
+                                f"{errors}/{len(timings)} unexpected statuses (expected {expected})")
+    
+    # Serial per-request cost of each step, from the lowest concurrency level
+    # A stage whose requests all failed has no latency; count it as 0 rather than abort the report
+    p50 = {stage['workload']: stage['latency'].get('p50_ms', 0) for stage in stages if stage['concurrency'] == levels[0]}
+    costs = {
+        'jwt_verify_ms': round(p50['bad_signature'] - p50['no_token'], 2),
+        'bcrypt_compare_ms': round(p50['login_wrong_password'] - p50['login_unknown_email'], 2),
+        'jwt_sign_ms': round(p50['login'] - p50['login_wrong_password'], 2),
+        'register_ms': p50['register']
+    }
+    
+    print("\n" + "=" * 80)
+    print(f"📊 AUTH COST BREAKDOWN (p50 at concurrency {levels[0]})")
+    print("=" * 80)
+    share = f"{costs['jwt_verify_ms'] / p50['protected']:.0%} of a profile read" if p50['protected'] else "no profile reads"
+    print(f"   jwt.verify:     ~{costs['jwt_verify_ms']}ms per protected request "
+          f"({share}) - the ceiling for a verified-token cache")
+    print(f"   bcrypt.compare: ~{costs['bcrypt_compare_ms']}ms per login")
+    print(f"   jwt.sign:       ~{costs['jwt_sign_ms']}ms per login")
+    print(f"   register:       {costs['register_ms']}ms end to end (bcrypt.hash dominates)")
+    
+    top = levels[-1]
+    print(f"\n⏳ EVENT-LOOP LAG AT CONCURRENCY {top} (p95 above idle):")
+    for stage in stages:
+        if stage['concurrency'] == top:
+            print(f"   {stage['workload']}: {stage['event_loop_lag'].get('p95_ms')}ms "
+                  f"while serving {stage['throughput_rps']} req/s")
+    print("   Lag during login/register that protected reads do not cause is what moving hashing to "
+          "worker threads would remove")
+    
+    return {
+        'failed_tests': tester.tests_run - tester.tests_passed,
+        'idle_probe_ms': baseline,
+        'stages': stages,
+        'costs': costs,
+        'metrics': tester.metrics
+    }
+
+def main():
+    """Main async test execution"""
+    parser = argparse.ArgumentParser(description="Async OKU Transport backend API tests")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--parallel', action='store_true', help="Run independent tests concurrently")
+    parser.add_argument('--virtual-users', type=int, default=0, help="Run the user scenario as N concurrent users")
+    parser.add_argument('--pool-size', type=int, default=500, help="Maximum open connections")
+    parser.add_argument('--record', help="Append every request to this traffic log for traffic_replay.py")
+    parser.add_argument('--auth-benchmark', action='store_true',
+                        help="Measure login/register vs protected-route throughput and event-loop lag")
+    parser.add_argument('--concurrency-levels', default="1,8,32,128", help="Comma-separated levels for --auth-benchmark")
+    parser.add_argument('--stage-seconds', type=float, default=10, help="Duration of each --auth-benchmark stage")
+    parser.add_argument('--probe-interval', type=float, default=0.05, help="Seconds between event-loop lag probes")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    recorder = TrafficRecorder(args.record) if args.record else None
+    if args.auth_benchmark:
+        levels = [int(level) for level in args.concurrency_levels.split(',')]
+        results = asyncio.run(run_auth_benchmark(args.base_url, levels, args.stage_seconds,
+                                                 args.pool_size, args.probe_interval))
+        export_metrics(results['metrics'], args, 'async_backend_test')
+    elif args.virtual_users:
+        results = asyncio.run(run_virtual_users(args.base_url, args.virtual_users, args.pool_size, recorder=recorder))
+        export_metrics(results['metrics'], args, 'async_backend_test')
+    else:
+        tester = AsyncOKUTransportAPITester(args.base_url, pool_size=args.pool_size)
+        tester.recorder = recorder
+        results = asyncio.run(tester.run_all_tests(parallel=args.parallel))
+        export_metrics(tester.metrics, args, 'async_backend_test')
+    if recorder:
+        recorder.close()
+        print(f"📼 {recorder.records} requests recorded to {args.record}")
+    
+    if results['failed_tests'] == 0:
+        print("\n🎉 All tests passed!")
+        return 0
+    else:
+        print(f"\n⚠️  {results['failed_tests']} test(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,91 @@ OKU Transport System - Backend API Testing
 Comprehensive testing for database connection, authentication, bookings, assignments, GPS tracking
 """
 
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import math
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 import time
+import uuid
 import mysql.connector
 
+from metrics import MetricsRegistry, add_metrics_arguments, export_metrics
+from traffic_log import TrafficRecorder
+
+# Database used by the test suite for direct verification queries
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': 'password123',
+    'database': 'dbuser'
+}
+
+def get_db_connection(**overrides):
+    """Open a direct MySQL connection using the suite's database settings"""
+    return mysql.connector.connect(**{**DB_CONFIG, **overrides})
+
+def endpoint_key(endpoint):
+    """Normalise an endpoint for aggregation: drop the query string and numeric ids"""
+    path = endpoint.split('?')[0]
+    return '/'.join(':id' if segment.isdigit() else segment for segment in path.split('/'))
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of a list of samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def latency_stats(samples):
+    """Summarise latency samples (ms) as count, mean and p50/p95/p99/max"""
+    if not samples:
+        return {'count': 0}
+    return {
+        'count': len(samples),
+        'avg_ms': round(sum(samples) / len(samples), 2),
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'p99_ms': percentile(samples, 99),
+        'max_ms': max(samples)
+    }
+
 class OKUTransportAPITester:
-    def __init__(self, base_url="http://localhost:8001"):
+    # Each test declares the shared state it reads ("needs") and writes ("provides").
+    # Ordering-only outputs such as "driver_profile" keep tests with server-side
+    # side effects (the profile update resets the driver to pending) in suite order.
+    TEST_PLAN = [
+        {'test': 'test_database_connection', 'needs': [], 'provides': []},
+        {'test': 'test_server_health', 'needs': [], 'provides': []},
+        {'test': 'test_cors_headers', 'needs': [], 'provides': []},
+        {'test': 'test_user_registration', 'needs': [], 'provides': ['test_users']},
+        {'test': 'test_invalid_login', 'needs': [], 'provides': []},
+        {'test': 'test_user_login', 'needs': ['test_users'],
+         'provides': ['token', 'user_data', 'driver_token', 'driver_data', 'admin_token', 'admin_data']},
+        {'test': 'test_protected_profile_route', 'needs': ['token'], 'provides': []},
+        {'test': 'test_protected_route_without_token', 'needs': [], 'provides': []},
+        {'test': 'test_jwt_token_validation', 'needs': ['token'], 'provides': []},
+        {'test': 'test_driver_profile_apis', 'needs': ['driver_token'], 'provides': ['driver_profile']},
+        {'test': 'test_assignment_system', 'needs': ['admin_token', 'token', 'user_data', 'driver_data', 'driver_profile'],
+         'provides': ['assignment']},
+        {'test': 'test_booking_system', 'needs': ['token', 'driver_data', 'assignment'], 'provides': ['booking']},
+        {'test': 'test_driver_schedule', 'needs': ['token', 'driver_data', 'booking'], 'provides': []},
+        {'test': 'test_gps_tracking', 'needs': ['driver_token'], 'provides': []}
+    ]
+
+    def __init__(self, base_url="http://localhost:8001", pool_size=10, retries=3, backoff_factor=0.3):
         self.base_url = base_url
+        self.session = self.create_session(pool_size, retries, backoff_factor)
+        self.local = threading.local()  # Per-thread requests made since the last log_test call
+        self.results_lock = threading.Lock()
+        self.metrics = MetricsRegistry()
+        self.recorder = None  # TrafficRecorder capturing every request, see enable_recording()
         self.token = None
         self.user_data = None
         self.driver_token = None
@@ -27,47 +102,149 @@ class OKUTransportAPITester:
 
     def log_test(self, name, success, message="", response_data=None):
         """Log test results"""
-        self.tests_run += 1
         if success:
-            self.tests_passed += 1
             status = "✅ PASS"
         else:
             status = "❌ FAIL"
         
+        # Attach timings of every request made while running this test
+        pending = self.pending_timings()
+        timings = list(pending)
+        pending.clear()
+        
         result = {
             "test": name,
             "status": status,
             "message": message,
-            "response_data": response_data
+            "response_data": response_data,
+            "requests": timings,
+            "latency_ms": round(sum(t['latency_ms'] for t in timings), 2)
         }
-        self.test_results.append(result)
+        with self.results_lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            self.test_results.append(result)
+        self.metrics.record_check(name, success)
         print(f"{status} - {name}: {message}")
         return success
 
-    def make_request(self, method, endpoint, data=None, headers=None):
-        """Make HTTP request with error handling"""
+    def pending_timings(self):
+        """Return the request timings recorded by the current thread since its last log_test"""
+        if not hasattr(self.local, 'pending_timings'):
+            self.local.pending_timings = []
+        return self.local.pending_timings
+
+    def create_session(self, pool_size, retries, backoff_factor):
+        """Create a keep-alive session with a bounded connection pool and retries"""
+        # POST is not idempotent (bookings, registrations), so only connection
+        # failures are retried for it; GET/PUT/OPTIONS also retry on 502-504.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET', 'PUT', 'OPTIONS']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Content-Type': 'application/json'})
+        return session
+
+    def send_request(self, method, endpoint, data=None, headers=None, token=None):
+        """Send HTTP request without logging and return (response, timing)"""
         url = f"{self.base_url}/{endpoint}"
-        default_headers = {'Content-Type': 'application/json'}
+        request_headers = dict(headers) if headers else {}
         
-        if headers:
-            default_headers.update(headers)
-        
-        if self.token:
-            default_headers['Authorization'] = f'Bearer {self.token}'
+        # An explicit token is the caller's auth context; '' sends no token at all
+        token = token if token is not None else self.token
+        if token:
+            request_headers['Authorization'] = f'Bearer {token}'
 
+        started_at = time.time()
+        start = time.perf_counter()
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=default_headers, timeout=10)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=default_headers, timeout=10)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=default_headers, timeout=10)
-            
-            print(f"Request: {method} {url} -> Status: {response.status_code}")
-            return response
+            response = self.session.request(method, url, json=data, headers=request_headers, timeout=10)
+            error = None
         except requests.exceptions.RequestException as e:
-            print(f"Request error for {method} {url}: {str(e)}")
+            response = None
+            error = str(e)
+        
+        timing = {
+            'method': method,
+            'endpoint': endpoint_key(endpoint),
+            'status_code': response.status_code if response is not None else None,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'error': error
+        }
+        self.metrics.record_timing(timing)
+        if self.recorder:
+            self.recorder.record(started_at, method, endpoint, data, token, timing)
+        return response, timing
+
+    def enable_recording(self, path):
+        """Append every request/response pair to a traffic log for traffic_replay.py"""
+        self.recorder = TrafficRecorder(path)
+
+    def make_request(self, method, endpoint, data=None, headers=None, token=None):
+        """Make HTTP request with error handling"""
+        response, timing = self.send_request(method, endpoint, data, headers, token)
+        self.pending_timings().append(timing)
+        
+        url = f"{self.base_url}/{endpoint}"
+        if response is None:
+            print(f"Request error for {method} {url}: {timing['error']}")
+        else:
+            print(f"Request: {method} {url} -> Status: {response.status_code}")
+        return response
+
+    def provision_user(self, user_type, prefix, admin_token=None):
+        """Register and log in a fresh user, approving drivers with the admin token"""
+        user = {
+            "name": f"Load {user_type}",
+            "email": f"{prefix}_{uuid.uuid4().hex[:12]}@example.com",
+            "phone": "0123456789",
+            "password": "password123",
+            "userType": user_type
+        }
+        response, _ = self.send_request('POST', 'api/register', user)
+        if response is None or response.status_code != 200:
+            return None
+        user['userId'] = response.json().get('userId')
+        
+        if user_type == "Driver":
+            if not admin_token:
+                return None
+            response, _ = self.send_request('PUT', f"api/drivers/{user['userId']}/status",
+                                            {"status": "approved"}, token=admin_token)
+            if response is None or response.status_code != 200:
+                return None
+        
+        response, _ = self.send_request('POST', 'api/login',
+                                        {"email": user["email"], "password": user["password"]})
+        if response is None or response.status_code != 200:
             return None
+        
+        login_data = response.json()
+        user['token'] = login_data.get('token')
+        user['id'] = login_data.get('user', {}).get('id')
+        return user
+
+    def endpoint_latency_summary(self):
+        """Aggregate recorded request timings per endpoint"""
+        summary = {}
+        for result in self.test_results:
+            for timing in result['requests']:
+                key = f"{timing['method']} /{timing['endpoint']}"
+                summary.setdefault(key, []).append(timing['latency_ms'])
+        
+        return {key: latency_stats(samples) for key, samples in summary.items()}
 
     def test_database_connection(self):
         """Test MySQL database connection"""
@@ -75,12 +252,7 @@ class OKUTransportAPITester:
         
         try:
             # Test database connection directly
-            connection = mysql.connector.connect(
-                host='localhost',
-                user='root',
-                password='password123',
-                database='dbuser'
-            )
+            connection = get_db_connection()
             
             cursor = connection.cursor()
             cursor.execute("SELECT 1")
@@ -114,18 +286,19 @@ class OKUTransportAPITester:
         """Test if server is running and responding"""
         print("\n🔍 Testing Server Health...")
         
-        response = self.make_request('GET', 'api/profile')
-        if response and response.status_code == 401:
+        response = self.make_request('GET', 'api/profile', token='')
+        if response is not None and response.status_code == 401:
             return self.log_test("Server Health Check", True, "Server is running and responding with correct auth error")
         else:
-            return self.log_test("Server Health Check", False, f"Expected 401, got {response.status_code if response else 'No response'}")
+            return self.log_test("Server Health Check", False, f"Expected 401, got {response.status_code if response is not None else 'No response'}")
 
     def test_user_registration(self):
         """Test user registration functionality for all user types"""
         print("\n🔍 Testing User Registration...")
         
-        # Test data for different user types
-        timestamp = int(time.time())
+        # Test data for different user types; the random part keeps emails unique
+        # when several testers register in the same second
+        timestamp = f"{int(time.time())}_{uuid.uuid4().hex[:8]}"
         test_users = [
             {
                 "name": "Test OKU User",
@@ -162,7 +335,7 @@ class OKUTransportAPITester:
         for user_data in test_users:
             response = self.make_request('POST', 'api/register', user_data)
             
-            if response and response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 response_data = response.json()
                 success = self.log_test(
                     f"Register {user_data['userType']}", 
@@ -179,11 +352,11 @@ class OKUTransportAPITester:
                     'success': success
                 })
             else:
-                error_msg = response.json().get('message', 'Registration failed') if response else 'No response'
+                error_msg = response.json().get('message', 'Registration failed') if response is not None else 'No response'
                 self.log_test(
                     f"Register {user_data['userType']}", 
                     False, 
-                    f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                    f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
                 )
         
         return registration_results
@@ -203,7 +376,7 @@ class OKUTransportAPITester:
             
             response = self.make_request('POST', 'api/login', test_credentials)
             
-            if response and response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 try:
                     response_data = response.json()
                     
@@ -232,7 +405,7 @@ class OKUTransportAPITester:
                         f"Status: {response.status_code}, Error: Invalid JSON response"
                     )
                     login_results.append(success)
-            elif response and response.status_code == 403 and user["userType"] == "Driver":
+            elif response is not None and response.status_code == 403 and user["userType"] == "Driver":
                 # Driver might be pending approval
                 try:
                     error_data = response.json()
@@ -251,13 +424,13 @@ class OKUTransportAPITester:
                 login_results.append(success)
             else:
                 try:
-                    error_msg = response.json().get('message', 'Login failed') if response else 'No response'
+                    error_msg = response.json().get('message', 'Login failed') if response is not None else 'No response'
                 except:
                     error_msg = 'Invalid response format'
                 success = self.log_test(
                     f"Login {user['userType']}", 
                     False, 
-                    f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                    f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
                 )
                 login_results.append(success)
         
@@ -274,7 +447,7 @@ class OKUTransportAPITester:
         
         response = self.make_request('POST', 'api/login', invalid_credentials)
         
-        if response and response.status_code == 401:
+        if response is not None and response.status_code == 401:
             return self.log_test(
                 "Invalid Login", 
                 True, 
@@ -282,13 +455,13 @@ class OKUTransportAPITester:
             )
         else:
             try:
-                error_msg = response.json().get('message', 'Unknown error') if response else 'No response'
+                error_msg = response.json().get('message', 'Unknown error') if response is not None else 'No response'
             except:
                 error_msg = 'Invalid response format'
             return self.log_test(
                 "Invalid Login", 
                 False, 
-                f"Expected 401, got {response.status_code if response else 'No response'}: {error_msg}"
+                f"Expected 401, got {response.status_code if response is not None else 'No response'}: {error_msg}"
             )
 
     def test_protected_profile_route(self):
@@ -304,7 +477,7 @@ class OKUTransportAPITester:
         
         response = self.make_request('GET', 'api/profile')
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             user = response_data.get('user', {})
             return self.log_test(
@@ -314,27 +487,20 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Profile fetch failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Profile fetch failed') if response is not None else 'No response'
             return self.log_test(
                 "Profile Route (Protected)", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
 
     def test_protected_route_without_token(self):
         """Test protected route without authentication token"""
         print("\n🔍 Testing Protected Route Without Token...")
         
-        # Temporarily remove token
-        original_token = self.token
-        self.token = None
-        
-        response = self.make_request('GET', 'api/profile')
-        
-        # Restore token
-        self.token = original_token
+        response = self.make_request('GET', 'api/profile', token='')
         
-        if response and response.status_code == 401:
+        if response is not None and response.status_code == 401:
             return self.log_test(
                 "Protected Route Without Token", 
                 True, 
@@ -342,13 +508,13 @@ class OKUTransportAPITester:
             )
         else:
             try:
-                error_msg = response.json().get('message', 'Unknown error') if response else 'No response'
+                error_msg = response.json().get('message', 'Unknown error') if response is not None else 'No response'
             except:
                 error_msg = 'Invalid response format'
             return self.log_test(
                 "Protected Route Without Token", 
                 False, 
-                f"Expected 401, got {response.status_code if response else 'No response'}: {error_msg}"
+                f"Expected 401, got {response.status_code if response is not None else 'No response'}: {error_msg}"
             )
 
     def test_driver_profile_apis(self):
@@ -363,12 +529,9 @@ class OKUTransportAPITester:
             )
         
         # Test driver profile status endpoint
-        original_token = self.token
-        self.token = self.driver_token
+        response = self.make_request('GET', 'api/driver/profile/status', token=self.driver_token)
         
-        response = self.make_request('GET', 'api/driver/profile/status')
-        
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             status_success = self.log_test(
                 "Driver Profile Status", 
@@ -377,11 +540,11 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Profile status failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Profile status failed') if response is not None else 'No response'
             status_success = self.log_test(
                 "Driver Profile Status", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         # Test driver profile update endpoint (without file upload for now)
@@ -397,9 +560,9 @@ class OKUTransportAPITester:
             "address": "Test Address"
         }
         
-        response = self.make_request('PUT', 'api/driver/profile', profile_data)
+        response = self.make_request('PUT', 'api/driver/profile', profile_data, token=self.driver_token)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             profile_success = self.log_test(
                 "Driver Profile Update", 
@@ -408,16 +571,13 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Profile update failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Profile update failed') if response is not None else 'No response'
             profile_success = self.log_test(
                 "Driver Profile Update", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
-        # Restore original token
-        self.token = original_token
-        
         return status_success and profile_success
 
     def test_assignment_system(self):
@@ -432,9 +592,6 @@ class OKUTransportAPITester:
             )
         
         # Test creating assignment (as admin)
-        original_token = self.token
-        self.token = self.admin_token
-        
         assignment_data = {
             "oku_id": self.user_data.get('id'),
             "driver_id": self.driver_data.get('id'),
@@ -443,9 +600,9 @@ class OKUTransportAPITester:
             "notes": "Test assignment"
         }
         
-        response = self.make_request('POST', 'api/assignments', assignment_data)
+        response = self.make_request('POST', 'api/assignments', assignment_data, token=self.admin_token)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             create_success = self.log_test(
                 "Create Assignment", 
@@ -454,19 +611,17 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Assignment creation failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Assignment creation failed') if response is not None else 'No response'
             create_success = self.log_test(
                 "Create Assignment", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         # Test getting assignments (as OKU user)
-        self.token = original_token
-        
-        response = self.make_request('GET', 'api/assignments')
+        response = self.make_request('GET', 'api/assignments', token=self.token)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             get_success = self.log_test(
                 "Get Assignments", 
@@ -475,11 +630,11 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Get assignments failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Get assignments failed') if response is not None else 'No response'
             get_success = self.log_test(
                 "Get Assignments", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         return create_success and get_success
@@ -513,7 +668,7 @@ class OKUTransportAPITester:
         
         response = self.make_request('POST', 'api/bookings', booking_data)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             create_success = self.log_test(
                 "Create Booking", 
@@ -522,17 +677,17 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Booking creation failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Booking creation failed') if response is not None else 'No response'
             create_success = self.log_test(
                 "Create Booking", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         # Test getting bookings
         response = self.make_request('GET', 'api/bookings')
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             get_success = self.log_test(
                 "Get Bookings", 
@@ -541,11 +696,11 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Get bookings failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Get bookings failed') if response is not None else 'No response'
             get_success = self.log_test(
                 "Get Bookings", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         # Test conflict detection by creating overlapping booking
@@ -555,7 +710,7 @@ class OKUTransportAPITester:
         
         response = self.make_request('POST', 'api/bookings', conflicting_booking)
         
-        if response and response.status_code == 409:
+        if response is not None and response.status_code == 409:
             conflict_success = self.log_test(
                 "Booking Conflict Detection", 
                 True, 
@@ -566,7 +721,7 @@ class OKUTransportAPITester:
             conflict_success = self.log_test(
                 "Booking Conflict Detection", 
                 False, 
-                f"Expected 409 conflict, got {response.status_code if response else 'No response'}"
+                f"Expected 409 conflict, got {response.status_code if response is not None else 'No response'}"
             )
         
         return create_success and get_success and conflict_success
@@ -588,7 +743,7 @@ class OKUTransportAPITester:
         # Test getting driver schedule
         response = self.make_request('GET', f'api/driver/{driver_id}/schedule?date={today}')
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             return self.log_test(
                 "Driver Schedule", 
@@ -597,11 +752,11 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'Schedule fetch failed') if response else 'No response'
+            error_msg = response.json().get('message', 'Schedule fetch failed') if response is not None else 'No response'
             return self.log_test(
                 "Driver Schedule", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
 
     def test_gps_tracking(self):
@@ -616,9 +771,6 @@ class OKUTransportAPITester:
             )
         
         # Test GPS update (as driver)
-        original_token = self.token
-        self.token = self.driver_token
-        
         gps_data = {
             "lat": 5.3307,
             "lng": 103.1324,
@@ -628,9 +780,9 @@ class OKUTransportAPITester:
             "booking_id": None
         }
         
-        response = self.make_request('POST', 'api/gps/update', gps_data)
+        response = self.make_request('POST', 'api/gps/update', gps_data, token=self.driver_token)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             update_success = self.log_test(
                 "GPS Update", 
@@ -639,17 +791,17 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'GPS update failed') if response else 'No response'
+            error_msg = response.json().get('message', 'GPS update failed') if response is not None else 'No response'
             update_success = self.log_test(
                 "GPS Update", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
         # Test getting latest GPS locations
-        response = self.make_request('GET', 'api/gps/latest')
+        response = self.make_request('GET', 'api/gps/latest', token=self.driver_token)
         
-        if response and response.status_code == 200:
+        if response is not None and response.status_code == 200:
             response_data = response.json()
             get_success = self.log_test(
                 "Get GPS Locations", 
@@ -658,16 +810,13 @@ class OKUTransportAPITester:
                 response_data
             )
         else:
-            error_msg = response.json().get('message', 'GPS locations failed') if response else 'No response'
+            error_msg = response.json().get('message', 'GPS locations failed') if response is not None else 'No response'
             get_success = self.log_test(
                 "Get GPS Locations", 
                 False, 
-                f"Status: {response.status_code if response else 'No response'}, Error: {error_msg}"
+                f"Status: {response.status_code if response is not None else 'No response'}, Error: {error_msg}"
             )
         
-        # Restore original token
-        self.token = original_token
-        
         return update_success and get_success
 
     def test_cors_headers(self):
@@ -675,8 +824,9 @@ class OKUTransportAPITester:
         print("\n🔍 Testing CORS Configuration...")
         
         try:
-            response = requests.options(f"{self.base_url}/api/login", 
-                                      headers={'Origin': 'http://localhost:3000'})
+            response = self.session.options(f"{self.base_url}/api/login", 
+                                          headers={'Origin': 'http://localhost:3000'},
+                                          timeout=10)
             
             if response.status_code == 200 or response.status_code == 204:
                 cors_headers = {
@@ -716,15 +866,9 @@ class OKUTransportAPITester:
             )
         
         # Test with invalid token
-        original_token = self.token
-        self.token = "invalid.jwt.token"
+        response = self.make_request('GET', 'api/profile', token="invalid.jwt.token")
         
-        response = self.make_request('GET', 'api/profile')
-        
-        # Restore original token
-        self.token = original_token
-        
-        if response and response.status_code == 403:
+        if response is not None and response.status_code == 403:
             return self.log_test(
                 "JWT Token Validation", 
                 True, 
@@ -732,21 +876,96 @@ class OKUTransportAPITester:
             )
         else:
             try:
-                error_msg = response.json().get('message', 'Unknown error') if response else 'No response'
+                error_msg = response.json().get('message', 'Unknown error') if response is not None else 'No response'
             except:
                 error_msg = 'Invalid response format'
             return self.log_test(
                 "JWT Token Validation", 
                 False, 
-                f"Expected 403 for invalid token, got {response.status_code if response else 'No response'}: {error_msg}"
+                f"Expected 403 for invalid token, got {response.status_code if response is not None else 'No response'}: {error_msg}"
             )
 
-    def run_all_tests(self):
+    def build_test_graph(self):
+        """Build the test dependency graph from TEST_PLAN as {test: set(prerequisites)}"""
+        providers = {}
+        for task in self.TEST_PLAN:
+            for output in task['provides']:
+                if output in providers:
+                    raise ValueError(f"{output} is provided by both {providers[output]} and {task['test']}")
+                providers[output] = task['test']
+        
+        graph = {}
+        for task in self.TEST_PLAN:
+            missing = [need for need in task['needs'] if need not in providers]
+            if missing:
+                raise ValueError(f"{task['test']} needs {missing} but no test provides them")
+            graph[task['test']] = {providers[need] for need in task['needs']}
+        
+        # Reject cycles up front instead of deadlocking the scheduler
+        visiting, visited = set(), set()
+        def visit(test):
+            if test in visited:
+                return
+            if test in visiting:
+                raise ValueError(f"Dependency cycle through {test}")
+            visiting.add(test)
+            for prerequisite in graph[test]:
+                visit(prerequisite)
+            visiting.discard(test)
+            visited.add(test)
+        for test in graph:
+            visit(test)
+        
+        return graph
+
+    def run_scheduled_tests(self, max_workers=8):
+        """Run tests concurrently as soon as their prerequisites have finished"""
+        graph = self.build_test_graph()
+        remaining = {test: set(prerequisites) for test, prerequisites in graph.items()}
+        return_values = {}
+        running = {}
+        
+        def run_task(test):
+            try:
+                return getattr(self, test)()
+            except Exception as e:
+                return self.log_test(test, False, f"Unexpected error: {str(e)}")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while remaining or running:
+                ready = [test for test, prerequisites in remaining.items() if not prerequisites]
+                for test in ready:
+                    del remaining[test]
+                    running[executor.submit(run_task, test)] = test
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    test = running.pop(future)
+                    return_values[test] = future.result()
+                    for prerequisites in remaining.values():
+                        prerequisites.discard(test)
+        
+        return return_values
+
+    def run_all_tests(self, parallel=False, max_workers=8):
         """Run all backend tests"""
         print("=" * 80)
         print("🚐 OKU TRANSPORT SYSTEM - COMPREHENSIVE BACKEND API TESTING")
         print("=" * 80)
         
+        started = time.perf_counter()
+        if parallel:
+            print(f"\n⚡ Running tests in parallel with {max_workers} workers")
+            return_values = self.run_scheduled_tests(max_workers)
+            registration_results = return_values.get('test_user_registration') or []
+        else:
+            registration_results = self.run_sequential_tests()
+        elapsed = time.perf_counter() - started
+        
+        return self.summarize_results(registration_results, elapsed)
+
+    def run_sequential_tests(self):
+        """Run all backend tests one after the other, grouped by area"""
         # Run tests in sequence
         print("\n🔧 INFRASTRUCTURE TESTS")
         self.test_database_connection()
@@ -772,6 +991,10 @@ class OKUTransportAPITester:
         print("\n📍 GPS TRACKING TESTS")
         self.test_gps_tracking()
         
+        return registration_results
+
+    def summarize_results(self, registration_results, elapsed):
+        """Print the test summary and return the results dict"""
         # Print summary
         print("\n" + "=" * 80)
         print("📊 COMPREHENSIVE TEST SUMMARY")
@@ -780,6 +1003,7 @@ class OKUTransportAPITester:
         print(f"Passed: {self.tests_passed}")
         print(f"Failed: {self.tests_run - self.tests_passed}")
         print(f"Success Rate: {(self.tests_passed/self.tests_run)*100:.1f}%")
+        print(f"Duration: {elapsed:.2f}s")
         
         # Print detailed results
         print("\n📋 DETAILED RESULTS:")
@@ -793,20 +1017,44 @@ class OKUTransportAPITester:
             for failed in failed_tests:
                 print(f"   • {failed['test']}: {failed['message']}")
         
+        # Print per-endpoint latency
+        endpoint_latency = self.endpoint_latency_summary()
+        print("\n⏱️  ENDPOINT LATENCY:")
+        for endpoint, stats in endpoint_latency.items():
+            print(f"   {endpoint}: {stats['count']} req, avg {stats['avg_ms']}ms, "
+                  f"p95 {stats['p95_ms']}ms, max {stats['max_ms']}ms")
+        
         return {
             'total_tests': self.tests_run,
             'passed_tests': self.tests_passed,
             'failed_tests': self.tests_run - self.tests_passed,
             'success_rate': (self.tests_passed/self.tests_run)*100,
             'results': self.test_results,
-            'registration_results': registration_results if 'registration_results' in locals() else [],
-            'critical_issues': failed_tests
+            'registration_results': registration_results,
+            'critical_issues': failed_tests,
+            'endpoint_latency': endpoint_latency,
+            'duration_s': round(elapsed, 3)
         }
 
 def main():
     """Main test execution"""
-    tester = OKUTransportAPITester()
-    results = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="OKU Transport backend API tests")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--parallel', action='store_true', help="Run independent tests concurrently")
+    parser.add_argument('--workers', type=int, default=8, help="Worker threads for --parallel")
+    parser.add_argument('--record', help="Append request/response pairs to this traffic log (.ndjson or .ndjson.gz)")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
+    tester = OKUTransportAPITester(args.base_url, pool_size=max(10, args.workers))
+    if args.record:
+        tester.enable_recording(args.record)
+    results = tester.run_all_tests(parallel=args.parallel, max_workers=args.workers)
+    tester.session.close()
+    if tester.recorder:
+        tester.recorder.close()
+        print(f"📼 {tester.recorder.records} requests recorded to {args.record}")
+    export_metrics(tester.metrics, args, 'backend_test')
     
     # Return appropriate exit code
     if results['failed_tests'] == 0:
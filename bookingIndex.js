@@ -0,0 +1,137 @@
+// OKU Transport System - per-driver booking interval index
+// Active bookings of one driver kept sorted by start, with a running maximum of end times,
+// so "does [start, end) collide with anything" is one binary search. The overlap test is the
+// same as the SQL conflict predicate NOT (end <= start_datetime OR start >= end_datetime),
+// including for empty or reversed intervals. Times are milliseconds of MySQL wall-clock time.
+
+const WALL_CLOCK = /^(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2})(:\d{2})?/;
+
+// Convert a DATETIME read through mysql2 (timezone 'Z') or a 'YYYY-MM-DD HH:MM[:SS]' string to ms
+const toMillis = (value) => {
+  if (value instanceof Date) {
+    return isNaN(value) ? null : value.getTime();
+  }
+  const match = typeof value === 'string' && WALL_CLOCK.exec(value);
+  if (!match) {
+    return null;
+  }
+  const millis = Date.parse(`${match[1]}T${match[2]}${match[3] || ':00'}Z`);
+  return isNaN(millis) ? null : millis;
+};
+
+const toWallClock = (millis) => new Date(millis).toISOString().slice(0, 19).replace('T', ' ');
+
+class DriverIntervals {
+  // bookings: [{ id, start, end }] in any order
+  constructor(bookings = []) {
+    const sorted = [...bookings].sort((a, b) => a.start - b.start);
+    this.ids = sorted.map(booking => booking.id);
+    this.starts = sorted.map(booking => booking.start);
+    this.ends = sorted.map(booking => booking.end);
+    this.maxEnds = [];
+    this.refreshMaxEnds(0);
+  }
+
+  get size() {
+    return this.ids.length;
+  }
+
+  // maxEnds[i] = largest end among intervals 0..i; non-decreasing, so it can be bisected too
+  refreshMaxEnds(from) {
+    this.maxEnds.length = this.ends.length;
+    for (let i = from; i < this.ends.length; i++) {
+      this.maxEnds[i] = i === 0 ? this.ends[0] : Math.max(this.maxEnds[i - 1], this.ends[i]);
+    }
+  }
+
+  // Index of the first entry of a non-decreasing array that is >= value (or > value when strict)
+  static bisect(values, value, strict = false) {
+    let low = 0;
+    let high = values.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (values[mid] < value || (strict && values[mid] === value)) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+    return low;
+  }
+
+  // O(n) for the splice; a driver only has hundreds of active bookings
+  add(id, start, end) {
+    const index = DriverIntervals.bisect(this.starts, start, true);
+    this.ids.splice(index, 0, id);
+    this.starts.splice(index, 0, start);
+    this.ends.splice(index, 0, end);
+    this.refreshMaxEnds(index);
+  }
+
+  remove(id) {
+    const index = this.ids.indexOf(id);
+    if (index === -1) {
+      return false;
+    }
+    this.ids.splice(index, 1);
+    this.starts.splice(index, 1);
+    this.ends.splice(index, 1);
+    this.refreshMaxEnds(index);
+    return true;
+  }
+
+  // Every interval starting before end is a candidate; one of them collides iff the
+  // largest end among them is after start. O(log n)
+  overlaps(start, end) {
+    const last = DriverIntervals.bisect(this.starts, end) - 1;
+    return last >= 0 && this.maxEnds[last] > start;
+  }
+
+  // Ids of the colliding intervals, walking back only while a collision is still possible
+  conflicts(start, end) {
+    const ids = [];
+    for (let i = DriverIntervals.bisect(this.starts, end) - 1; i >= 0 && this.maxEnds[i] > start; i--) {
+      if (this.ends[i] > start) {
+        ids.push(this.ids[i]);
+      }
+    }
+    return ids;
+  }
+
+  // Merged busy periods and the gaps between them, clipped to [from, to). Empty or reversed
+  // intervals take up no time here even though overlaps() counts them, as the SQL predicate does
+  slots(from, to) {
+    const busy = [];
+    const free = [];
+    if (to <= from) {
+      return { busy, free };
+    }
+    let cursor = from;
+    const first = DriverIntervals.bisect(this.maxEnds, from, true);
+    const last = DriverIntervals.bisect(this.starts, to);
+    for (let i = first; i < last; i++) {
+      if (this.ends[i] <= from || this.ends[i] <= this.starts[i]) {
+        continue;
+      }
+      const start = Math.max(this.starts[i], from);
+      const end = Math.min(this.ends[i], to);
+      if (busy.length > 0 && start <= cursor) {
+        const previous = busy[busy.length - 1];
+        previous.end = Math.max(previous.end, end);
+        cursor = previous.end;
+        continue;
+      }
+      if (start > cursor) {
+        free.push({ start: cursor, end: start });
+      }
+      busy.push({ start, end });
+      cursor = end;
+    }
+    if (cursor < to) {
+      free.push({ start: cursor, end: to });
+    }
+    return { busy, free };
+  }
+}
+
+module.exports = { DriverIntervals, toMillis, toWallClock };
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Booking Interval Index Verifier
+Differential test of bookingIndex.js against the SQL conflict predicate over
+millions of random booking intervals, and over a stream of booking holds,
+inserts and status changes applied incrementally the way server.js does, and a
+benchmark of the index against the tbbook range query it replaces
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from seed_data import weighted_choice
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_TIME = datetime(2026, 1, 1)
+DAY_S = 24 * 60 * 60
+
+# Booking shapes as (name, weight, (min, max) duration in seconds); the degenerate ones are
+# there because the index must agree with the SQL predicate on any rows tbbook could hold
+INTERVAL_SHAPES = [
+    ('one_time', 0.70, (30 * 60, 4 * 60 * 60)),
+    ('daily', 0.15, (8 * 60 * 60, 12 * 60 * 60)),
+    ('monthly', 0.10, (7 * DAY_S, 31 * DAY_S)),
+    ('empty', 0.03, (0, 0)),
+    ('reversed', 0.02, (-4 * 60 * 60, -60))
+]
+QUERY_SHAPES = [
+    ('slot', 0.80, (30 * 60, 4 * 60 * 60)),
+    ('week', 0.15, (7 * DAY_S, 7 * DAY_S)),
+    ('empty', 0.05, (0, 0))
+]
+
+# The conflict check POST /api/bookings ran before the index, against a scratch copy of tbbook
+SQL_CONFLICT = """
+    SELECT id FROM booking_index_check
+    WHERE driver_id = %s
+      AND status IN ('pending', 'approved', 'in_progress')
+      AND NOT (%s <= start_datetime OR %s >= end_datetime)
+"""
+
+# Loads both files into bookingIndex.js and answers every query; timings cover only the index
+NODE_RUNNER = r"""
+const fs = require('fs');
+const [indexPath, intervalsPath, queriesPath] = process.argv.slice(1);
+const { DriverIntervals } = require(indexPath);
+const rows = (path) => fs.readFileSync(path, 'utf8').split('\n').filter(Boolean).map(line => line.split(',').map(Number));
+
+const byDriver = new Map();
+rows(intervalsPath).forEach(([driver, start, end], id) => {
+  if (!byDriver.has(driver)) byDriver.set(driver, []);
+  byDriver.get(driver).push({ id, start, end });
+});
+let clock = process.hrtime.bigint();
+const indexes = new Map();
+for (const [driver, bookings] of byDriver) indexes.set(driver, new DriverIntervals(bookings));
+const buildNs = Number(process.hrtime.bigint() - clock);
+
+const queries = rows(queriesPath);
+const empty = new DriverIntervals();
+const overlaps = new Array(queries.length);
+clock = process.hrtime.bigint();
+queries.forEach(([driver, start, end], i) => {
+  overlaps[i] = (indexes.get(driver) || empty).overlaps(start, end) ? 1 : 0;
+});
+const overlapNs = Number(process.hrtime.bigint() - clock);
+
+clock = process.hrtime.bigint();
+const slots = queries.map(([driver, start, end]) => (indexes.get(driver) || empty).slots(start, end).free);
+const slotNs = Number(process.hrtime.bigint() - clock);
+
+process.stdout.write(JSON.stringify({
+  build_ms: buildNs / 1e6, overlap_ns: overlapNs, slot_ns: slotNs,
+  overlaps: overlaps.join(''), free: slots.map(free => free.map(slot => [slot.start, slot.end]))
+}));
+"""
+
+# Replays an operation log against live indexes: a,driver,id,start,end adds, r,driver,id removes
+# and q,driver,0,start,end queries. Negative ids are in-flight holds, kept as Symbols like
+# server.js does, so a hold can never be confused with a booking id
+OPS_RUNNER = r"""
+const fs = require('fs');
+const [indexPath, opsPath] = process.argv.slice(1);
+const { DriverIntervals } = require(indexPath);
+const indexes = new Map();
+const holds = new Map();
+const fileId = (id) => typeof id === 'symbol' ? Number(id.description) : id;
+
+const results = [];
+const clock = process.hrtime.bigint();
+for (const line of fs.readFileSync(opsPath, 'utf8').split('\n')) {
+  if (!line) continue;
+  const [op, ...fields] = line.split(',');
+  const [driver, id, start, end] = fields.map(Number);
+  if (!indexes.has(driver)) indexes.set(driver, new DriverIntervals());
+  const index = indexes.get(driver);
+  if (id < 0 && !holds.has(id)) holds.set(id, Symbol(String(id)));
+  const key = id < 0 ? holds.get(id) : id;
+  if (op === 'a') {
+    index.add(key, start, end);
+  } else if (op === 'r') {
+    results.push(index.remove(key) ? 1 : 0);
+  } else {
+    results.push([
+      index.overlaps(start, end) ? 1 : 0,
+      index.conflicts(start, end).map(fileId).sort((a, b) => a - b),
+      index.slots(start, end).free.map(slot => [slot.start, slot.end])
+    ]);
+  }
+}
+process.stdout.write(JSON.stringify({ ops_ns: Number(process.hrtime.bigint() - clock), results }));
+"""
+
+def to_millis(offset_s):
+    """Epoch ms of BASE_TIME + offset, read as UTC like mysql2 with timezone 'Z' does"""
+    return int((BASE_TIME - datetime(1970, 1, 1)).total_seconds() + offset_s) * 1000
+
+def to_datetime(millis):
+    return (datetime(1970, 1, 1) + timedelta(milliseconds=millis)).strftime('%Y-%m-%d %H:%M:%S')
+
+def sql_overlaps(intervals, start, end):
+    """The SQL predicate, row by row"""
+    return any(not (end <= s or start >= e) for s, e in intervals)
+
+def free_slots(intervals, start, end):
+    """Brute-force gaps in [start, end) left by the non-empty intervals"""
+    if end <= start:
+        return []
+    busy = sorted((max(s, start), min(e, end)) for s, e in intervals if s < e and s < end and e > start)
+    free = []
+    cursor = start
+    for s, e in busy:
+        if s > cursor:
+            free.append([cursor, s])
+        cursor = max(cursor, e)
+    if cursor < end:
+        free.append([cursor, end])
+    return free
+
+class BookingIndexVerifier(OKUTransportAPITester):
+    def __init__(self, seed=42):
+        super().__init__()
+        self.seed = seed
+
+    def generate(self, count, drivers, span_days, shapes):
+        """Yield (driver, start_ms, end_ms) with start uniform over span_days"""
+        rng = random.Random(self.seed + count)
+        weights = [((name, low, high), weight) for name, weight, (low, high) in shapes]
+        for _ in range(count):
+            _, low, high = weighted_choice(rng, weights)
+            start = rng.randrange(0, span_days * DAY_S)
+            yield rng.randrange(drivers), to_millis(start), to_millis(start + rng.randint(low, high))
+
+    def generate_queries(self, intervals, count, drivers, span_days, edge_share=0.3):
+        """Random queries, plus queries that start at an existing end, end at an existing start,
+        repeat an interval exactly or are empty at its end: the boundaries where <= vs < matters"""
+        rng = random.Random(self.seed - count)
+        random_queries = self.generate(count, drivers, span_days, QUERY_SHAPES)
+        for _ in range(count):
+            query = next(random_queries)
+            if rng.random() < edge_share:
+                driver, start, end = rng.choice(intervals)
+                length = rng.randint(1, 4 * 60 * 60) * 1000
+                query = rng.choice([
+                    (driver, end, end + length),
+                    (driver, start - length, start),
+                    (driver, start, end),
+                    (driver, end, end)
+                ])
+            yield query
+
+    def generate_operations(self, count, drivers, span_days):
+        """A booking lifecycle stream and the answers the SQL predicate gives at each query:
+        a conflict check then a hold for every booking attempt that is clear, holds released
+        when their INSERT returns (indexing the row unless it failed), status changes that
+        drop or re-index bookings, and availability queries"""
+        rng = random.Random(self.seed * 7 + count)
+        attempts = self.generate(count, drivers, span_days, INTERVAL_SHAPES)
+        # generate() seeds from its count, so a different count keeps the two streams independent
+        queries = self.generate(count + 1, drivers, span_days, QUERY_SHAPES)
+        active = {driver: {} for driver in range(drivers)}  # driver -> {id: (start, end)}, holds included
+        holds = []
+        booked = []  # (driver, id) of indexed bookings
+        operations = []
+        expected = []
+        next_id, next_hold = 1, -1
+
+        def query(driver, start, end):
+            intervals = active[driver]
+            operations.append(('q', driver, 0, start, end))
+            expected.append([
+                int(sql_overlaps(intervals.values(), start, end)),
+                sorted(i for i, (s, e) in intervals.items() if not (end <= s or start >= e)),
+                free_slots(intervals.values(), start, end)
+            ])
+
+        for _ in range(count):
+            roll = rng.random()
+            if roll < 0.35:
+                driver, start, end = next(attempts)
+                query(driver, start, end)
+                if not expected[-1][0]:
+                    operations.append(('a', driver, next_hold, start, end))
+                    active[driver][next_hold] = (start, end)
+                    holds.append((driver, next_hold))
+                    next_hold -= 1
+            elif roll < 0.55 and holds:
+                driver, hold = holds.pop(rng.randrange(len(holds)))
+                start, end = active[driver].pop(hold)
+                operations.append(('r', driver, hold, 0, 0))
+                expected.append(1)
+                if rng.random() < 0.95:
+                    operations.append(('a', driver, next_id, start, end))
+                    active[driver][next_id] = (start, end)
+                    booked.append((driver, next_id))
+                    next_id += 1
+            elif roll < 0.70 and booked:
+                # updateBookingIndex: remove, then re-add only when the new status is still active
+                position = rng.randrange(len(booked))
+                driver, booking = booked[position]
+                operations.append(('r', driver, booking, 0, 0))
+                expected.append(1)
+                if rng.random() < 0.3:
+                    start, end = active[driver][booking]
+                    operations.append(('a', driver, booking, start, end))
+                else:
+                    del active[driver][booking]
+                    booked[position] = booked[-1]
+                    booked.pop()
+            elif roll < 0.72:
+                # A status change for a booking this index never held
+                operations.append(('r', rng.randrange(drivers), next_id + rng.randrange(1000), 0, 0))
+                expected.append(0)
+            else:
+                query(*next(queries))
+        return operations, expected
+
+    def run_operations(self, operations):
+        node = shutil.which('node')
+        if not node:
+            return None
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'operations.csv')
+            with open(path, 'w') as handle:
+                handle.writelines(",".join(map(str, operation)) + "\n" for operation in operations)
+            output = subprocess.run(
+                [node, '-e', OPS_RUNNER, os.path.join(REPO_DIR, 'bookingIndex.js'), path],
+                check=True, capture_output=True, text=True
+            ).stdout
+        return json.loads(output)
+
+    def run_incremental(self, operation_count, drivers, span_days):
+        """Differential check of add/remove/hold sequences against the SQL predicate"""
+        operations, expected = self.generate_operations(operation_count, drivers, span_days)
+        print(f"\n🔁 Replaying {len(operations):,} incremental operations over {drivers:,} drivers...")
+        result = self.run_operations(operations)
+        if result is None:
+            return self.log_test("Incremental Index Run", False, "node is not on PATH")
+
+        result_ops = [operation for operation in operations if operation[0] != 'a']
+        misses = [i for i, (got, want) in enumerate(zip(result['results'], expected)) if got != want]
+        for i in misses[:5]:
+            op, driver, booking, start, end = result_ops[i]
+            print(f"   {op} driver {driver} id {booking} {to_datetime(start)} - {to_datetime(end)}: "
+                  f"index {result['results'][i]}, SQL {expected[i]}")
+        self.log_test("Incremental Index Matches SQL", not misses and len(result['results']) == len(expected),
+                      f"{len(expected) - len(misses):,}/{len(expected):,} removes and queries agree")
+        return {
+            'operations': len(operations),
+            'drivers': drivers,
+            'index_op_us': round(result['ops_ns'] / len(operations) / 1000, 3)
+        }
+
+    def run_index(self, intervals_path, queries_path):
+        node = shutil.which('node')
+        if not node:
+            return None
+        output = subprocess.run(
+            [node, '-e', NODE_RUNNER, os.path.join(REPO_DIR, 'bookingIndex.js'), intervals_path, queries_path],
+            check=True, capture_output=True, text=True
+        ).stdout
+        return json.loads(output)
+
+    def check_sql(self, intervals, queries, answers, sample):
+        """Run the literal SQL predicate on a temporary table for the first sample queries"""
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("""CREATE TEMPORARY TABLE booking_index_check (
+                                  id INT PRIMARY KEY, driver_id INT NOT NULL, status VARCHAR(20) NOT NULL,
+                                  start_datetime DATETIME NOT NULL, end_datetime DATETIME NOT NULL,
+                                  INDEX idx_driver_time (driver_id, start_datetime, end_datetime))""")
+            rows = [(i, driver, 'approved', to_datetime(start), to_datetime(end))
+                    for i, (driver, start, end) in enumerate(intervals)]
+            for offset in range(0, len(rows), 5000):
+                cursor.executemany(
+                    "INSERT INTO booking_index_check (id, driver_id, status, start_datetime, end_datetime) "
+                    "VALUES (%s, %s, %s, %s, %s)", rows[offset:offset + 5000])
+            connection.commit()
+
+            latencies = []
+            mismatches = 0
+            for (driver, start, end), answer in list(zip(queries, answers))[:sample]:
+                began = time.perf_counter()
+                cursor.execute(SQL_CONFLICT, (driver, to_datetime(end), to_datetime(start)))
+                found = bool(cursor.fetchall())
+                latencies.append(round((time.perf_counter() - began) * 1000, 3))
+                mismatches += found != answer
+            cursor.close()
+            return latency_stats(latencies), mismatches
+        finally:
+            connection.close()
+
+    def run(self, interval_count, drivers, query_count, span_days, sql_sample, operation_count, operation_drivers):
+        print("=" * 80)
+        print("🧮 OKU TRANSPORT SYSTEM - BOOKING INTERVAL INDEX VERIFIER")
+        print("=" * 80)
+
+        intervals = list(self.generate(interval_count, drivers, span_days, INTERVAL_SHAPES))
+        queries = list(self.generate_queries(intervals, query_count, drivers, span_days))
+        print(f"Generated {len(intervals):,} intervals over {drivers:,} drivers and {len(queries):,} queries")
+
+        with tempfile.TemporaryDirectory() as workdir:
+            paths = []
+            for name, rows in (('intervals.csv', intervals), ('queries.csv', queries)):
+                path = os.path.join(workdir, name)
+                with open(path, 'w') as handle:
+                    handle.writelines(f"{driver},{start},{end}\n" for driver, start, end in rows)
+                paths.append(path)
+            result = self.run_index(*paths)
+        if result is None:
+            return self.log_test("Interval Index Run", False, "node is not on PATH")
+
+        by_driver = {}
+        for driver, start, end in intervals:
+            by_driver.setdefault(driver, []).append((start, end))
+
+        answers = [flag == '1' for flag in result['overlaps']]
+        overlap_misses = []
+        slot_misses = []
+        started = time.perf_counter()
+        for i, (driver, start, end) in enumerate(queries):
+            bookings = by_driver.get(driver, [])
+            if answers[i] != sql_overlaps(bookings, start, end):
+                overlap_misses.append(i)
+            if result['free'][i] != free_slots(bookings, start, end):
+                slot_misses.append(i)
+        oracle_s = time.perf_counter() - started
+
+        for i in (overlap_misses + slot_misses)[:5]:
+            print(f"   query {i}: driver {queries[i][0]}, {to_datetime(queries[i][1])} - {to_datetime(queries[i][2])}")
+        self.log_test("Index Matches SQL Predicate", not overlap_misses,
+                      f"{len(queries) - len(overlap_misses):,}/{len(queries):,} overlap answers agree")
+        self.log_test("Free Slots Match Brute Force", not slot_misses,
+                      f"{len(queries) - len(slot_misses):,}/{len(queries):,} free-slot lists agree")
+
+        overlap_us = result['overlap_ns'] / len(queries) / 1000
+        slot_us = result['slot_ns'] / len(queries) / 1000
+        report = {
+            'intervals': len(intervals),
+            'drivers': drivers,
+            'queries': len(queries),
+            'index_build_ms': round(result['build_ms'], 1),
+            'index_overlap_us': round(overlap_us, 3),
+            'index_slots_us': round(slot_us, 3),
+            'python_oracle_s': round(oracle_s, 2)
+        }
+        print("\n⏱️  BENCHMARK:")
+        print(f"   index build: {report['index_build_ms']}ms for {len(intervals):,} intervals")
+        print(f"   index overlap check: {overlap_us:.3f}µs/query, free slots: {slot_us:.3f}µs/query")
+
+        if sql_sample:
+            sql_stats, sql_mismatches = self.check_sql(intervals, queries, answers, sql_sample)
+            report['sql_conflict_query'] = sql_stats
+            self.log_test("Index Matches MySQL", sql_mismatches == 0,
+                          f"{sql_stats['count'] - sql_mismatches:,}/{sql_stats['count']:,} answers agree with the literal query")
+            print(f"   SQL conflict query: p50 {sql_stats['p50_ms']}ms, p95 {sql_stats['p95_ms']}ms "
+                  f"({sql_stats['p50_ms'] * 1000 / overlap_us:,.0f}x the index at p50)")
+
+        if operation_count:
+            report['incremental'] = self.run_incremental(operation_count, operation_drivers, span_days)
+        return report
+
+def main():
+    """Main verifier execution"""
+    parser = argparse.ArgumentParser(description="Differential test and benchmark of the booking interval index")
+    parser.add_argument('--intervals', type=int, default=1000000, help="Random bookings to index")
+    parser.add_argument('--drivers', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=50000)
+    parser.add_argument('--span-days', type=int, default=365, help="Range the booking starts fall in")
+    parser.add_argument('--sql-sample', type=int, default=0,
+                        help="Also run the SQL predicate in MySQL for this many queries (0 skips MySQL)")
+    parser.add_argument('--operations', type=int, default=200000,
+                        help="Incremental hold/insert/status-change steps to replay (0 skips them)")
+    parser.add_argument('--operation-drivers', type=int, default=50,
+                        help="Drivers the incremental steps spread over; few, so bookings collide")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the benchmark report to this JSON file")
+    args = parser.parse_args()
+
+    verifier = BookingIndexVerifier(seed=args.seed)
+    report = verifier.run(args.intervals, args.drivers, args.queries, args.span_days, args.sql_sample,
+                          args.operations, args.operation_drivers)
+    verifier.session.close()
+
+    if args.output and report:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+    failed = verifier.tests_run - verifier.tests_passed
+    if failed == 0:
+        print("\n🎉 Interval index agrees with SQL!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
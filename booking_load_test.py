@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Booking Load Test
+Fires many overlapping bookings at one driver concurrently and verifies that
+the conflict check in POST /api/bookings never lets a double-booking through
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+ACTIVE_STATUSES = ('pending', 'approved', 'in_progress')
+
+class BookingLoadTester(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=100):
+        super().__init__(base_url, pool_size=concurrency)
+        self.concurrency = concurrency
+        self.admin = None
+        self.driver = None
+        self.oku_users = []
+
+    def setup_fixtures(self, oku_count):
+        """Provision an admin, an approved driver and OKU users assigned to it"""
+        print("\n🔧 Provisioning load test users...")
+
+        self.admin = self.provision_user("Company Admin", "load_admin")
+        if not self.admin:
+            return self.log_test("Load Fixtures", False, "Could not provision admin user")
+
+        self.driver = self.provision_user("Driver", "load_driver", admin_token=self.admin['token'])
+        if not self.driver:
+            return self.log_test("Load Fixtures", False, "Could not provision approved driver")
+
+        for _ in range(oku_count):
+            oku = self.provision_user("OKU User", "load_oku")
+            if not oku:
+                continue
+
+            assignment = {
+                "oku_id": oku['id'],
+                "driver_id": self.driver['id'],
+                "effective_from": datetime.now().strftime('%Y-%m-%d'),
+                "effective_to": (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d'),
+                "notes": "Load test assignment"
+            }
+            response, _ = self.send_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+            if response is not None and response.status_code == 200:
+                self.oku_users.append(oku)
+
+        return self.log_test(
+            "Load Fixtures",
+            len(self.oku_users) > 0,
+            f"Driver {self.driver['id']} with {len(self.oku_users)}/{oku_count} assigned OKU users"
+        )
+
+    def build_booking(self, window_start, jitter_minutes):
+        """Build a 2 hour booking that overlaps every other booking in the window"""
+        # All bookings share the centre of the window, so any two of them overlap
+        start = window_start + timedelta(minutes=random.randint(0, jitter_minutes))
+        end = window_start + timedelta(hours=2, minutes=random.randint(0, jitter_minutes))
+        return {
+            "driver_id": self.driver['id'],
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": end.strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Load Test Pickup",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Load Test Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Load test",
+            "special_instructions": "Concurrent conflict check"
+        }
+
+    def fire_bookings(self, total_requests, jitter_minutes=60):
+        """Send overlapping bookings from a thread pool released at the same instant"""
+        print(f"\n🔥 Firing {total_requests} overlapping bookings with {self.concurrency} workers...")
+
+        window_start = (datetime.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+        jobs = [
+            (self.oku_users[i % len(self.oku_users)], self.build_booking(window_start, jitter_minutes))
+            for i in range(total_requests)
+        ]
+        start_gate = threading.Event()
+
+        def worker(job):
+            oku, booking = job
+            start_gate.wait()
+            _, timing = self.send_request('POST', 'api/bookings', booking, token=oku['token'])
+            return timing
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(worker, job) for job in jobs]
+            started = time.perf_counter()
+            start_gate.set()
+            timings = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+
+        return timings, elapsed
+
+    def count_double_bookings(self):
+        """Count overlapping active booking pairs for the load driver in tbbook"""
+        placeholders = ', '.join(['%s'] * len(ACTIVE_STATUSES))
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"""SELECT COUNT(*) FROM tbbook
+                    WHERE driver_id = %s AND status IN ({placeholders})""",
+                (self.driver['id'], *ACTIVE_STATUSES)
+            )
+            active_rows = cursor.fetchone()[0]
+
+            cursor.execute(
+                f"""SELECT COUNT(*) FROM tbbook a
+                    JOIN tbbook b ON a.driver_id = b.driver_id AND a.id < b.id
+                    WHERE a.driver_id = %s
+                      AND a.status IN ({placeholders})
+                      AND b.status IN ({placeholders})
+                      AND NOT (a.end_datetime <= b.start_datetime OR a.start_datetime >= b.end_datetime)""",
+                (self.driver['id'], *ACTIVE_STATUSES, *ACTIVE_STATUSES)
+            )
+            overlapping_pairs = cursor.fetchone()[0]
+            cursor.close()
+            return active_rows, overlapping_pairs
+        finally:
+            connection.close()
+
+    def run_load(self, total_requests, oku_count):
+        """Run the booking load test and report throughput, latency and conflicts"""
+        print("=" * 80)
+        print("🚐 OKU TRANSPORT SYSTEM - BOOKING CONFLICT LOAD TEST")
+        print("=" * 80)
+
+        if not self.setup_fixtures(oku_count):
+            return None
+
+        timings, elapsed = self.fire_bookings(total_requests)
+
+        status_counts = {}
+        for timing in timings:
+            key = timing['status_code'] if timing['status_code'] is not None else 'error'
+            status_counts[key] = status_counts.get(key, 0) + 1
+
+        accepted = status_counts.get(200, 0)
+        rejected = status_counts.get(409, 0)
+        errors = total_requests - accepted - rejected
+        stats = latency_stats([t['latency_ms'] for t in timings])
+        throughput = total_requests / elapsed if elapsed > 0 else 0
+
+        print("\n📊 BOOKING LOAD SUMMARY")
+        print(f"Requests: {total_requests} in {elapsed:.2f}s ({throughput:.1f} req/s)")
+        print(f"Status codes: {status_counts}")
+        print(f"Latency: p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, "
+              f"p99 {stats['p99_ms']}ms, max {stats['max_ms']}ms")
+
+        self.log_test("Booking Load Errors", errors == 0, f"{errors} requests neither accepted nor rejected with 409")
+        self.log_test("Booking Load Acceptance", accepted == 1, f"{accepted} of {total_requests} overlapping bookings accepted")
+
+        try:
+            active_rows, overlapping_pairs = self.count_double_bookings()
+            self.log_test(
+                "Booking Double-Booking Check",
+                overlapping_pairs == 0,
+                f"{active_rows} active rows in tbbook, {overlapping_pairs} overlapping pairs"
+            )
+        except Exception as e:
+            overlapping_pairs = None
+            self.log_test("Booking Double-Booking Check", False, f"Database verification failed: {str(e)}")
+
+        return {
+            'requests': total_requests,
+            'concurrency': self.concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(throughput, 2),
+            'status_counts': status_counts,
+            'latency': stats,
+            'accepted': accepted,
+            'double_bookings': overlapping_pairs,
+            'results': self.test_results
+        }
+
+def main():
+    """Main load test execution"""
+    parser = argparse.ArgumentParser(description="Concurrent booking conflict load test")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--requests', type=int, default=500, help="Overlapping bookings to send")
+    parser.add_argument('--concurrency', type=int, default=100, help="Worker threads")
+    parser.add_argument('--oku-users', type=int, default=5, help="OKU users assigned to the driver")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    tester = BookingLoadTester(args.base_url, concurrency=args.concurrency)
+    results = tester.run_load(args.requests, args.oku_users)
+    tester.session.close()
+    export_metrics(tester.metrics, args, 'booking_load_test')
+
+    if results and tester.tests_run == tester.tests_passed:
+        print("\n🎉 No double-bookings detected!")
+        return 0
+    else:
+        print(f"\n⚠️  {tester.tests_run - tester.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
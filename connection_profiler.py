@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Database Connection Churn Profiler
+Drives each endpoint through the API tester while sampling MySQL
+SHOW GLOBAL STATUS to report connections opened per request, estimated
+connection setup time and connections leaked by early-return paths
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+STATUS_VARIABLES = ('Threads_connected', 'Connections', 'Aborted_clients')
+
+class StatusSampler:
+    """Samples SHOW GLOBAL STATUS over one long-lived connection"""
+
+    def __init__(self, interval_s=0.1):
+        self.interval_s = interval_s
+        # Opened once up front so the profiler's own connection never shows up in deltas
+        self.connection = get_db_connection()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.peak_threads = 0
+        self.thread = None
+
+    def read(self):
+        placeholders = ', '.join(['%s'] * len(STATUS_VARIABLES))
+        with self.lock:
+            cursor = self.connection.cursor()
+            cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})", STATUS_VARIABLES)
+            status = {name: int(value) for name, value in cursor.fetchall()}
+            cursor.close()
+        return status
+
+    def sample_loop(self):
+        while not self.stop_event.wait(self.interval_s):
+            self.peak_threads = max(self.peak_threads, self.read()['Threads_connected'])
+
+    def start(self):
+        self.peak_threads = self.read()['Threads_connected']
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        return self.peak_threads
+
+    def close(self):
+        self.connection.close()
+
+class ConnectionProfiler(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=10):
+        super().__init__(base_url, pool_size=concurrency)
+        self.concurrency = concurrency
+        self.admin = None
+        self.driver = None
+        self.oku = None
+        self.booked = None
+
+    def setup_fixtures(self):
+        """Provision users, an assignment and one booking to conflict with"""
+        print("\n🔧 Provisioning profiler fixtures...")
+
+        self.admin = self.provision_user("Company Admin", "conn_admin")
+        if self.admin:
+            self.driver = self.provision_user("Driver", "conn_driver", admin_token=self.admin['token'])
+            self.oku = self.provision_user("OKU User", "conn_oku")
+        if not (self.admin and self.driver and self.oku):
+            return self.log_test("Profiler Fixtures", False, "Could not provision admin, driver and OKU user")
+
+        assignment = {
+            "oku_id": self.oku['id'],
+            "driver_id": self.driver['id'],
+            "effective_from": datetime.now().strftime('%Y-%m-%d'),
+            "effective_to": (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d'),
+            "notes": "Connection profiler assignment"
+        }
+        self.send_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+
+        start = datetime.now() + timedelta(days=5)
+        self.booked = {
+            "driver_id": self.driver['id'],
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (start + timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Profiler Pickup",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Profiler Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Connection profiling",
+            "special_instructions": ""
+        }
+        response, _ = self.send_request('POST', 'api/bookings', self.booked, token=self.oku['token'])
+        return self.log_test(
+            "Profiler Fixtures",
+            response is not None and response.status_code == 200,
+            f"Driver {self.driver['id']} booked by OKU user {self.oku['id']}"
+        )
+
+    def scenarios(self):
+        """Return [(name, method, endpoint, data, token, expected_status)], including early-return paths"""
+        unassigned = dict(self.booked, driver_id=self.admin['id'])
+        return [
+            ('profile', 'GET', 'api/profile', None, self.oku['token'], 200),
+            ('gps_latest', 'GET', 'api/gps/latest', None, self.oku['token'], 200),
+            ('gps_update', 'POST', 'api/gps/update', {"lat": 5.3307, "lng": 103.1324, "speed": 30.0,
+                                                      "heading": 90.0, "accuracy": 5.0, "booking_id": None},
+             self.driver['token'], 200),
+            ('login_invalid_401', 'POST', 'api/login', {"email": "nonexistent@example.com", "password": "x"}, '', 401),
+            ('register_duplicate_400', 'POST', 'api/register', {
+                "name": "Duplicate", "email": self.oku['email'], "phone": "0123456789",
+                "password": "password123", "userType": "OKU User"
+            }, '', 400),
+            ('booking_no_assignment_400', 'POST', 'api/bookings', unassigned, self.oku['token'], 400),
+            ('booking_conflict_409', 'POST', 'api/bookings', self.booked, self.oku['token'], 409)
+        ]
+
+    def measure_connect_cost(self, samples=20):
+        """Time a fresh MySQL connect + SELECT 1, mirroring getDbConnection, from this host"""
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            connection = get_db_connection()
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            timings.append(round((time.perf_counter() - start) * 1000, 3))
+            cursor.close()
+            connection.close()
+        return latency_stats(timings)
+
+    def profile_endpoint(self, sampler, scenario, requests_per_endpoint, settle_s):
+        """Run one endpoint under load and diff the global status counters"""
+        name, method, endpoint, data, token, expected = scenario
+        before = sampler.read()
+        sampler.start()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            timings = list(executor.map(
+                lambda _: self.send_request(method, endpoint, data, token=token)[1],
+                range(requests_per_endpoint)
+            ))
+
+        # Let properly closed connections finish closing before reading Threads_connected
+        time.sleep(settle_s)
+        peak = sampler.stop()
+        after = sampler.read()
+
+        unexpected = sum(1 for t in timings if t['status_code'] != expected)
+        opened = after['Connections'] - before['Connections']
+        return {
+            'endpoint': f"{method} /{endpoint}",
+            'expected_status': expected,
+            'requests': requests_per_endpoint,
+            'unexpected_status': unexpected,
+            'connections_opened': opened,
+            'connections_per_request': round(opened / requests_per_endpoint, 3),
+            'leaked_connections': after['Threads_connected'] - before['Threads_connected'],
+            'peak_threads_connected': peak,
+            'aborted_clients': after['Aborted_clients'] - before['Aborted_clients'],
+            'latency': latency_stats([t['latency_ms'] for t in timings])
+        }
+
+    def run_profile(self, requests_per_endpoint, settle_s):
+        """Profile every scenario and report connection churn and leaks"""
+        print("=" * 80)
+        print("🔌 OKU TRANSPORT SYSTEM - DATABASE CONNECTION CHURN PROFILER")
+        print("=" * 80)
+
+        if not self.setup_fixtures():
+            return None
+
+        connect_cost = self.measure_connect_cost()
+        print(f"\nFresh connect + SELECT 1: p50 {connect_cost['p50_ms']}ms, p95 {connect_cost['p95_ms']}ms")
+
+        sampler = StatusSampler()
+        report = {}
+        try:
+            for scenario in self.scenarios():
+                name = scenario[0]
+                result = self.profile_endpoint(sampler, scenario, requests_per_endpoint, settle_s)
+                setup_ms = result['connections_per_request'] * connect_cost['p50_ms']
+                result['estimated_setup_ms_per_request'] = round(setup_ms, 3)
+                p50 = result['latency'].get('p50_ms')
+                result['setup_share_of_p50'] = round(setup_ms / p50, 3) if p50 else None
+                report[name] = result
+
+                print(f"\n🔍 {name}: {result['endpoint']} -> {result['expected_status']}")
+                print(f"   connections/request {result['connections_per_request']}, "
+                      f"setup ~{result['estimated_setup_ms_per_request']}ms of p50 {p50}ms, "
+                      f"peak Threads_connected {result['peak_threads_connected']}, "
+                      f"leaked {result['leaked_connections']}, aborted {result['aborted_clients']}")
+
+                self.log_test(
+                    f"Connection Leak {name}",
+                    result['leaked_connections'] <= 0 and result['unexpected_status'] == 0,
+                    f"{result['leaked_connections']} connections left open after "
+                    f"{requests_per_endpoint} requests ({result['unexpected_status']} unexpected statuses)"
+                )
+        finally:
+            sampler.close()
+
+        return {'connect_cost': connect_cost, 'endpoints': report, 'results': self.test_results}
+
+def main():
+    """Main connection profiler execution"""
+    parser = argparse.ArgumentParser(description="Database connection churn profiler")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint")
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--settle', type=float, default=2.0, help="Seconds to wait before reading leaks")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    profiler = ConnectionProfiler(args.base_url, concurrency=args.concurrency)
+    results = profiler.run_profile(args.requests, args.settle)
+    profiler.session.close()
+    export_metrics(profiler.metrics, args, 'connection_profiler')
+
+    if results and profiler.tests_run == profiler.tests_passed:
+        print("\n🎉 No leaked connections!")
+        return 0
+    else:
+        print(f"\n⚠️  {profiler.tests_run - profiler.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
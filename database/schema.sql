@@ -33,7 +33,8 @@ CREATE TABLE IF NOT EXISTS tbuser (
   vehiclePhoto VARCHAR(255),
   
   createdAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-  updatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+  updatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  INDEX idx_created (createdAt)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- OKU accessibility profiles
@@ -96,6 +97,8 @@ CREATE TABLE IF NOT EXISTS tbbook (
   FOREIGN KEY (oku_id) REFERENCES tbuser(id) ON DELETE CASCADE,
   FOREIGN KEY (driver_id) REFERENCES tbuser(id) ON DELETE CASCADE,
   INDEX idx_driver_time (driver_id, start_datetime, end_datetime),
+  INDEX idx_oku_start (oku_id, start_datetime),
+  INDEX idx_start (start_datetime),
   INDEX idx_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
@@ -113,9 +116,50 @@ CREATE TABLE IF NOT EXISTS gps_tracking (
   FOREIGN KEY (driver_id) REFERENCES tbuser(id) ON DELETE CASCADE,
   FOREIGN KEY (booking_id) REFERENCES tbbook(id) ON DELETE SET NULL,
   INDEX idx_driver_time (driver_id, timestamp),
+  INDEX idx_timestamp (timestamp),
   INDEX idx_booking (booking_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Per-driver, per-minute rollups of gps_tracking fixes older than the raw
+-- retention window, written by gps_compaction.py. path is the simplified
+-- polyline as [[lat, lng, seconds_into_minute], ...]
+CREATE TABLE IF NOT EXISTS gps_tracks (
+  driver_id INT NOT NULL,
+  minute_start TIMESTAMP NOT NULL,
+  fix_count INT NOT NULL,
+  min_speed DECIMAL(6,2) DEFAULT NULL,
+  max_speed DECIMAL(6,2) DEFAULT NULL,
+  booking_id INT DEFAULT NULL,
+  path JSON NOT NULL,
+  PRIMARY KEY (driver_id, minute_start),
+  FOREIGN KEY (driver_id) REFERENCES tbuser(id) ON DELETE CASCADE,
+  INDEX idx_minute (minute_start)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Current position per driver, upserted by POST /api/gps/update and /api/gps/batch
+-- alongside the gps_tracking insert. gps_id is the gps_tracking row the position came
+-- from; back-dated batch fixes only replace it when their timestamp is newer
+CREATE TABLE IF NOT EXISTS gps_latest (
+  driver_id INT PRIMARY KEY,
+  gps_id INT NOT NULL,
+  booking_id INT DEFAULT NULL,
+  lat DECIMAL(10,8) NOT NULL,
+  lng DECIMAL(11,8) NOT NULL,
+  speed DECIMAL(6,2) DEFAULT NULL,
+  heading DECIMAL(6,2) DEFAULT NULL,
+  accuracy DECIMAL(8,2) DEFAULT NULL,
+  timestamp TIMESTAMP NOT NULL,
+  FOREIGN KEY (driver_id) REFERENCES tbuser(id) ON DELETE CASCADE,
+  INDEX idx_timestamp (timestamp)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Populate gps_latest from existing history (no-op on a fresh database)
+INSERT INTO gps_latest (driver_id, gps_id, booking_id, lat, lng, speed, heading, accuracy, timestamp)
+SELECT g.driver_id, g.id, g.booking_id, g.lat, g.lng, g.speed, g.heading, g.accuracy, g.timestamp
+FROM gps_tracking g
+JOIN (SELECT driver_id, MAX(id) AS id FROM gps_tracking GROUP BY driver_id) newest ON g.id = newest.id
+ON DUPLICATE KEY UPDATE gps_latest.gps_id = gps_latest.gps_id;
+
 -- Driver ratings and feedback
 CREATE TABLE IF NOT EXISTS ratings (
   id INT AUTO_INCREMENT PRIMARY KEY,
@@ -167,4 +211,26 @@ INSERT INTO system_settings (setting_key, setting_value, description) VALUES
 ('default_booking_duration', '120', 'Default booking duration in minutes'),
 ('gps_update_interval', '10', 'GPS update interval in seconds'),
 ('rating_required_monthly', 'true', 'Require monthly ratings from JKM')
-ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value);
\ No newline at end of file
+ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value);
+-- Indexes added after tables were first created. CREATE TABLE IF NOT EXISTS leaves
+-- existing tables alone and MySQL has no ADD INDEX IF NOT EXISTS, so each index is
+-- added only when information_schema does not list it yet
+SET @ddl = (SELECT IF(COUNT(*) = 0, 'ALTER TABLE tbuser ADD INDEX idx_created (createdAt)', 'DO 0')
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'tbuser' AND index_name = 'idx_created');
+PREPARE migration FROM @ddl; EXECUTE migration; DEALLOCATE PREPARE migration;
+
+SET @ddl = (SELECT IF(COUNT(*) = 0, 'ALTER TABLE tbbook ADD INDEX idx_oku_start (oku_id, start_datetime)', 'DO 0')
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'tbbook' AND index_name = 'idx_oku_start');
+PREPARE migration FROM @ddl; EXECUTE migration; DEALLOCATE PREPARE migration;
+
+SET @ddl = (SELECT IF(COUNT(*) = 0, 'ALTER TABLE tbbook ADD INDEX idx_start (start_datetime)', 'DO 0')
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'tbbook' AND index_name = 'idx_start');
+PREPARE migration FROM @ddl; EXECUTE migration; DEALLOCATE PREPARE migration;
+
+SET @ddl = (SELECT IF(COUNT(*) = 0, 'ALTER TABLE gps_tracking ADD INDEX idx_timestamp (timestamp)', 'DO 0')
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'gps_tracking' AND index_name = 'idx_timestamp');
+PREPARE migration FROM @ddl; EXECUTE migration; DEALLOCATE PREPARE migration;
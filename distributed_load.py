@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Distributed Load Driver
+A coordinator forks N worker processes (or accepts workers from other hosts
+over a socket); each worker runs scenario mixes built from the backend_test.py
+test methods and the coordinator merges their metrics registries
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from multiprocessing.connection import Client, Listener
+
+from backend_test import OKUTransportAPITester
+from metrics import MetricsRegistry, add_metrics_arguments, export_metrics
+
+# Scenario name -> ordered test methods run by one fresh virtual user. Scenarios that book or
+# track start from provisioned accounts, since a self-registered driver stays pending and
+# cannot log in, and a booking needs an active assignment
+SCENARIOS = {
+    'journey': ['provision_accounts', 'assign_driver', 'test_booking_system', 'test_gps_tracking'],
+    'onboarding': ['test_user_registration', 'test_user_login', 'test_protected_profile_route'],
+    'browse': ['provision_accounts', 'test_assignment_system', 'test_driver_schedule'],
+    'auth_checks': ['test_invalid_login', 'test_protected_route_without_token', 'test_server_health']
+}
+
+class VirtualUser(OKUTransportAPITester):
+    """A tester that can start from an OKU user and an approved driver instead of registering"""
+
+    def __init__(self, base_url, admin):
+        super().__init__(base_url, pool_size=1)
+        self.admin = admin
+
+    def provision_accounts(self):
+        """Provision an OKU user and a driver approved with the worker's admin token"""
+        if not self.admin:
+            return self.log_test("Provision Accounts", False, "No admin token for approving drivers")
+        oku = self.provision_user("OKU User", "dist_oku")
+        driver = self.provision_user("Driver", "dist_driver", admin_token=self.admin['token'])
+        if not oku or not driver:
+            return self.log_test("Provision Accounts", False, "Could not provision OKU user and approved driver")
+        self.token, self.user_data = oku['token'], {'id': oku['id']}
+        self.driver_token, self.driver_data = driver['token'], {'id': driver['id']}
+        self.admin_token, self.admin_data = self.admin['token'], {'id': self.admin['id']}
+        return self.log_test("Provision Accounts", True, f"OKU user {oku['id']}, driver {driver['id']}")
+
+    def assign_driver(self):
+        """Assign the provisioned driver to the OKU user so bookings between them are allowed"""
+        if not self.user_data or not self.driver_data:
+            return self.log_test("Assign Driver", False, "No provisioned OKU user and driver")
+        assignment = {
+            "oku_id": self.user_data['id'],
+            "driver_id": self.driver_data['id'],
+            "effective_from": datetime.now().strftime('%Y-%m-%d'),
+            "effective_to": (datetime.now() + timedelta(days=30)).strftime('%Y-%m-%d'),
+            "notes": "Distributed load assignment"
+        }
+        response = self.make_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+        return self.log_test("Assign Driver", response is not None and response.status_code == 200,
+                             f"Status: {response.status_code if response is not None else 'No response'}")
+
+def parse_mix(mix):
+    """Parse 'journey:3,onboarding:1' into [(scenario, weight)]"""
+    weights = []
+    for entry in mix.split(','):
+        name, _, weight = entry.partition(':')
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {name}; choose from {sorted(SCENARIOS)}")
+        weights.append((name, float(weight or 1)))
+    return weights
+
+class LoadWorker:
+    """Runs virtual users on threads for a fixed duration and aggregates their results"""
+
+    def __init__(self, config, worker_id):
+        self.config = config
+        self.worker_id = worker_id
+        self.metrics = MetricsRegistry()
+        self.scenarios_run = {}
+        self.lock = threading.Lock()
+
+    def record(self, scenario, tester):
+        """Fold one virtual user's metrics into the worker totals"""
+        self.metrics.merge(tester.metrics)
+        with self.lock:
+            self.scenarios_run[scenario] = self.scenarios_run.get(scenario, 0) + 1
+
+    def virtual_user(self, thread_id, deadline, admin):
+        rng = random.Random(f"{self.config['seed']}-{self.worker_id}-{thread_id}")
+        names = [name for name, _ in self.config['mix']]
+        weights = [weight for _, weight in self.config['mix']]
+        while time.time() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            tester = VirtualUser(self.config['base_url'], admin)
+            for test in SCENARIOS[scenario]:
+                try:
+                    getattr(tester, test)()
+                except Exception as e:
+                    tester.log_test(test, False, f"Unexpected error: {str(e)}")
+            tester.session.close()
+            self.record(scenario, tester)
+
+    def run(self):
+        """Run the configured number of virtual users and return a mergeable result"""
+        deadline = time.time() + self.config['duration']
+        started = time.perf_counter()
+        # Per-request output from every virtual user would swamp the terminal
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            # One admin per worker approves its virtual users' drivers
+            setup = OKUTransportAPITester(self.config['base_url'], pool_size=1)
+            admin = setup.provision_user("Company Admin", f"dist_admin_{self.worker_id}")
+            setup.session.close()
+            threads = [
+                threading.Thread(target=self.virtual_user, args=(thread_id, deadline, admin))
+                for thread_id in range(self.config['users_per_worker'])
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        return {
+            'worker_id': self.worker_id,
+            'elapsed_s': time.perf_counter() - started,
+            'metrics': self.metrics.to_dict(),
+            'scenarios_run': self.scenarios_run
+        }
+
+def run_local_worker(config, worker_id, results):
+    """Entry point for forked worker processes"""
+    results.put(LoadWorker(config, worker_id).run())
+
+def run_remote_worker(address, authkey):
+    """Connect to a coordinator, run the config it sends and return the result"""
+    host, port = address.split(':')
+    with Client((host, int(port)), authkey=authkey) as connection:
+        config, worker_id = connection.recv()
+        print(f"Worker {worker_id} running for {config['duration']}s against {config['base_url']}")
+        connection.send(LoadWorker(config, worker_id).run())
+
+class LoadCoordinator:
+    def __init__(self, config):
+        self.config = config
+        self.metrics = MetricsRegistry()
+        self.scenarios_run = {}
+
+    def merge(self, result):
+        """Merge one worker result; histograms add bucket-wise so percentiles stay accurate"""
+        self.metrics.merge(MetricsRegistry.from_dict(result['metrics']))
+        for scenario, count in result['scenarios_run'].items():
+            self.scenarios_run[scenario] = self.scenarios_run.get(scenario, 0) + count
+
+    def run_local(self, workers):
+        """Fork worker processes on this host and collect their results"""
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=run_local_worker, args=(self.config, worker_id, results))
+            for worker_id in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        # Drain before joining so large results cannot block the queue feeder
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return collected
+
+    def run_remote(self, address, workers, authkey):
+        """Wait for workers on other hosts to connect, then run them together"""
+        host, port = address.split(':')
+        collected = []
+        with Listener((host, int(port)), authkey=authkey) as listener:
+            print(f"Waiting for {workers} workers on {address}...")
+            connections = [listener.accept() for _ in range(workers)]
+            for worker_id, connection in enumerate(connections):
+                connection.send((self.config, worker_id))
+            for connection in connections:
+                collected.append(connection.recv())
+                connection.close()
+        return collected
+
+    def report(self, collected):
+        """Merge worker results and print the combined report"""
+        for result in collected:
+            self.merge(result)
+        elapsed = max(result['elapsed_s'] for result in collected)
+
+        print("\n" + "=" * 80)
+        print("📊 DISTRIBUTED LOAD SUMMARY")
+        print("=" * 80)
+        total_requests = sum(histogram.count for histogram in self.metrics.requests.values())
+        print(f"Workers: {len(collected)}, duration {elapsed:.1f}s")
+        print(f"Scenarios run: {self.scenarios_run}")
+        print(f"Requests: {total_requests} ({total_requests / elapsed:.1f} req/s)")
+
+        print("\n⏱️  ENDPOINT LATENCY:")
+        endpoints = self.metrics.endpoint_summary()
+        for key, stats in sorted(endpoints.items()):
+            print(f"   {key}: {stats['count']} req ({stats['count'] / elapsed:.1f}/s), "
+                  f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms, max {stats['max_ms']}ms")
+
+        print("\n📋 CHECKS:")
+        for test, (passed, failed) in sorted(self.metrics.checks.items()):
+            print(f"   {'✅' if not failed else '❌'} {test}: {passed} passed, {failed} failed")
+
+        return {
+            'workers': len(collected),
+            'elapsed_s': round(elapsed, 3),
+            'requests': total_requests,
+            'requests_per_sec': round(total_requests / elapsed, 2) if elapsed > 0 else 0,
+            'endpoints': endpoints,
+            'checks': self.metrics.checks,
+            'scenarios_run': self.scenarios_run
+        }
+
+def main():
+    """Main distributed load execution"""
+    parser = argparse.ArgumentParser(description="Multi-process distributed load driver")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Worker processes (or remote workers to wait for)")
+    parser.add_argument('--users-per-worker', type=int, default=20, help="Virtual user threads per worker")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds each worker generates load")
+    parser.add_argument('--mix', default="journey:3,onboarding:2,browse:2,auth_checks:1", help="Weighted scenario mix")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--listen', help="host:port to accept remote workers instead of forking")
+    parser.add_argument('--connect', help="host:port of a coordinator to join as a worker")
+    parser.add_argument('--authkey', default="oku-load", help="Shared secret for remote workers")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    authkey = args.authkey.encode()
+    if args.connect:
+        run_remote_worker(args.connect, authkey)
+        return 0
+
+    config = {
+        'base_url': args.base_url,
+        'users_per_worker': args.users_per_worker,
+        'duration': args.duration,
+        'mix': parse_mix(args.mix),
+        'seed': args.seed
+    }
+
+    print("=" * 80)
+    print("🚐 OKU TRANSPORT SYSTEM - DISTRIBUTED LOAD DRIVER")
+    print("=" * 80)
+
+    coordinator = LoadCoordinator(config)
+    if args.listen:
+        collected = coordinator.run_remote(args.listen, args.workers, authkey)
+    else:
+        print(f"Forking {args.workers} workers x {args.users_per_worker} users for {args.duration}s")
+        collected = coordinator.run_local(args.workers)
+
+    results = coordinator.report(collected)
+    export_metrics(coordinator.metrics, args, 'distributed_load')
+    return 0 if all(failed == 0 for _, failed in results['checks'].values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Nearest Accessible Driver Matcher
+Keeps approved drivers' current positions (gps_latest) in a uniform lat/lng
+grid with vehicle features as bitmasks, and answers k-nearest-eligible queries
+for an OKU user's mobility needs with NumPy-vectorised haversine distances
+"""
+
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from backend_test import get_db_connection
+from seed_data import VEHICLE_FEATURES
+
+EARTH_RADIUS_KM = 6371.0088
+# ~1.1km cells: a pickup's own ring usually holds enough candidates in a dense city
+DEFAULT_CELL_DEG = 0.01
+# Features a mobility aid implies even when the profile's vehicle_features list omits them
+MOBILITY_AID_FEATURES = {
+    'wheelchair': ('wheelchair_accessible',),
+    'walker': (),
+    'crutches': (),
+    'none': ()
+}
+COL_OFFSET = 1 << 31
+MAX_RING_DEG = 1.0
+
+class FeatureCodec:
+    """Maps feature names to bits; names outside VEHICLE_FEATURES get the next free bit"""
+
+    def __init__(self, features=VEHICLE_FEATURES):
+        self.bits = {}
+        for feature in features:
+            self.bit(feature)
+
+    def bit(self, feature):
+        if feature not in self.bits:
+            if len(self.bits) >= 63:
+                raise ValueError("More than 63 distinct vehicle features")
+            self.bits[feature] = 1 << len(self.bits)
+        return self.bits[feature]
+
+    def encode(self, features):
+        """Bitmask for a JSON string, list or None"""
+        if isinstance(features, (str, bytes)):
+            features = json.loads(features)
+        mask = 0
+        for feature in features or ():
+            mask |= self.bit(feature)
+        return mask
+
+    def requirement(self, mobility_aid, vehicle_features):
+        """Bitmask a driver's vehicle must cover for this accessibility profile"""
+        return self.encode(vehicle_features) | self.encode(MOBILITY_AID_FEATURES.get(mobility_aid or 'none', ()))
+
+def haversine_km(lat, lng, lats, lngs):
+    """Distances from one point to arrays of points, all in radians"""
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class DriverIndex:
+    """Driver positions sorted by grid cell, so each cell is one contiguous slice of every array"""
+
+    def __init__(self, driver_ids, lats, lngs, masks, cell_deg=DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.ids = np.asarray(driver_ids, dtype=np.int64)
+        self.lat_deg = np.asarray(lats, dtype=np.float64)
+        self.lng_deg = np.asarray(lngs, dtype=np.float64)
+        self.masks = np.asarray(masks, dtype=np.int64)
+        self.rebuild()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rebuild(self):
+        """Re-sort every array by cell and rebuild the cell -> slice table"""
+        rows = np.floor(self.lat_deg / self.cell_deg).astype(np.int64)
+        cols = np.floor(self.lng_deg / self.cell_deg).astype(np.int64)
+        keys = (rows << 32) | (cols + COL_OFFSET)
+        order = np.argsort(keys, kind='stable')
+        self.ids, self.lat_deg, self.lng_deg, self.masks = (
+            self.ids[order], self.lat_deg[order], self.lng_deg[order], self.masks[order])
+        self.lat = np.radians(self.lat_deg)
+        self.lng = np.radians(self.lng_deg)
+        self.position = {driver_id: i for i, driver_id in enumerate(self.ids.tolist())}
+
+        keys = keys[order]
+        unique, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        self.cells = dict(zip(unique.tolist(), zip(starts.tolist(), (starts + counts).tolist())))
+        if len(self.ids):
+            self.row_range = (int(rows.min()), int(rows.max()))
+            self.col_range = (int(cols.min()), int(cols.max()))
+            # Shortest distance across one cell anywhere in the grid, for the search stopping rule
+            widest_lat = math.radians(max(abs(self.lat_deg.min()), abs(self.lat_deg.max())) + self.cell_deg)
+            self.ring_km = EARTH_RADIUS_KM * math.radians(self.cell_deg) * max(math.cos(widest_lat), 0.01) * 0.99
+        else:
+            self.row_range = self.col_range = (0, -1)
+            self.ring_km = 0.0
+
+    def update_positions(self, driver_ids, lats, lngs):
+        """Move known drivers, then rebuild once for the whole batch"""
+        positions = [self.position[driver_id] for driver_id in driver_ids]
+        self.lat_deg[positions] = lats
+        self.lng_deg[positions] = lngs
+        self.rebuild()
+
+    def ring_cells(self, row, col, radius):
+        """Cells exactly radius rings away from (row, col), clipped to the fleet's bounding box"""
+        if radius == 0:
+            return [(row, col)]
+        row_min, row_max = self.row_range
+        col_min, col_max = self.col_range
+        first_col, last_col = max(col - radius, col_min), min(col + radius, col_max)
+        first_row, last_row = max(row - radius + 1, row_min), min(row + radius - 1, row_max)
+        cells = []
+        for r in (row - radius, row + radius):
+            if row_min <= r <= row_max:
+                cells += [(r, c) for c in range(first_col, last_col + 1)]
+        for c in (col - radius, col + radius):
+            if col_min <= c <= col_max:
+                cells += [(r, c) for r in range(first_row, last_row + 1)]
+        return cells
+
+    def nearest(self, lat, lng, required_mask=0, k=5, max_km=None):
+        """k nearest drivers whose features cover required_mask, as [(driver_id, km)], nearest first"""
+        if not len(self.ids):
+            return []
+        row = math.floor(lat / self.cell_deg)
+        col = math.floor(lng / self.cell_deg)
+        lat_rad, lng_rad = math.radians(lat), math.radians(lng)
+        # Rings closer than the fleet's bounding box are empty, and past its far edges there is nothing left
+        first_ring = max(self.row_range[0] - row, row - self.row_range[1],
+                         self.col_range[0] - col, col - self.col_range[1], 0)
+        last_ring = max(row - self.row_range[0], self.row_range[1] - row,
+                        col - self.col_range[0], self.col_range[1] - col, 0)
+
+        found_ids = np.empty(0, dtype=np.int64)
+        found_km = np.empty(0, dtype=np.float64)
+        cells_seen = 0
+        for radius in range(first_ring, last_ring + 1):
+            if max_km is not None and (radius - 1) * self.ring_km > max_km:
+                break
+            cells = self.ring_cells(row, col, radius)
+            cells_seen += len(cells)
+            # Rare features in a sparse grid: one pass over every driver beats walking more empty cells.
+            # The flat ring_km bound also only holds while the search stays city-sized
+            if cells_seen > len(self.cells) or radius * self.cell_deg > MAX_RING_DEG:
+                return self.nearest_bruteforce(lat, lng, required_mask, k=k, max_km=max_km)
+
+            slices = [span for span in (self.cells.get((r << 32) | (c + COL_OFFSET)) for r, c in cells) if span]
+            if slices:
+                candidates = np.concatenate([np.arange(start, end) for start, end in slices])
+                candidates = candidates[(self.masks[candidates] & required_mask) == required_mask]
+                if len(candidates):
+                    distances = haversine_km(lat_rad, lng_rad, self.lat[candidates], self.lng[candidates])
+                    found_ids = np.concatenate([found_ids, self.ids[candidates]])
+                    found_km = np.concatenate([found_km, distances])
+                    if len(found_km) > k:
+                        keep = np.argpartition(found_km, k - 1)[:k]
+                        found_ids, found_km = found_ids[keep], found_km[keep]
+
+            # Anything in an unvisited cell is more than radius cells away
+            if len(found_km) >= k and found_km.max() <= radius * self.ring_km:
+                break
+
+        order = np.argsort(found_km, kind='stable')
+        return [(int(found_ids[i]), float(found_km[i])) for i in order
+                if max_km is None or found_km[i] <= max_km]
+
+    def nearest_bruteforce(self, lat, lng, required_mask=0, k=5, max_km=None):
+        """Same answer as nearest() from one vectorised pass over every driver"""
+        eligible = np.flatnonzero((self.masks & required_mask) == required_mask)
+        distances = haversine_km(math.radians(lat), math.radians(lng), self.lat[eligible], self.lng[eligible])
+        if max_km is not None:
+            within = distances <= max_km
+            eligible, distances = eligible[within], distances[within]
+        if len(distances) > k:
+            keep = np.argpartition(distances, k - 1)[:k]
+            eligible, distances = eligible[keep], distances[keep]
+        order = np.argsort(distances, kind='stable')
+        return [(int(self.ids[eligible[i]]), float(distances[i])) for i in order]
+
+class DriverMatcher:
+    """Loads approved drivers with a recent fix and OKU accessibility needs from MySQL"""
+
+    def __init__(self, max_age_minutes=60, cell_deg=DEFAULT_CELL_DEG):
+        self.max_age_minutes = max_age_minutes
+        self.cell_deg = cell_deg
+        self.codec = FeatureCodec()
+        self.index = None
+
+    def load(self):
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT u.id, l.lat, l.lng, u.vehicleFeatures
+                   FROM gps_latest l
+                   JOIN tbuser u ON l.driver_id = u.id
+                   WHERE u.userType = 'Driver' AND u.status = 'approved'
+                     AND l.timestamp >= NOW() - INTERVAL %s MINUTE""",
+                (self.max_age_minutes,)
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
+
+        self.index = DriverIndex(
+            [row[0] for row in rows],
+            [float(row[1]) for row in rows],
+            [float(row[2]) for row in rows],
+            [self.codec.encode(row[3]) for row in rows],
+            cell_deg=self.cell_deg
+        )
+        return len(self.index)
+
+    def requirement_for(self, oku_id):
+        """Feature bitmask for an OKU user's accessibility profile (0 when there is none)"""
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT mobility_aid, vehicle_features FROM tbaccessibilities WHERE user_id = %s",
+                           (oku_id,))
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        return self.codec.requirement(*row) if row else 0
+
+    def match(self, oku_id, lat, lng, k=5, max_km=None):
+        return self.index.nearest(lat, lng, self.requirement_for(oku_id), k=k, max_km=max_km)
+
+def main():
+    """Print the nearest eligible drivers for one OKU user and pickup point"""
+    parser = argparse.ArgumentParser(description="Nearest accessible driver matcher")
+    parser.add_argument('--oku-id', type=int, required=True)
+    parser.add_argument('--lat', type=float, required=True, help="Pickup latitude")
+    parser.add_argument('--lng', type=float, required=True, help="Pickup longitude")
+    parser.add_argument('-k', type=int, default=5, help="Drivers to return")
+    parser.add_argument('--max-km', type=float, help="Ignore drivers further away than this")
+    parser.add_argument('--max-age-minutes', type=int, default=60, help="Skip drivers without a fix this recent")
+    args = parser.parse_args()
+
+    matcher = DriverMatcher(max_age_minutes=args.max_age_minutes)
+    drivers = matcher.load()
+    matches = matcher.match(args.oku_id, args.lat, args.lng, k=args.k, max_km=args.max_km)
+    print(f"{drivers} drivers indexed; {len(matches)} eligible match(es) for OKU user {args.oku_id}:")
+    for driver_id, km in matches:
+        print(f"   driver {driver_id}: {km:.2f}km")
+    return 0 if matches else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
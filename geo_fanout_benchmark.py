@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Scoped Live-Map Fan-out Benchmark
+Streams fixes from many driver sockets to thousands of viewer sockets spread
+over worker processes, once with every viewer on the whole-fleet feed and once
+with viewers subscribed to their viewport's map tiles or one driver, and
+compares messages and bytes per client and server CPU
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+
+from backend_test import OKUTransportAPITester, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+BASE_LAT = 5.3307
+BASE_LNG = 103.1324
+# Must match GPS_TILE_ZOOM and tileOf() in server.js
+TILE_ZOOM = 14
+MAX_TILE_LAT = 85.0511
+
+def tile_of(lat, lng, zoom=TILE_ZOOM):
+    n = 2 ** zoom
+    lat_rad = max(-MAX_TILE_LAT, min(MAX_TILE_LAT, lat)) * math.pi / 180
+    x = math.floor((lng + 180) / 360 * n)
+    y = math.floor((1 - math.log(math.tan(lat_rad) + 1 / math.cos(lat_rad)) / math.pi) / 2 * n)
+    return max(0, min(n - 1, x)), max(0, min(n - 1, y))
+
+def tile_room(lat, lng):
+    x, y = tile_of(lat, lng)
+    return f"tile_{TILE_ZOOM}_{x}_{y}"
+
+def wire_bytes(data):
+    """Size of the Socket.IO text frame carrying one gps_update: 42["gps_update",{...}]"""
+    return len(json.dumps(['gps_update', data], separators=(',', ':')).encode()) + 2
+
+class Viewer:
+    """One viewer socket counting gps_update messages and bytes from the benchmark fleet"""
+
+    def __init__(self, spec, fleet):
+        self.spec = spec
+        self.fleet = fleet
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.messages = 0
+        self.bytes = 0
+        self.rooms = set()
+        self.client.on('gps_update', self.on_gps_update)
+
+    async def on_gps_update(self, data):
+        if data.get('driver_id') in self.fleet:
+            self.messages += 1
+            self.bytes += wire_bytes(data)
+
+    async def connect(self, base_url, token):
+        await self.client.connect(base_url, transports=['websocket'], auth={'token': token})
+        if self.spec['mode'] == 'global':
+            replies = [await self.client.call('subscribe_all', {})]
+        else:
+            replies = [await self.client.call('subscribe_tiles', {'bounds': self.spec['bounds']})]
+            self.rooms.update(replies[0].get('tiles', []) if replies[0] else [])
+            if self.spec['driver_id']:
+                replies.append(await self.client.call('subscribe_driver', {'driverId': self.spec['driver_id']}))
+        if not all(reply and reply.get('ok') for reply in replies):
+            raise RuntimeError(f"subscription refused: {replies}")
+
+    def expected(self, fixes):
+        """How many of the accepted fixes this viewer's subscriptions cover"""
+        if self.spec['mode'] == 'global':
+            return len(fixes)
+        return sum(1 for driver_id, lat, lng in fixes
+                   if driver_id == self.spec['driver_id'] or tile_room(lat, lng) in self.rooms)
+
+    async def disconnect(self):
+        if self.client.connected:
+            await self.client.disconnect()
+
+async def viewer_worker(base_url, token, specs, fleet, connect_concurrency, pipe):
+    """Connect this process's viewers, then answer the coordinator's 'count' and 'stop' commands"""
+    viewers = [Viewer(spec, fleet) for spec in specs]
+    semaphore = asyncio.Semaphore(connect_concurrency)
+
+    async def connect(viewer):
+        async with semaphore:
+            try:
+                await viewer.connect(base_url, token)
+                return True
+            except Exception:
+                return False
+
+    connected = await asyncio.gather(*(connect(viewer) for viewer in viewers))
+    viewers = [viewer for viewer, ok in zip(viewers, connected) if ok]
+    pipe.send(('ready', len(viewers)))
+
+    while True:
+        command, payload = await asyncio.to_thread(pipe.recv)
+        if command == 'count':
+            pipe.send(sum(viewer.messages for viewer in viewers))
+        elif command == 'stop':
+            pipe.send([(viewer.messages, viewer.bytes, viewer.expected(payload)) for viewer in viewers])
+            break
+    await asyncio.gather(*(viewer.disconnect() for viewer in viewers))
+
+def run_viewer_worker(*args):
+    asyncio.run(viewer_worker(*args))
+
+class FleetDriver:
+    """A driver socket random-walking inside the benchmark area"""
+
+    def __init__(self, driver, rng, area_deg):
+        self.driver = driver
+        self.lat = BASE_LAT + rng.uniform(-area_deg / 2, area_deg / 2)
+        self.lng = BASE_LNG + rng.uniform(-area_deg / 2, area_deg / 2)
+        self.client = None
+        self.accepted = []  # (driver_id, lat, lng) the server acknowledged and so broadcast
+        self.rejected = 0
+
+    async def stream(self, base_url, fixes, interval_s, rng):
+        self.client = socketio.AsyncClient(reconnection=False)
+        await self.client.connect(base_url, transports=['websocket'], auth={'token': self.driver['token']})
+        # Stagger drivers across the first interval so fixes arrive at a steady rate
+        await asyncio.sleep(rng.uniform(0, interval_s))
+        for _ in range(fixes):
+            self.lat += rng.gauss(0, 0.0005)
+            self.lng += rng.gauss(0, 0.0005)
+            fix = {"lat": round(self.lat, 7), "lng": round(self.lng, 7), "speed": 30.0, "heading": 90.0,
+                   "accuracy": 5.0, "booking_id": None}
+            reply = await self.client.call('gps_location', fix, timeout=60)
+            if reply and reply.get('ok'):
+                self.accepted.append((self.driver['id'], fix['lat'], fix['lng']))
+            else:
+                self.rejected += 1
+            await asyncio.sleep(interval_s)
+        await self.client.disconnect()
+
+class GeoFanoutBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", seed=42):
+        super().__init__(base_url, pool_size=50)
+        self.rng = random.Random(seed)
+        self.admin = None
+        self.drivers = []
+
+    def setup(self, driver_count, area_deg, provision_concurrency):
+        print(f"\n🔧 Provisioning {driver_count} drivers...")
+        self.admin = self.provision_user("Company Admin", "fanout_geo_admin")
+        if not self.admin:
+            return self.log_test("Fan-out Fixtures", False, "Could not provision admin user")
+        with ThreadPoolExecutor(max_workers=provision_concurrency) as executor:
+            drivers = list(executor.map(
+                lambda _: self.provision_user("Driver", "fanout_geo_driver", admin_token=self.admin['token']),
+                range(driver_count)
+            ))
+        self.drivers = [FleetDriver(driver, self.rng, area_deg) for driver in drivers if driver]
+        return self.log_test("Fan-out Fixtures", len(self.drivers) == driver_count,
+                             f"{len(self.drivers)}/{driver_count} drivers ready")
+
+    def viewer_specs(self, mode, count, area_deg, viewport_tiles, follow_share):
+        """Global viewers take the whole fleet; scoped ones a viewport somewhere in the area and maybe one driver"""
+        tile_deg = 360 / 2 ** TILE_ZOOM
+        specs = []
+        for _ in range(count):
+            lat = BASE_LAT + self.rng.uniform(-area_deg / 2, area_deg / 2)
+            lng = BASE_LNG + self.rng.uniform(-area_deg / 2, area_deg / 2)
+            half = viewport_tiles * tile_deg / 2
+            follows = self.rng.random() < follow_share
+            specs.append({
+                'mode': mode,
+                'bounds': {'north': lat + half, 'south': lat - half, 'east': lng + half, 'west': lng - half},
+                'driver_id': self.rng.choice(self.drivers).driver['id'] if follows else None
+            })
+        return specs
+
+    def server_stats(self):
+        response, _ = self.send_request('GET', 'api/socket/stats', token=self.admin['token'])
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()
+
+    def run_mode(self, mode, args):
+        print(f"\n📡 {mode}: {args.viewers} viewers over {args.viewer_processes} processes, "
+              f"{len(self.drivers)} drivers x {args.fixes} fixes every {args.fix_interval}s")
+        specs = self.viewer_specs(mode, args.viewers, args.area_deg, args.viewport_tiles, args.follow_share)
+        fleet = {virtual.driver['id'] for virtual in self.drivers}
+
+        workers = []
+        for index in range(args.viewer_processes):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_viewer_worker,
+                args=(self.base_url, self.admin['token'], specs[index::args.viewer_processes], fleet,
+                      args.connect_concurrency, child)
+            )
+            process.start()
+            workers.append((process, parent))
+        connected = sum(parent.recv()[1] for _, parent in workers)
+        self.log_test(f"Viewers Connected ({mode})", connected == args.viewers,
+                      f"{connected}/{args.viewers} subscribed")
+
+        before = self.server_stats()
+        started = time.perf_counter()
+        for virtual in self.drivers:
+            virtual.accepted, virtual.rejected = [], 0
+        asyncio.run(self.stream_fleet(args.fixes, args.fix_interval))
+        streamed = time.perf_counter() - started
+
+        # Wait for the fan-out backlog to drain: stop once viewer counts hold still
+        previous, stable_since = -1, time.perf_counter()
+        while time.perf_counter() - stable_since < args.settle and time.perf_counter() - started < args.settle_timeout:
+            time.sleep(0.5)
+            for _, parent in workers:
+                parent.send(('count', None))
+            total = sum(parent.recv() for _, parent in workers)
+            if total != previous:
+                previous, stable_since = total, time.perf_counter()
+        elapsed = time.perf_counter() - started
+        after = self.server_stats()
+
+        accepted = [fix for virtual in self.drivers for fix in virtual.accepted]
+        per_viewer = []
+        for process, parent in workers:
+            parent.send(('stop', accepted))
+            per_viewer += parent.recv()
+            process.join()
+        return self.summarise(mode, accepted, per_viewer, before, after, streamed, elapsed)
+
+    async def stream_fleet(self, fixes, interval_s):
+        await asyncio.gather(*(virtual.stream(self.base_url, fixes, interval_s, random.Random(virtual.driver['id']))
+                               for virtual in self.drivers))
+
+    def summarise(self, mode, accepted, per_viewer, before, after, streamed, elapsed):
+        messages = [count for count, _, _ in per_viewer]
+        sizes = [size for _, size, _ in per_viewer]
+        wrong = sum(1 for count, _, expected in per_viewer if count != expected)
+        rejected = sum(virtual.rejected for virtual in self.drivers)
+        report = {
+            'viewers': len(per_viewer),
+            'fixes_accepted': len(accepted),
+            'fixes_rejected': rejected,
+            'messages_delivered': sum(messages),
+            'bytes_delivered': sum(sizes),
+            'messages_per_client': latency_stats(messages),
+            'bytes_per_client': latency_stats(sizes),
+            'streaming_s': round(streamed, 1),
+            'drain_s': round(elapsed - streamed, 1),
+            'viewers_off_expected': wrong
+        }
+        if before and after:
+            cpu_us = (after['cpu']['user'] + after['cpu']['system']) - (before['cpu']['user'] + before['cpu']['system'])
+            wall_ms = after['uptimeMs'] - before['uptimeMs']
+            report['server_cpu_ms'] = round(cpu_us / 1000)
+            report['server_cpu_pct'] = round(cpu_us / 10 / wall_ms, 1) if wall_ms else None
+        per_client = report['messages_per_client']
+        print(f"   {len(accepted)} fixes ({rejected} rejected) -> {report['messages_delivered']:,} messages, "
+              f"{report['bytes_delivered'] / 1e6:.1f}MB")
+        print(f"   per client: avg {per_client.get('avg_ms')} msgs (p95 {per_client.get('p95_ms')}), "
+              f"avg {report['bytes_per_client'].get('avg_ms')} bytes; backlog drained in {report['drain_s']}s")
+        if 'server_cpu_ms' in report:
+            print(f"   server CPU: {report['server_cpu_ms']}ms ({report['server_cpu_pct']}% of one core)")
+        self.log_test(f"Deliveries Match Subscriptions ({mode})", wrong == 0,
+                      f"{len(per_viewer) - wrong}/{len(per_viewer)} viewers got exactly what they subscribed to")
+        return report
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description="Global vs tile/room-scoped gps_update fan-out")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=1000)
+    parser.add_argument('--viewers', type=int, default=5000)
+    parser.add_argument('--viewer-processes', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--fixes', type=int, default=3, help="Fixes per driver per mode")
+    parser.add_argument('--fix-interval', type=float, default=10, help="Seconds between a driver's fixes")
+    parser.add_argument('--area-deg', type=float, default=0.5, help="Side of the square the fleet and viewers spread over")
+    parser.add_argument('--viewport-tiles', type=int, default=3, help="Viewport side in zoom-14 tiles")
+    parser.add_argument('--follow-share', type=float, default=0.2,
+                        help="Share of scoped viewers also following one driver, like an OKU user waiting for pickup")
+    parser.add_argument('--settle', type=float, default=3, help="Seconds without new deliveries that end a mode")
+    parser.add_argument('--settle-timeout', type=float, default=300)
+    parser.add_argument('--connect-concurrency', type=int, default=100, help="Concurrent connects per viewer process")
+    parser.add_argument('--provision-concurrency', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the benchmark report to this JSON file")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🗺️  OKU TRANSPORT SYSTEM - SCOPED LIVE-MAP FAN-OUT BENCHMARK")
+    print("=" * 80)
+
+    benchmark = GeoFanoutBenchmark(args.base_url, seed=args.seed)
+    if not benchmark.setup(args.drivers, args.area_deg, args.provision_concurrency):
+        return 1
+    report = {mode: benchmark.run_mode(mode, args) for mode in ('global', 'scoped')}
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'geo_fanout_benchmark')
+
+    scoped, broadcast = report['scoped'], report['global']
+    if scoped['messages_delivered'] and scoped['bytes_delivered']:
+        print("\n📊 SCOPED VS GLOBAL")
+        print(f"   messages: {broadcast['messages_delivered']:,} vs {scoped['messages_delivered']:,} "
+              f"({broadcast['messages_delivered'] / scoped['messages_delivered']:.1f}x fewer)")
+        print(f"   bytes: {broadcast['bytes_delivered']:,} vs {scoped['bytes_delivered']:,} "
+              f"({broadcast['bytes_delivered'] / scoped['bytes_delivered']:.1f}x fewer)")
+        if broadcast.get('server_cpu_ms') and scoped.get('server_cpu_ms'):
+            print(f"   server CPU: {broadcast['server_cpu_ms']}ms vs {scoped['server_cpu_ms']}ms")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+    failed = benchmark.tests_run - benchmark.tests_passed
+    if failed == 0:
+        print("\n🎉 Scoped delivery reached exactly the subscribed viewers!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+// OKU Transport System - write-behind buffer for socket-delivered GPS fixes
+// Fixes queue in memory and are written in bulk once maxBatch are waiting or flushIntervalMs
+// has passed. One flush runs at a time, so a slow database makes the queue grow instead of
+// piling up connections; past maxPending push() refuses new fixes (backpressure). A fix's
+// callback runs only after the flush that stored it succeeds, so a client never sees an
+// acknowledgement for a fix lost in a crash and can resend anything unacknowledged.
+
+class WriteBehindBuffer {
+  // flush: async (items) => void, storing all items or throwing
+  constructor(flush, { maxBatch = 500, flushIntervalMs = 250, maxPending = 20000, retryDelayMs = 1000 } = {}) {
+    this.flush = flush;
+    this.maxBatch = maxBatch;
+    this.flushIntervalMs = flushIntervalMs;
+    this.maxPending = maxPending;
+    this.retryDelayMs = retryDelayMs;
+    this.queue = []; // [{ item, done, queuedAt }]
+    this.flushing = false;
+    this.timer = null;
+    this.retryAt = 0;
+    this.onError = null;
+    this.totals = { flushes: 0, stored: 0, failures: 0, rejected: 0, lastFlushMs: 0, maxFlushMs: 0, maxWaitMs: 0 };
+  }
+
+  get pending() {
+    return this.queue.length;
+  }
+
+  // Queue one item; false when the buffer is full and the caller should retry later
+  push(item, done = () => {}) {
+    if (this.queue.length >= this.maxPending) {
+      this.totals.rejected++;
+      return false;
+    }
+    this.queue.push({ item, done, queuedAt: Date.now() });
+    this.schedule();
+    return true;
+  }
+
+  // Flush now when a full batch is waiting, otherwise within flushIntervalMs
+  schedule() {
+    // After a failed flush the retry timer is already set and must not be cut short
+    if (this.flushing || this.queue.length === 0 || Date.now() < this.retryAt) {
+      return;
+    }
+    if (this.queue.length >= this.maxBatch) {
+      clearTimeout(this.timer);
+      this.timer = null;
+      this.run();
+    } else if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        this.run();
+      }, this.flushIntervalMs);
+    }
+  }
+
+  async run() {
+    if (this.flushing || this.queue.length === 0) {
+      return;
+    }
+    this.flushing = true;
+    const entries = this.queue.splice(0, this.maxBatch);
+    const started = Date.now();
+    try {
+      await this.flush(entries.map(entry => entry.item));
+    } catch (error) {
+      // Put the batch back in front, in order, and try again after a pause
+      this.queue.unshift(...entries);
+      this.totals.failures++;
+      this.flushing = false;
+      this.retryAt = Date.now() + this.retryDelayMs;
+      if (this.onError) {
+        this.onError(error);
+      }
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        this.run();
+      }, this.retryDelayMs);
+      return;
+    }
+
+    const finished = Date.now();
+    this.totals.flushes++;
+    this.totals.stored += entries.length;
+    this.totals.lastFlushMs = finished - started;
+    this.totals.maxFlushMs = Math.max(this.totals.maxFlushMs, this.totals.lastFlushMs);
+    this.totals.maxWaitMs = Math.max(this.totals.maxWaitMs, finished - entries[0].queuedAt);
+    this.flushing = false;
+    for (const entry of entries) {
+      entry.done();
+    }
+    this.schedule();
+  }
+
+  stats() {
+    return {
+      ...this.totals,
+      pending: this.queue.length,
+      oldestPendingMs: this.queue.length ? Date.now() - this.queue[0].queuedAt : 0,
+      flushing: this.flushing
+    };
+  }
+}
+
+module.exports = { WriteBehindBuffer };
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Batched GPS Ingest Benchmark
+Sends the same number of fixes one per POST /api/gps/update and in batches
+through POST /api/gps/batch, with simulated coverage dropouts around Kuala
+Terengganu, and compares rows/sec and MySQL statements per stored row
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from backend_test import get_db_connection, latency_stats
+from gps_load_test import GPSLoadTester
+from metrics import add_metrics_arguments, export_metrics
+
+# Questions counts statements clients send, Connections the connections opened for them
+STATUS_VARIABLES = ('Questions', 'Com_insert', 'Connections')
+
+class GPSBatchBenchmark(GPSLoadTester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=50, seed=42):
+        super().__init__(base_url, concurrency=concurrency, seed=seed)
+        # Opened once up front so the benchmark's own connection never shows up in deltas
+        self.status_connection = get_db_connection()
+
+    def read_status(self):
+        cursor = self.status_connection.cursor()
+        placeholders = ', '.join(['%s'] * len(STATUS_VARIABLES))
+        cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})", STATUS_VARIABLES)
+        status = {name: int(value) for name, value in cursor.fetchall()}
+        cursor.close()
+        return status
+
+    def count_rows(self, drivers):
+        placeholders = ', '.join(['%s'] * len(drivers))
+        cursor = self.status_connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM gps_tracking WHERE driver_id IN ({placeholders})",
+                       [virtual.driver['id'] for virtual in drivers])
+        count = cursor.fetchone()[0]
+        cursor.close()
+        self.status_connection.commit()  # End the read snapshot so the next count sees new rows
+        return count
+
+    def measure(self, drivers, send):
+        """Run send() and return elapsed seconds, rows stored and server counter deltas"""
+        rows_before = self.count_rows(drivers)
+        before = self.read_status()
+        started = time.perf_counter()
+        outcome = send()
+        elapsed = time.perf_counter() - started
+        after = self.read_status()
+        stored = self.count_rows(drivers) - rows_before
+        # The SHOW STATUS that read `after` is itself one question
+        deltas = {name: after[name] - before[name] for name in STATUS_VARIABLES}
+        deltas['Questions'] -= 1
+        return outcome, elapsed, stored, deltas
+
+    def run_single(self, drivers, fixes_per_driver):
+        """One HTTP request, and one INSERT, per fix"""
+        print(f"\n📍 Single-fix path: {fixes_per_driver} fixes x {len(drivers)} drivers")
+
+        def send_fix(virtual, sequence):
+            _, timing = self.send_request('POST', 'api/gps/update', virtual.fix_at(sequence * 10),
+                                          token=virtual.driver['token'])
+            return timing
+
+        def send():
+            work = [(virtual, sequence) for sequence in range(fixes_per_driver) for virtual in drivers]
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                return list(executor.map(lambda item: send_fix(*item), work))
+
+        timings, elapsed, stored, deltas = self.measure(drivers, send)
+        accepted = sum(1 for timing in timings if timing['status_code'] == 200)
+        return self.report('single', len(timings), accepted, timings, elapsed, stored, deltas)
+
+    def run_batched(self, drivers, fixes_per_driver, batch_size, interval_s, dropout_rate, mean_outage_s):
+        """Drivers buffer fixes, flushing a batch when they have batch_size and coverage"""
+        print(f"\n📦 Batched path: {fixes_per_driver} fixes x {len(drivers)} drivers, batches of {batch_size}, "
+              f"{dropout_rate:.0%} dropout chance per fix")
+        clock_start = datetime.now().replace(microsecond=0) - timedelta(seconds=fixes_per_driver * interval_s)
+        max_buffered = []
+
+        def send():
+            timings = []
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for step in range(fixes_per_driver):
+                    elapsed_s = step * interval_s
+                    ready = []
+                    for virtual in drivers:
+                        virtual.buffer_fix(elapsed_s, clock_start + timedelta(seconds=elapsed_s))
+                        online = virtual.has_coverage(elapsed_s, self.rng, dropout_rate, mean_outage_s)
+                        if online and len(virtual.buffer) >= batch_size:
+                            ready.append(virtual)
+                    max_buffered.append(max(len(virtual.buffer) for virtual in drivers))
+                    timings += self.flush_all(executor, ready, batch_size, full_only=True)
+                # Coverage comes back for everyone at the end of the shift; stop if uploads keep failing
+                while any(virtual.buffer for virtual in drivers):
+                    flushed = self.flush_all(executor, [v for v in drivers if v.buffer], batch_size)
+                    timings += flushed
+                    if not any(sent for sent, _ in flushed):
+                        break
+            return timings
+
+        timings, elapsed, stored, deltas = self.measure(drivers, send)
+        accepted = sum(sent for sent, _ in timings)
+        report = self.report('batched', len(drivers) * fixes_per_driver, accepted,
+                             [timing for _, timing in timings], elapsed, stored, deltas)
+        report['max_buffered_fixes'] = max(max_buffered) if max_buffered else 0
+        print(f"   deepest offline buffer: {report['max_buffered_fixes']} fixes")
+        return report
+
+    def flush_all(self, executor, ready, batch_size, full_only=False):
+        """Flush each ready driver's buffer in parallel, one batch after another per driver"""
+        def flush(virtual):
+            results = []
+            while len(virtual.buffer) >= (batch_size if full_only else 1):
+                sent, timing = self.flush_batch(virtual, batch_size)
+                results.append((sent, timing))
+                if not sent:
+                    break
+            return results
+
+        return [result for results in executor.map(flush, ready) for result in results]
+
+    def report(self, name, sent, accepted, timings, elapsed, stored, deltas):
+        stats = latency_stats([timing['latency_ms'] for timing in timings])
+        report = {
+            'fixes': sent,
+            'accepted': accepted,
+            'stored': stored,
+            'requests': len(timings),
+            'elapsed_s': round(elapsed, 2),
+            'rows_per_sec': round(stored / elapsed, 1) if elapsed > 0 else 0,
+            'statements_per_row': round(deltas['Questions'] / stored, 3) if stored else None,
+            'inserts_per_row': round(deltas['Com_insert'] / stored, 3) if stored else None,
+            'connections_per_row': round(deltas['Connections'] / stored, 3) if stored else None,
+            'latency': stats
+        }
+        print(f"   {stored}/{sent} rows in {elapsed:.1f}s ({report['rows_per_sec']} rows/s) over "
+              f"{len(timings)} requests, p50 {stats.get('p50_ms')}ms, p95 {stats.get('p95_ms')}ms")
+        print(f"   per stored row: {report['statements_per_row']} statements, {report['inserts_per_row']} "
+              f"INSERTs, {report['connections_per_row']} connections")
+        self.log_test(f"No Fixes Lost ({name})", stored == accepted == sent,
+                      f"{sent} sent, {accepted} acknowledged, {stored} stored")
+        return report
+
+    def verify_latest(self, drivers):
+        """gps_latest must hold each batched driver's newest fix by timestamp, not the last one uploaded"""
+        placeholders = ', '.join(['%s'] * len(drivers))
+        cursor = self.status_connection.cursor()
+        cursor.execute(
+            f"""SELECT l.driver_id FROM gps_latest l
+                JOIN (SELECT driver_id, MAX(timestamp) AS newest FROM gps_tracking
+                      WHERE driver_id IN ({placeholders}) GROUP BY driver_id) g ON g.driver_id = l.driver_id
+                WHERE l.timestamp = g.newest""",
+            [virtual.driver['id'] for virtual in drivers]
+        )
+        current = len(cursor.fetchall())
+        cursor.close()
+        self.status_connection.commit()
+        return self.log_test("gps_latest Holds Newest Fix", current == len(drivers),
+                             f"{current}/{len(drivers)} drivers at their newest timestamp")
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description="Compare single-fix and batched GPS ingest")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=50, help="Virtual drivers per path")
+    parser.add_argument('--fixes', type=int, default=120, help="Fixes per driver")
+    parser.add_argument('--batch-size', type=int, default=30, help="Fixes per /api/gps/batch request")
+    parser.add_argument('--interval', type=float, default=5, help="Seconds between a driver's fixes")
+    parser.add_argument('--dropout-rate', type=float, default=0.02, help="Chance per fix that coverage drops")
+    parser.add_argument('--mean-outage', type=float, default=120, help="Mean seconds without coverage")
+    parser.add_argument('--concurrency', type=int, default=50, help="Worker threads")
+    parser.add_argument('--seed', type=int, default=42)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("📦 OKU TRANSPORT SYSTEM - BATCHED GPS INGEST BENCHMARK")
+    print("=" * 80)
+
+    benchmark = GPSBatchBenchmark(args.base_url, concurrency=args.concurrency, seed=args.seed)
+    # Separate fleets, so the single path's server-stamped fixes never compete with batched ones
+    if not benchmark.setup_drivers(args.drivers * 2):
+        return 1
+    single_fleet = benchmark.drivers[:len(benchmark.drivers) // 2]
+    batch_fleet = benchmark.drivers[len(benchmark.drivers) // 2:]
+
+    single = benchmark.run_single(single_fleet, args.fixes)
+    batched = benchmark.run_batched(batch_fleet, args.fixes, args.batch_size, args.interval,
+                                    args.dropout_rate, args.mean_outage)
+    benchmark.verify_latest(batch_fleet)
+    benchmark.status_connection.close()
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'gps_batch_benchmark')
+
+    if single['rows_per_sec'] and single['statements_per_row'] and batched['statements_per_row']:
+        print("\n📊 BATCHED VS SINGLE")
+        print(f"   rows/sec: {batched['rows_per_sec']} vs {single['rows_per_sec']} "
+              f"({batched['rows_per_sec'] / single['rows_per_sec']:.1f}x)")
+        print(f"   statements/row: {batched['statements_per_row']} vs {single['statements_per_row']} "
+              f"({single['statements_per_row'] / batched['statements_per_row']:.1f}x fewer)")
+
+    failed = benchmark.tests_run - benchmark.tests_passed
+    if failed == 0:
+        print("\n🎉 Batched ingest stored every fix!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
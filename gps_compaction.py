@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - GPS History Compaction
+Rolls gps_tracking fixes older than the raw retention window into per-driver,
+per-minute gps_tracks rows (simplified polyline plus min/max speed) and deletes
+the raw fixes, one time slice per transaction
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from datetime import timedelta
+
+from backend_test import get_db_connection
+
+METERS_PER_DEGREE = 111320.0
+
+UPSERT_TRACK = """
+    INSERT INTO gps_tracks (driver_id, minute_start, fix_count, min_speed, max_speed, booking_id, path)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        fix_count = fix_count + VALUES(fix_count),
+        min_speed = LEAST(COALESCE(min_speed, VALUES(min_speed)), COALESCE(VALUES(min_speed), min_speed)),
+        max_speed = GREATEST(COALESCE(max_speed, VALUES(max_speed)), COALESCE(VALUES(max_speed), max_speed)),
+        booking_id = COALESCE(VALUES(booking_id), booking_id),
+        path = JSON_MERGE_PRESERVE(path, VALUES(path))
+"""
+
+def simplify(points, tolerance_m):
+    """Douglas-Peucker over [(lat, lng, ...)] in local metres, always keeping both endpoints"""
+    if len(points) < 3:
+        return list(points)
+
+    lng_scale = METERS_PER_DEGREE * math.cos(math.radians(points[0][0]))
+    xy = [(point[1] * lng_scale, point[0] * METERS_PER_DEGREE) for point in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = xy[first]
+        dx, dy = xy[last][0] - ax, xy[last][1] - ay
+        length = math.hypot(dx, dy)
+        worst, index = 0.0, None
+        for i in range(first + 1, last):
+            px, py = xy[i][0] - ax, xy[i][1] - ay
+            # Perpendicular distance to the chord, or to its start when the chord is a point
+            distance = abs(dy * px - dx * py) / length if length else math.hypot(px, py)
+            if distance > worst:
+                worst, index = distance, i
+        if index is not None and worst > tolerance_m:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+def rollup(driver_id, minute_start, fixes, tolerance_m):
+    """Build one gps_tracks row from a driver's (lat, lng, speed, booking_id, timestamp) fixes in a minute"""
+    speeds = [float(speed) for _, _, speed, _, _ in fixes if speed is not None]
+    bookings = [booking_id for _, _, _, booking_id, _ in fixes if booking_id is not None]
+    points = [
+        (round(float(lat), 7), round(float(lng), 7), (timestamp - minute_start).seconds)
+        for lat, lng, _, _, timestamp in fixes
+    ]
+    path = simplify(points, tolerance_m)
+    row = (
+        driver_id, minute_start, len(fixes),
+        min(speeds) if speeds else None, max(speeds) if speeds else None,
+        bookings[-1] if bookings else None,
+        json.dumps([list(point) for point in path], separators=(',', ':'))
+    )
+    return row, len(path)
+
+class GPSCompactor:
+    def __init__(self, retention_hours=24, slice_minutes=60, tolerance_m=5.0, batch_size=1000):
+        self.retention_hours = retention_hours
+        self.slice = timedelta(minutes=slice_minutes)
+        self.tolerance_m = tolerance_m
+        self.batch_size = batch_size
+        self.connection = get_db_connection()
+        self.cursor = self.connection.cursor()
+
+    def close(self):
+        self.cursor.close()
+        self.connection.close()
+
+    def slices(self):
+        """Yield [start, end) ranges from the oldest raw fix up to the retention cutoff"""
+        # The database clock stamps the fixes, so it decides what has aged out
+        self.cursor.execute("SELECT NOW() - INTERVAL %s HOUR, MIN(timestamp) FROM gps_tracking",
+                            (self.retention_hours,))
+        cutoff, oldest = self.cursor.fetchone()
+        # Whole minutes only, so no minute is ever rolled up from two halves
+        cutoff = cutoff.replace(second=0, microsecond=0)
+        if oldest is None or oldest >= cutoff:
+            return
+
+        # Slices are aligned to whole hours so repeated runs delete the same contiguous ranges
+        start = oldest.replace(minute=0, second=0, microsecond=0)
+        while start < cutoff:
+            end = min(start + self.slice, cutoff)
+            yield start, end
+            start = end
+
+    def write_tracks(self, rows):
+        for offset in range(0, len(rows), self.batch_size):
+            # mysql.connector rewrites executemany INSERTs into one multi-row statement
+            self.cursor.executemany(UPSERT_TRACK, rows[offset:offset + self.batch_size])
+
+    def compact_slice(self, start, end):
+        """Roll up and delete the raw fixes in [start, end) in a single transaction"""
+        # A locking read: it sees every committed fix rather than the transaction's snapshot,
+        # and its next-key locks on idx_timestamp hold off back-dated batch inserts into the
+        # slice until commit, so the DELETE below removes exactly the rows rolled up
+        self.cursor.execute(
+            """SELECT driver_id, lat, lng, speed, booking_id, timestamp FROM gps_tracking
+               WHERE timestamp >= %s AND timestamp < %s
+               ORDER BY driver_id, timestamp
+               FOR UPDATE""",
+            (start, end)
+        )
+
+        rows = []
+        fixes = []
+        points_kept = 0
+        raw_rows = 0
+        current = None
+        for driver_id, lat, lng, speed, booking_id, timestamp in self.cursor:
+            raw_rows += 1
+            key = (driver_id, timestamp.replace(second=0, microsecond=0))
+            if key != current:
+                if fixes:
+                    row, kept = rollup(current[0], current[1], fixes, self.tolerance_m)
+                    rows.append(row)
+                    points_kept += kept
+                current, fixes = key, []
+            fixes.append((lat, lng, speed, booking_id, timestamp))
+        if fixes:
+            row, kept = rollup(current[0], current[1], fixes, self.tolerance_m)
+            rows.append(row)
+            points_kept += kept
+
+        self.write_tracks(rows)
+        # A plain range on idx_timestamp; the same bounds as a day partition would have
+        self.cursor.execute("DELETE FROM gps_tracking WHERE timestamp >= %s AND timestamp < %s", (start, end))
+        deleted = self.cursor.rowcount
+        self.connection.commit()
+        return {'raw_rows': raw_rows, 'deleted': deleted, 'tracks': len(rows), 'points_kept': points_kept}
+
+    def run(self):
+        """Compact every slice older than the retention window and report totals"""
+        print("=" * 80)
+        print("🗜️  OKU TRANSPORT SYSTEM - GPS HISTORY COMPACTION")
+        print("=" * 80)
+        print(f"Raw retention: {self.retention_hours}h, slice: {self.slice}, tolerance: {self.tolerance_m}m")
+
+        totals = {'slices': 0, 'raw_rows': 0, 'deleted': 0, 'tracks': 0, 'points_kept': 0}
+        started = time.perf_counter()
+        for start, end in self.slices():
+            try:
+                stats = self.compact_slice(start, end)
+            except Exception:
+                self.connection.rollback()
+                raise
+            totals['slices'] += 1
+            for key, value in stats.items():
+                totals[key] += value
+            if stats['raw_rows']:
+                print(f"   {start} - {end}: {stats['raw_rows']:,} fixes -> {stats['tracks']:,} tracks, "
+                      f"{stats['points_kept']:,} points kept")
+
+        elapsed = time.perf_counter() - started
+        totals['elapsed_s'] = round(elapsed, 2)
+        totals['rows_per_sec'] = round(totals['raw_rows'] / elapsed, 1) if elapsed > 0 else 0
+        totals['point_ratio'] = round(totals['points_kept'] / totals['raw_rows'], 3) if totals['raw_rows'] else None
+        print(f"\n📊 Compacted {totals['raw_rows']:,} fixes into {totals['tracks']:,} tracks "
+              f"({totals['points_kept']:,} points) in {elapsed:.1f}s ({totals['rows_per_sec']:,.0f} fixes/s)")
+        return totals
+
+def main():
+    """Main compaction execution"""
+    parser = argparse.ArgumentParser(description="Roll old GPS fixes up into per-minute tracks")
+    parser.add_argument('--retention-hours', type=int, default=24, help="Raw fixes newer than this are kept")
+    parser.add_argument('--slice-minutes', type=int, default=60, help="Time range compacted per transaction")
+    parser.add_argument('--tolerance-m', type=float, default=5.0, help="Polyline simplification tolerance")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Track rows per multi-row INSERT")
+    args = parser.parse_args()
+
+    compactor = GPSCompactor(args.retention_hours, args.slice_minutes, args.tolerance_m, args.batch_size)
+    try:
+        compactor.run()
+    finally:
+        compactor.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - GPS History Benchmark
+Backfills ever larger volumes of raw GPS history and measures /api/gps/latest
+and /api/gps/history before and after gps_compaction.py, to show read latency
+staying flat once old fixes are rolled up
+"""
+
+import argparse
+import json
+import math
+import sys
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from gps_compaction import GPSCompactor
+from metrics import add_metrics_arguments, export_metrics
+from seed_data import DataSeeder
+
+GPS_INTERVAL_S = 10
+
+class GPSHistoryBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", samples=50, seed=42):
+        super().__init__(base_url)
+        self.samples = samples
+        self.seed = seed
+        self.admin = None
+        self.drivers = []
+        self.backfilled_until = datetime.now().replace(microsecond=0)
+
+    def setup_drivers(self, driver_count):
+        """Provision an admin to read history and approved drivers to own the backfilled fixes"""
+        print(f"\n🔧 Provisioning {driver_count} drivers...")
+
+        self.admin = self.provision_user("Company Admin", "history_admin")
+        if not self.admin:
+            return self.log_test("History Fixtures", False, "Could not provision admin user")
+
+        for _ in range(driver_count):
+            driver = self.provision_user("Driver", "history_driver", admin_token=self.admin['token'])
+            if driver:
+                self.drivers.append(driver)
+
+        return self.log_test(
+            "History Fixtures",
+            len(self.drivers) > 0,
+            f"{len(self.drivers)}/{driver_count} drivers ready"
+        )
+
+    def backfill(self, rows):
+        """Load rows more fixes spread over the drivers, ending where the previous backfill began"""
+        seeder = DataSeeder(seed=self.seed + rows)
+        try:
+            seeder.approved_driver_ids = [driver['id'] for driver in self.drivers]
+            seeder.now = self.backfilled_until
+            seeder.load_rows('gps_tracking', seeder.generate_gps(rows, interval_s=GPS_INTERVAL_S), rows)
+        finally:
+            seeder.close()
+        per_driver = math.ceil(rows / len(self.drivers))
+        self.backfilled_until -= timedelta(seconds=per_driver * GPS_INTERVAL_S)
+
+    def table_sizes(self):
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            sizes = {}
+            for table in ('gps_tracking', 'gps_tracks'):
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                sizes[table] = cursor.fetchone()[0]
+            cursor.close()
+            return sizes
+        finally:
+            connection.close()
+
+    def time_endpoint(self, endpoint):
+        """Issue the same read samples times and return its latency stats and failure count"""
+        latencies = []
+        failures = 0
+        for _ in range(self.samples):
+            response, timing = self.send_request('GET', endpoint, token=self.admin['token'])
+            if response is None or response.status_code != 200:
+                failures += 1
+            latencies.append(timing['latency_ms'])
+        stats = latency_stats(latencies)
+        stats['failures'] = failures
+        return stats
+
+    def measure(self):
+        """Time the live map query, a recent day's history and the oldest backfilled day's history"""
+        driver_id = self.drivers[0]['id']
+        today = datetime.now().strftime('%Y-%m-%d')
+        oldest = self.backfilled_until.strftime('%Y-%m-%d')
+        return {
+            'latest': self.time_endpoint('api/gps/latest'),
+            'history_recent': self.time_endpoint(f"api/gps/history/{driver_id}?date={today}"),
+            'history_archived': self.time_endpoint(f"api/gps/history/{driver_id}?date={oldest}")
+        }
+
+    def run_levels(self, levels, retention_hours, max_growth):
+        """Grow raw history level by level, measuring reads before and after each compaction"""
+        print("=" * 80)
+        print("🗂️  OKU TRANSPORT SYSTEM - GPS HISTORY BENCHMARK")
+        print("=" * 80)
+
+        results = []
+        for rows in levels:
+            print(f"\n📥 Backfilling {rows:,} fixes ending at {self.backfilled_until}")
+            self.backfill(rows)
+            raw_sizes = self.table_sizes()
+            raw = self.measure()
+
+            compactor = GPSCompactor(retention_hours=retention_hours)
+            try:
+                compaction = compactor.run()
+            finally:
+                compactor.close()
+            compacted_sizes = self.table_sizes()
+            compacted = self.measure()
+
+            results.append({
+                'backfilled_rows': rows,
+                'raw': {'tables': raw_sizes, 'reads': raw},
+                'compaction': compaction,
+                'compacted': {'tables': compacted_sizes, 'reads': compacted}
+            })
+            for label, phase in (('raw', results[-1]['raw']), ('compacted', results[-1]['compacted'])):
+                reads = phase['reads']
+                print(f"   {label:>9}: gps_tracking {phase['tables']['gps_tracking']:,} rows, "
+                      f"gps_tracks {phase['tables']['gps_tracks']:,} rows | "
+                      + ", ".join(f"{name} p95 {stats['p95_ms']}ms" for name, stats in reads.items()))
+
+        print("\n" + "=" * 80)
+        print("📊 GPS HISTORY SUMMARY")
+        print("=" * 80)
+        for name in ('latest', 'history_recent', 'history_archived'):
+            series = [result['compacted']['reads'][name]['p95_ms'] for result in results]
+            print(f"   {name}: compacted p95 by level {series}")
+            growth = series[-1] / series[0] if series[0] else float('inf')
+            self.log_test(
+                f"Flat Read Latency {name}",
+                growth <= max_growth and all(result['compacted']['reads'][name]['failures'] == 0
+                                             for result in results),
+                f"p95 grew {growth:.2f}x from {levels[0]:,} to {sum(levels):,} backfilled fixes (limit {max_growth}x)"
+            )
+
+        return results
+
+def main():
+    """Main GPS history benchmark execution"""
+    parser = argparse.ArgumentParser(description="GPS history read latency as raw volume grows")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=20)
+    parser.add_argument('--levels', default="100000,1000000,5000000",
+                        help="Comma-separated fixes to backfill at each level")
+    parser.add_argument('--retention-hours', type=int, default=24)
+    parser.add_argument('--samples', type=int, default=50, help="Requests per endpoint per measurement")
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help="Allowed p95 growth from the first to the last level after compaction")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the per-level results to this JSON file")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.levels.split(',')]
+    benchmark = GPSHistoryBenchmark(args.base_url, samples=args.samples, seed=args.seed)
+    if not benchmark.setup_drivers(args.drivers):
+        return 1
+
+    results = benchmark.run_levels(levels, args.retention_hours, args.max_growth)
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'gps_history_benchmark')
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2, default=str)
+        print(f"\n📄 Results written to {args.output}")
+
+    failed = benchmark.tests_run - benchmark.tests_passed
+    if failed == 0:
+        print("\n🎉 GPS history reads stayed flat!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
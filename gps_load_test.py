@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - GPS Ingest Load Test
+Replays virtual drivers moving along synthetic routes around Kuala Terengganu
+against POST /api/gps/update at ramped target rates to find the ingest ceiling
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_test import OKUTransportAPITester, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+# Test coordinates used by test_gps_tracking
+BASE_LAT = 5.3307
+BASE_LNG = 103.1324
+METERS_PER_DEGREE = 111320.0
+
+class VirtualDriver:
+    """A driver looping a circular route at constant speed around a random centre, buffering
+    timestamped fixes while it has no coverage"""
+
+    def __init__(self, driver, rng):
+        self.driver = driver
+        self.center_lat = BASE_LAT + rng.uniform(-0.02, 0.02)
+        self.center_lng = BASE_LNG + rng.uniform(-0.02, 0.02)
+        self.radius_m = rng.uniform(300, 1500)
+        self.speed_kmh = rng.uniform(20, 60)
+        self.phase = rng.uniform(0, 2 * math.pi)
+        self.direction = rng.choice((1, -1))
+        self.buffer = []
+        self.offline_until = 0.0
+
+    def fix_at(self, elapsed_s):
+        """Return the GPS payload for this driver after elapsed_s seconds"""
+        angular_speed = (self.speed_kmh / 3.6) / self.radius_m
+        angle = self.phase + self.direction * angular_speed * elapsed_s
+        lat = self.center_lat + (self.radius_m * math.sin(angle)) / METERS_PER_DEGREE
+        lng = self.center_lng + (self.radius_m * math.cos(angle)) / (METERS_PER_DEGREE * math.cos(math.radians(self.center_lat)))
+
+        # Heading is tangent to the circle, measured clockwise from north
+        tangent = angle + self.direction * math.pi / 2
+        heading = (math.degrees(math.atan2(math.cos(tangent), math.sin(tangent))) + 360) % 360
+        return {
+            "lat": round(lat, 7),
+            "lng": round(lng, 7),
+            "speed": round(self.speed_kmh, 2),
+            "heading": round(heading, 2),
+            "accuracy": 5.0,
+            "booking_id": None
+        }
+
+    def has_coverage(self, elapsed_s, rng, dropout_rate, mean_outage_s):
+        """Start an outage with probability dropout_rate per fix, then report whether there is signal"""
+        if elapsed_s >= self.offline_until and rng.random() < dropout_rate:
+            self.offline_until = elapsed_s + rng.expovariate(1.0 / mean_outage_s)
+        return elapsed_s >= self.offline_until
+
+    def buffer_fix(self, elapsed_s, timestamp):
+        """Queue the fix for elapsed_s, stamped with the device clock, for a later batch upload"""
+        fix = self.fix_at(elapsed_s)
+        fix["timestamp"] = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        self.buffer.append(fix)
+
+    def take_batch(self, max_fixes):
+        """Remove and return the oldest buffered fixes"""
+        batch, self.buffer = self.buffer[:max_fixes], self.buffer[max_fixes:]
+        return batch
+
+class GPSLoadTester(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=50, seed=42):
+        super().__init__(base_url, pool_size=concurrency)
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.drivers = []
+
+    def setup_drivers(self, driver_count):
+        """Provision approved drivers and give each a synthetic route"""
+        print(f"\n🔧 Provisioning {driver_count} virtual drivers...")
+
+        admin = self.provision_user("Company Admin", "gps_admin")
+        if not admin:
+            return self.log_test("GPS Fixtures", False, "Could not provision admin user")
+
+        for _ in range(driver_count):
+            driver = self.provision_user("Driver", "gps_driver", admin_token=admin['token'])
+            if driver:
+                self.drivers.append(VirtualDriver(driver, self.rng))
+
+        return self.log_test(
+            "GPS Fixtures",
+            len(self.drivers) > 0,
+            f"{len(self.drivers)}/{driver_count} virtual drivers ready"
+        )
+
+    def flush_batch(self, virtual, max_fixes):
+        """Upload one batch of buffered fixes, putting it back at the front of the buffer on failure"""
+        batch = virtual.take_batch(max_fixes)
+        response, timing = self.send_request('POST', 'api/gps/batch', {"fixes": batch}, token=virtual.driver['token'])
+        if response is None or response.status_code != 200:
+            virtual.buffer[:0] = batch
+            return 0, timing
+        return len(batch), timing
+
+    def run_stage(self, target_rate, duration_s, executor, clock_start):
+        """Send fixes at a fixed target rate for duration_s and collect timings"""
+        interval = 1.0 / target_rate
+        total = int(target_rate * duration_s)
+        futures = []
+
+        def send_fix(virtual, scheduled_at):
+            fix = virtual.fix_at(scheduled_at - clock_start)
+            _, timing = self.send_request('POST', 'api/gps/update', fix, token=virtual.driver['token'])
+            # Measure from the scheduled send time so client queueing counts as latency
+            timing['latency_ms'] = round((time.perf_counter() - scheduled_at) * 1000, 2)
+            return timing
+
+        stage_start = time.perf_counter()
+        for i in range(total):
+            scheduled_at = stage_start + i * interval
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            virtual = self.drivers[i % len(self.drivers)]
+            futures.append(executor.submit(send_fix, virtual, scheduled_at))
+
+        timings = [future.result() for future in futures]
+        elapsed = time.perf_counter() - stage_start
+        return timings, elapsed
+
+    def run_ramp(self, rates, duration_s, max_error_rate=0.01, min_achieved_ratio=0.9):
+        """Ramp through target rates and report achieved rate, latency and errors"""
+        print("=" * 80)
+        print("📍 OKU TRANSPORT SYSTEM - GPS INGEST LOAD TEST")
+        print("=" * 80)
+
+        stages = []
+        ceiling = None
+        clock_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for rate in rates:
+                print(f"\n🚀 Stage: {rate} fixes/sec for {duration_s}s across {len(self.drivers)} drivers")
+                timings, elapsed = self.run_stage(rate, duration_s, executor, clock_start)
+
+                errors = sum(1 for t in timings if t['status_code'] != 200)
+                error_rate = errors / len(timings) if timings else 0
+                achieved = len(timings) / elapsed if elapsed > 0 else 0
+                stats = latency_stats([t['latency_ms'] for t in timings])
+
+                stage = {
+                    'target_rate': rate,
+                    'achieved_rate': round(achieved, 2),
+                    'fixes': len(timings),
+                    'error_rate': round(error_rate, 4),
+                    'latency': stats
+                }
+                stages.append(stage)
+                print(f"   achieved {achieved:.1f}/{rate} fixes/sec, errors {error_rate:.2%}, "
+                      f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms")
+
+                sustained = error_rate <= max_error_rate and achieved >= rate * min_achieved_ratio
+                self.log_test(f"GPS Ingest {rate}/s", sustained,
+                              f"achieved {achieved:.1f} fixes/sec, {error_rate:.2%} errors")
+                if not sustained:
+                    break
+                ceiling = rate
+
+        print("\n📊 GPS INGEST SUMMARY")
+        print(f"Highest sustained target rate: {ceiling if ceiling else 'none'} fixes/sec")
+        return {'stages': stages, 'sustained_ceiling': ceiling, 'results': self.test_results}
+
+def main():
+    """Main GPS load test execution"""
+    parser = argparse.ArgumentParser(description="GPS ingest firehose simulator")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=20, help="Virtual drivers to simulate")
+    parser.add_argument('--rates', default="10,25,50,100,200", help="Comma separated target fixes/sec")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per ramp stage")
+    parser.add_argument('--concurrency', type=int, default=50, help="Worker threads")
+    parser.add_argument('--seed', type=int, default=42)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    tester = GPSLoadTester(args.base_url, concurrency=args.concurrency, seed=args.seed)
+    if not tester.setup_drivers(args.drivers):
+        return 1
+
+    rates = [float(rate) for rate in args.rates.split(',')]
+    results = tester.run_ramp(rates, args.duration)
+    tester.session.close()
+    export_metrics(tester.metrics, args, 'gps_load_test')
+
+    return 0 if results['sustained_ceiling'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
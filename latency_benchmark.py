@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Endpoint Latency Regression Suite
+Runs every endpoint covered by backend_test.py repeatedly after a warmup,
+stores latency histograms as a JSON baseline and fails when p95 regresses
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+DEFAULT_BASELINE = "latency_baseline.json"
+# Upper bounds (ms) of the stored histogram buckets; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+def bucket_histogram(samples):
+    """Count samples into the fixed HISTOGRAM_BOUNDS_MS buckets"""
+    counts = {f"le_{bound}": 0 for bound in HISTOGRAM_BOUNDS_MS}
+    counts["le_inf"] = 0
+    for sample in samples:
+        for bound in HISTOGRAM_BOUNDS_MS:
+            if sample <= bound:
+                counts[f"le_{bound}"] += 1
+                break
+        else:
+            counts["le_inf"] += 1
+    return counts
+
+class LatencyBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001"):
+        super().__init__(base_url)
+        self.admin = None
+        self.driver = None
+        self.oku = None
+        self.booking_slot = 0
+
+    def setup_fixtures(self):
+        """Provision an admin, an approved driver and an assigned OKU user"""
+        print("\n🔧 Provisioning benchmark users...")
+
+        self.admin = self.provision_user("Company Admin", "bench_admin")
+        if self.admin:
+            self.driver = self.provision_user("Driver", "bench_driver", admin_token=self.admin['token'])
+            self.oku = self.provision_user("OKU User", "bench_oku")
+
+        if not (self.admin and self.driver and self.oku):
+            return self.log_test("Benchmark Fixtures", False, "Could not provision admin, driver and OKU user")
+
+        assignment = {
+            "oku_id": self.oku['id'],
+            "driver_id": self.driver['id'],
+            "effective_from": datetime.now().strftime('%Y-%m-%d'),
+            "effective_to": (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d'),
+            "notes": "Benchmark assignment"
+        }
+        response, _ = self.send_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+        return self.log_test(
+            "Benchmark Fixtures",
+            response is not None and response.status_code == 200,
+            f"Driver {self.driver['id']} assigned to OKU user {self.oku['id']}"
+        )
+
+    def next_booking(self):
+        """Build a booking in the next free 3 hour slot so creates never conflict"""
+        self.booking_slot += 1
+        start = datetime.now() + timedelta(days=3, hours=3 * self.booking_slot)
+        return {
+            "driver_id": self.driver['id'],
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Benchmark Pickup",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Benchmark Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Benchmark",
+            "special_instructions": ""
+        }
+
+    def scenarios(self):
+        """Return {name: callable -> (method, endpoint, data, token, expected_status)}"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        gps_fix = {"lat": 5.3307, "lng": 103.1324, "speed": 45.5, "heading": 180.0, "accuracy": 5.0, "booking_id": None}
+        return {
+            'login': lambda: ('POST', 'api/login', {"email": self.oku['email'], "password": self.oku['password']}, '', 200),
+            'register': lambda: ('POST', 'api/register', {
+                "name": "Benchmark User",
+                "email": f"bench_reg_{uuid.uuid4().hex[:12]}@example.com",
+                "phone": "0123456789",
+                "password": "password123",
+                "userType": "OKU User"
+            }, '', 200),
+            'profile': lambda: ('GET', 'api/profile', None, self.oku['token'], 200),
+            'assignments': lambda: ('GET', 'api/assignments', None, self.oku['token'], 200),
+            'bookings_list': lambda: ('GET', 'api/bookings', None, self.oku['token'], 200),
+            'bookings_create': lambda: ('POST', 'api/bookings', self.next_booking(), self.oku['token'], 200),
+            'driver_schedule': lambda: ('GET', f"api/driver/{self.driver['id']}/schedule?date={today}", None, self.oku['token'], 200),
+            'gps_update': lambda: ('POST', 'api/gps/update', gps_fix, self.driver['token'], 200),
+            'gps_latest': lambda: ('GET', 'api/gps/latest', None, self.driver['token'], 200)
+        }
+
+    def measure(self, iterations, warmup):
+        """Run every scenario warmup + iterations times and summarise latencies"""
+        measurements = {}
+        for name, build in self.scenarios().items():
+            samples = []
+            failures = 0
+            for i in range(warmup + iterations):
+                method, endpoint, data, token, expected = build()
+                response, timing = self.send_request(method, endpoint, data, token=token)
+                if i < warmup:
+                    continue
+                if response is None or response.status_code != expected:
+                    failures += 1
+                else:
+                    samples.append(timing['latency_ms'])
+
+            stats = latency_stats(samples)
+            stats['failures'] = failures
+            stats['histogram'] = bucket_histogram(samples)
+            measurements[name] = stats
+            print(f"   {name}: p50 {stats.get('p50_ms')}ms, p95 {stats.get('p95_ms')}ms, "
+                  f"p99 {stats.get('p99_ms')}ms, failures {failures}")
+        return measurements
+
+    def compare(self, measurements, baseline, threshold, min_delta_ms):
+        """Log a pass/fail per endpoint comparing p95 with the stored baseline"""
+        regressions = []
+        for name, current in measurements.items():
+            if current['failures']:
+                self.log_test(f"Latency {name}", False, f"{current['failures']} requests failed")
+                continue
+
+            previous = baseline.get('endpoints', {}).get(name)
+            if not previous or previous.get('p95_ms') is None:
+                self.log_test(f"Latency {name}", True, f"p95 {current['p95_ms']}ms (no baseline)")
+                continue
+
+            limit = max(previous['p95_ms'] * (1 + threshold), previous['p95_ms'] + min_delta_ms)
+            ok = current['p95_ms'] <= limit
+            if not ok:
+                regressions.append(name)
+            self.log_test(
+                f"Latency {name}",
+                ok,
+                f"p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms (limit {limit:.2f}ms)"
+            )
+        return regressions
+
+    def run_benchmark(self, iterations, warmup, baseline_path, threshold, min_delta_ms, save_baseline):
+        """Measure all endpoints and gate them against the saved baseline"""
+        print("=" * 80)
+        print("⏱️  OKU TRANSPORT SYSTEM - ENDPOINT LATENCY REGRESSION SUITE")
+        print("=" * 80)
+
+        if not self.setup_fixtures():
+            return None
+
+        print(f"\n🔁 {warmup} warmup + {iterations} measured requests per endpoint")
+        measurements = self.measure(iterations, warmup)
+        run = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'base_url': self.base_url,
+            'iterations': iterations,
+            'warmup': warmup,
+            'endpoints': measurements
+        }
+
+        baseline = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as handle:
+                baseline = json.load(handle)
+
+        regressions = self.compare(measurements, baseline, threshold, min_delta_ms)
+
+        if save_baseline:
+            with open(baseline_path, 'w') as handle:
+                json.dump(run, handle, indent=2)
+            print(f"\n💾 Baseline saved to {baseline_path}")
+
+        return {'run': run, 'regressions': regressions, 'results': self.test_results}
+
+def main():
+    """Main latency regression execution"""
+    parser = argparse.ArgumentParser(description="Endpoint latency regression suite")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument('--threshold', type=float, default=0.20, help="Allowed relative p95 regression")
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help="Ignore p95 changes smaller than this")
+    parser.add_argument('--save-baseline', action='store_true', help="Write this run as the new baseline")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    benchmark = LatencyBenchmark(args.base_url)
+    results = benchmark.run_benchmark(args.iterations, args.warmup, args.baseline,
+                                      args.threshold, args.min_delta_ms, args.save_baseline)
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'latency_benchmark')
+
+    if results and benchmark.tests_run == benchmark.tests_passed:
+        print("\n🎉 No latency regressions!")
+        return 0
+    else:
+        print(f"\n⚠️  {benchmark.tests_run - benchmark.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
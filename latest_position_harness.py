@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Latest Position Harness
+Checks gps_latest against raw gps_tracking while drivers ingest concurrently,
+then seeds 10k+ drivers and benchmarks per-driver and fleet-wide lookups
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from backend_test import get_db_connection, latency_stats
+from gps_load_test import GPSLoadTester
+from metrics import add_metrics_arguments, export_metrics
+from seed_data import DataSeeder
+
+FIX_COLUMNS = ('booking_id', 'lat', 'lng', 'speed', 'heading', 'accuracy', 'timestamp')
+
+# The raw window query /api/gps/latest ran before gps_latest existed
+LEGACY_LATEST = """
+    SELECT g.*, u.name as driver_name, u.vehicleType, u.vehicleNumber
+    FROM gps_tracking g
+    JOIN tbuser u ON g.driver_id = u.id
+    WHERE g.timestamp >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+    ORDER BY g.timestamp DESC
+    LIMIT 100
+"""
+CURRENT_LATEST = """
+    SELECT l.*, u.name as driver_name, u.vehicleType, u.vehicleNumber
+    FROM gps_latest l
+    JOIN tbuser u ON l.driver_id = u.id
+    WHERE l.timestamp >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+    ORDER BY l.timestamp DESC
+"""
+# Same statement database/schema.sql uses to populate gps_latest from history
+REBUILD_LATEST = """
+    INSERT INTO gps_latest (driver_id, gps_id, booking_id, lat, lng, speed, heading, accuracy, timestamp)
+    SELECT g.driver_id, g.id, g.booking_id, g.lat, g.lng, g.speed, g.heading, g.accuracy, g.timestamp
+    FROM gps_tracking g
+    JOIN (SELECT driver_id, MAX(id) AS id FROM gps_tracking GROUP BY driver_id) newest ON g.id = newest.id
+    ON DUPLICATE KEY UPDATE gps_latest.gps_id = gps_latest.gps_id
+"""
+
+def same_value(left, right):
+    """Compare DECIMAL columns numerically so 5.3 and 5.30000000 match"""
+    if isinstance(left, Decimal) or isinstance(right, Decimal):
+        return left is not None and right is not None and Decimal(str(left)) == Decimal(str(right))
+    return left == right
+
+class LatestPositionHarness(GPSLoadTester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=50, seed=42):
+        super().__init__(base_url, concurrency=concurrency, seed=seed)
+        self.acked = {}  # driver id -> highest gpsId acknowledged by POST /api/gps/update
+        self.acked_lock = threading.Lock()
+
+    def ingest(self, fixes_per_driver, read_ratio):
+        """Send overlapping fixes for every driver, reading each driver's position back after some acks"""
+        print(f"\n🚚 Concurrent ingest: {fixes_per_driver} fixes x {len(self.drivers)} drivers, "
+              f"{self.concurrency} workers")
+        stale_reads = []
+        rng_lock = threading.Lock()
+
+        def send_fix(virtual, sequence):
+            driver = virtual.driver
+            response, _ = self.send_request('POST', 'api/gps/update', virtual.fix_at(sequence * 10),
+                                            token=driver['token'])
+            if response is None or response.status_code != 200:
+                return False
+            gps_id = response.json().get('gpsId')
+            with self.acked_lock:
+                self.acked[driver['id']] = max(self.acked.get(driver['id'], 0), gps_id)
+            with rng_lock:
+                read_back = self.rng.random() < read_ratio
+            if read_back:
+                # Read-your-writes: the current fix can never be older than one already acknowledged
+                response, _ = self.send_request('GET', f"api/gps/latest/{driver['id']}", token=driver['token'])
+                if response is None or response.status_code != 200 or response.json()['location']['id'] < gps_id:
+                    stale_reads.append((driver['id'], gps_id))
+            return True
+
+        # Interleave drivers so the same driver has several fixes in flight at once
+        work = [(virtual, sequence) for sequence in range(fixes_per_driver) for virtual in self.drivers]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            outcomes = list(executor.map(lambda item: send_fix(*item), work))
+        elapsed = time.perf_counter() - started
+
+        sent = sum(outcomes)
+        self.log_test("Concurrent GPS Ingest", sent == len(work),
+                      f"{sent}/{len(work)} fixes accepted in {elapsed:.1f}s ({sent / elapsed:.0f}/s)")
+        return self.log_test("Read Your Writes", not stale_reads,
+                             f"{len(stale_reads)} lookups returned a fix older than an acknowledged one")
+
+    def verify_consistency(self):
+        """After ingest settles, gps_latest must equal each driver's newest gps_tracking row"""
+        driver_ids = [virtual.driver['id'] for virtual in self.drivers]
+        placeholders = ', '.join(['%s'] * len(driver_ids))
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(
+                f"""SELECT g.driver_id, g.id AS gps_id, {', '.join(f'g.{column}' for column in FIX_COLUMNS)}
+                    FROM gps_tracking g
+                    JOIN (SELECT driver_id, MAX(id) AS id FROM gps_tracking
+                          WHERE driver_id IN ({placeholders}) GROUP BY driver_id) newest ON g.id = newest.id""",
+                driver_ids
+            )
+            expected = {row['driver_id']: row for row in cursor.fetchall()}
+            cursor.execute(f"SELECT * FROM gps_latest WHERE driver_id IN ({placeholders})", driver_ids)
+            actual = {row['driver_id']: row for row in cursor.fetchall()}
+            cursor.close()
+        finally:
+            connection.close()
+
+        mismatches = []
+        for driver_id in driver_ids:
+            want, got = expected.get(driver_id), actual.get(driver_id)
+            if want is None or got is None:
+                mismatches.append((driver_id, 'missing'))
+            elif got['gps_id'] != want['gps_id'] or got['gps_id'] != self.acked.get(driver_id):
+                mismatches.append((driver_id, f"gps_id {got['gps_id']} != newest {want['gps_id']}"))
+            else:
+                columns = [column for column in FIX_COLUMNS if not same_value(got[column], want[column])]
+                if columns:
+                    mismatches.append((driver_id, f"columns differ: {columns}"))
+
+        for driver_id, problem in mismatches[:5]:
+            print(f"   driver {driver_id}: {problem}")
+        self.log_test("gps_latest Matches gps_tracking", not mismatches,
+                      f"{len(driver_ids) - len(mismatches)}/{len(driver_ids)} drivers consistent")
+
+        # The fleet view must hold exactly one row per driver
+        response, _ = self.send_request('GET', 'api/gps/latest', token=self.drivers[0].driver['token'])
+        if response is None or response.status_code != 200:
+            return self.log_test("One Fix Per Driver", False, "GET /api/gps/latest failed")
+        ours = [row for row in response.json()['locations'] if row['driver_id'] in self.acked]
+        seen = {row['driver_id'] for row in ours}
+        return self.log_test(
+            "One Fix Per Driver",
+            len(ours) == len(seen) == len(driver_ids) and all(row['id'] == self.acked[row['driver_id']] for row in ours),
+            f"{len(ours)} rows for {len(seen)}/{len(driver_ids)} drivers"
+        )
+
+    def seed_fleet(self, driver_count, fixes_per_driver):
+        """Bulk-load drivers with recent history and populate gps_latest from it"""
+        seeder = DataSeeder(seed=driver_count)
+        try:
+            seeder.load_rows('tbuser', seeder.generate_users(driver_count, role="Driver"), driver_count)
+            fixes = len(seeder.approved_driver_ids) * fixes_per_driver
+            seeder.load_rows('gps_tracking', seeder.generate_gps(fixes), fixes)
+            seeder.cursor.execute(REBUILD_LATEST)
+            seeder.connection.commit()
+            return seeder.approved_driver_ids
+        finally:
+            seeder.close()
+
+    def time_sql(self, query, samples):
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            latencies = []
+            rows = 0
+            for _ in range(samples):
+                start = time.perf_counter()
+                cursor.execute(query)
+                rows = len(cursor.fetchall())
+                latencies.append(round((time.perf_counter() - start) * 1000, 2))
+            cursor.close()
+            return latency_stats(latencies), rows
+        finally:
+            connection.close()
+
+    def benchmark_lookups(self, levels, fixes_per_driver, samples, max_growth):
+        """Grow the fleet and time per-driver lookups, the fleet view and the legacy window query"""
+        print("\n" + "=" * 80)
+        print("📍 LATEST POSITION LOOKUPS")
+        print("=" * 80)
+
+        token = self.drivers[0].driver['token']
+        rng = random.Random(0)
+        fleet = []  # approved seeded drivers, the ones with fixes
+        seeded = 0
+        results = []
+        for level in levels:
+            print(f"\n🌱 Seeding {level - seeded:,} more drivers ({fixes_per_driver} fixes each)...")
+            fleet += self.seed_fleet(level - seeded, fixes_per_driver)
+            seeded = level
+
+            lookups = []
+            for driver_id in rng.sample(fleet, min(samples, len(fleet))):
+                response, timing = self.send_request('GET', f"api/gps/latest/{driver_id}", token=token)
+                lookups.append(timing['latency_ms'])
+            response, timing = self.send_request('GET', 'api/gps/latest', token=token)
+            fleet_rows = len(response.json()['locations']) if response is not None and response.status_code == 200 else 0
+            current, current_rows = self.time_sql(CURRENT_LATEST, 5)
+            legacy, legacy_rows = self.time_sql(LEGACY_LATEST, 5)
+
+            result = {
+                'drivers': seeded,
+                'drivers_with_fixes': len(fleet),
+                'driver_lookup': latency_stats(lookups),
+                'fleet_view': {'latency_ms': timing['latency_ms'], 'rows': fleet_rows},
+                'sql_current': dict(current, rows=current_rows),
+                'sql_legacy': dict(legacy, rows=legacy_rows)
+            }
+            results.append(result)
+            print(f"   {seeded:,} drivers: lookup p50 {result['driver_lookup']['p50_ms']}ms "
+                  f"p95 {result['driver_lookup']['p95_ms']}ms | fleet view {fleet_rows:,} rows in "
+                  f"{timing['latency_ms']}ms | SQL p50 current {current['p50_ms']}ms ({current_rows:,} rows) "
+                  f"vs legacy {legacy['p50_ms']}ms ({legacy_rows} rows)")
+
+        first, last = results[0]['driver_lookup']['p95_ms'], results[-1]['driver_lookup']['p95_ms']
+        growth = last / first if first else float('inf')
+        self.log_test("Constant-Time Driver Lookup", growth <= max_growth,
+                      f"p95 {first}ms at {results[0]['drivers']:,} drivers -> {last}ms at "
+                      f"{results[-1]['drivers']:,} ({growth:.2f}x, limit {max_growth}x)")
+        return results
+
+def main():
+    """Main latest position harness execution"""
+    parser = argparse.ArgumentParser(description="gps_latest consistency and lookup benchmark")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=20, help="API drivers used for the ingest check")
+    parser.add_argument('--fixes', type=int, default=50, help="Fixes per driver during the ingest check")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--read-ratio', type=float, default=0.2, help="Share of acks followed by a read-back")
+    parser.add_argument('--levels', default="1000,10000,20000", help="Comma-separated fleet sizes to benchmark")
+    parser.add_argument('--seed-fixes', type=int, default=5, help="History rows per seeded driver")
+    parser.add_argument('--samples', type=int, default=200, help="Per-driver lookups per fleet size")
+    parser.add_argument('--max-growth', type=float, default=2.0,
+                        help="Allowed lookup p95 growth from the smallest to the largest fleet")
+    parser.add_argument('--seed', type=int, default=42)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    harness = LatestPositionHarness(args.base_url, concurrency=args.concurrency, seed=args.seed)
+    if not harness.setup_drivers(args.drivers):
+        return 1
+
+    print("=" * 80)
+    print("🧭 OKU TRANSPORT SYSTEM - LATEST POSITION HARNESS")
+    print("=" * 80)
+    harness.ingest(args.fixes, args.read_ratio)
+    harness.verify_consistency()
+    harness.benchmark_lookups([int(level) for level in args.levels.split(',')],
+                              args.seed_fixes, args.samples, args.max_growth)
+    harness.session.close()
+    export_metrics(harness.metrics, args, 'latest_position_harness')
+
+    failed = harness.tests_run - harness.tests_passed
+    if failed == 0:
+        print("\n🎉 gps_latest is consistent and lookups stay flat!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Driver Matcher Benchmark
+Replays the seeded gps_tracking history through driver_matcher.DriverIndex in
+fixed time ticks and times k-nearest-eligible queries for seeded OKU profiles,
+checking every grid answer against a brute-force scan of all drivers
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from driver_matcher import DEFAULT_CELL_DEG, DriverIndex, FeatureCodec
+
+class MatcherBenchmark(OKUTransportAPITester):
+    def __init__(self, seed=42, cell_deg=DEFAULT_CELL_DEG):
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.cell_deg = cell_deg
+        self.codec = FeatureCodec()
+
+    def load(self, driver_limit, window_minutes):
+        """Approved drivers' features, OKU requirements and the last window of their fixes in time order"""
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT id, vehicleFeatures FROM tbuser
+                   WHERE userType = 'Driver' AND status = 'approved'
+                   ORDER BY id LIMIT %s""",
+                (driver_limit,)
+            )
+            features = {driver_id: self.codec.encode(value) for driver_id, value in cursor.fetchall()}
+
+            cursor.execute("SELECT mobility_aid, vehicle_features FROM tbaccessibilities")
+            requirements = [self.codec.requirement(aid, needs) for aid, needs in cursor.fetchall()]
+
+            cursor.execute(
+                """SELECT driver_id, lat, lng, UNIX_TIMESTAMP(timestamp) FROM gps_tracking
+                   WHERE timestamp >= (SELECT MAX(timestamp) FROM gps_tracking) - INTERVAL %s MINUTE
+                   ORDER BY timestamp, id""",
+                (window_minutes,)
+            )
+            fixes = [(driver_id, float(lat), float(lng), int(ts)) for driver_id, lat, lng, ts in cursor.fetchall()
+                     if driver_id in features]
+            cursor.close()
+        finally:
+            connection.close()
+        return features, requirements, fixes
+
+    def first_positions(self, features, fixes):
+        """Index every driver with a fix in the window at its first position"""
+        first = {}
+        for driver_id, lat, lng, _ in fixes:
+            first.setdefault(driver_id, (lat, lng))
+        driver_ids = list(first)
+        return DriverIndex(
+            driver_ids,
+            [first[driver_id][0] for driver_id in driver_ids],
+            [first[driver_id][1] for driver_id in driver_ids],
+            [features[driver_id] for driver_id in driver_ids],
+            cell_deg=self.cell_deg
+        )
+
+    def ticks(self, fixes, tick_s):
+        """Yield each tick's newest fix per driver as (driver_ids, lats, lngs)"""
+        tick_end = fixes[0][3] + tick_s
+        latest = {}
+        for driver_id, lat, lng, ts in fixes:
+            if ts >= tick_end:
+                yield self.unzip(latest)
+                latest = {}
+                tick_end += tick_s * ((ts - tick_end) // tick_s + 1)
+            latest[driver_id] = (lat, lng)
+        if latest:
+            yield self.unzip(latest)
+
+    @staticmethod
+    def unzip(latest):
+        driver_ids = list(latest)
+        return driver_ids, [latest[d][0] for d in driver_ids], [latest[d][1] for d in driver_ids]
+
+    def run(self, index, requirements, fixes, tick_s, queries_per_tick, k, max_km):
+        """Apply each tick's movement, then query random pickups inside the fleet's bounding box"""
+        grid_ms, brute_ms, rebuild_ms = [], [], []
+        mismatches = empty = 0
+
+        for driver_ids, lats, lngs in self.ticks(fixes, tick_s):
+            started = time.perf_counter()
+            index.update_positions(driver_ids, lats, lngs)
+            rebuild_ms.append(round((time.perf_counter() - started) * 1000, 3))
+
+            lat_range = (float(index.lat_deg.min()), float(index.lat_deg.max()))
+            lng_range = (float(index.lng_deg.min()), float(index.lng_deg.max()))
+            for _ in range(queries_per_tick):
+                lat = self.rng.uniform(*lat_range)
+                lng = self.rng.uniform(*lng_range)
+                required = self.rng.choice(requirements) if requirements else 0
+
+                started = time.perf_counter()
+                matches = index.nearest(lat, lng, required, k=k, max_km=max_km)
+                grid_ms.append(round((time.perf_counter() - started) * 1000, 3))
+
+                started = time.perf_counter()
+                expected = index.nearest_bruteforce(lat, lng, required, k=k, max_km=max_km)
+                brute_ms.append(round((time.perf_counter() - started) * 1000, 3))
+
+                # Compare distances rather than ids so equidistant drivers may come back in either order
+                if len(matches) != len(expected) or not np.allclose(
+                        [km for _, km in matches], [km for _, km in expected], rtol=0, atol=1e-9):
+                    mismatches += 1
+                if not matches:
+                    empty += 1
+
+        return {
+            'ticks': len(rebuild_ms),
+            'queries': len(grid_ms),
+            'mismatches': mismatches,
+            'no_eligible_driver': empty,
+            'rebuild': latency_stats(rebuild_ms),
+            'grid_query': latency_stats(grid_ms),
+            'bruteforce_query': latency_stats(brute_ms)
+        }
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description="Replay seeded GPS history through the driver matcher")
+    parser.add_argument('--drivers', type=int, default=10000, help="Approved drivers to index (lowest ids first)")
+    parser.add_argument('--window-minutes', type=int, default=30, help="Most recent gps_tracking history to replay")
+    parser.add_argument('--tick-seconds', type=int, default=10, help="Movement applied per index rebuild")
+    parser.add_argument('--queries-per-tick', type=int, default=50)
+    parser.add_argument('-k', type=int, default=5, help="Drivers per match")
+    parser.add_argument('--max-km', type=float, help="Only match drivers within this distance")
+    parser.add_argument('--cell-deg', type=float, default=DEFAULT_CELL_DEG, help="Grid cell size in degrees")
+    parser.add_argument('--max-query-ms', type=float, default=5.0, help="Fail when grid query p95 exceeds this")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the benchmark report to this JSON file")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🧭 OKU TRANSPORT SYSTEM - DRIVER MATCHER BENCHMARK")
+    print("=" * 80)
+
+    benchmark = MatcherBenchmark(seed=args.seed, cell_deg=args.cell_deg)
+    features, requirements, fixes = benchmark.load(args.drivers, args.window_minutes)
+    if not fixes:
+        print("❌ No GPS history for approved drivers - seed the database with seed_data.py first")
+        return 1
+
+    started = time.perf_counter()
+    index = benchmark.first_positions(features, fixes)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"\n📍 {len(index):,} drivers, {len(fixes):,} fixes over {args.window_minutes} minutes, "
+          f"{len(requirements):,} OKU profiles; initial build {build_ms:.1f}ms")
+    if len(index) < args.drivers:
+        print(f"   ⚠️  Only {len(index):,} of {args.drivers:,} requested drivers have recent fixes")
+
+    report = benchmark.run(index, requirements, fixes, args.tick_seconds, args.queries_per_tick, args.k, args.max_km)
+    report.update(drivers=len(index), fixes=len(fixes), initial_build_ms=round(build_ms, 1))
+    benchmark.session.close()
+
+    grid, brute, rebuild = report['grid_query'], report['bruteforce_query'], report['rebuild']
+    print("\n⏱️  BENCHMARK:")
+    print(f"   {report['ticks']} ticks, rebuild p50 {rebuild['p50_ms']}ms, p95 {rebuild['p95_ms']}ms")
+    print(f"   grid k={args.k}: p50 {grid['p50_ms']}ms, p95 {grid['p95_ms']}ms, p99 {grid['p99_ms']}ms")
+    print(f"   brute force: p50 {brute['p50_ms']}ms, p95 {brute['p95_ms']}ms")
+    print(f"   {report['no_eligible_driver']:,}/{report['queries']:,} queries had no eligible driver")
+
+    benchmark.log_test("Grid Matches Brute Force", report['mismatches'] == 0,
+                       f"{report['queries'] - report['mismatches']:,}/{report['queries']:,} answers agree")
+    benchmark.log_test("Query Latency", grid['p95_ms'] <= args.max_query_ms,
+                       f"p95 {grid['p95_ms']}ms (limit {args.max_query_ms}ms)")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\n📄 Report written to {args.output}")
+
+    failed = benchmark.tests_run - benchmark.tests_passed
+    if failed == 0:
+        print("\n🎉 Driver matching is fast and exact!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
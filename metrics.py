@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Latency Metrics
+Log-bucketed latency histograms with bounded relative error that can be
+merged across threads, processes and hosts without losing percentile accuracy,
+and a registry of them that exports to Prometheus text and NDJSON
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from array import array
+from datetime import datetime
+
+class LatencyHistogram:
+    """HDR-style histogram over [min_us, max_us] with fixed memory per instance.
+
+    Bucket i covers (min_us * base^(i-1), min_us * base^i], where
+    base = 1 + 2 * relative_error, so any reported percentile is within
+    relative_error of the true sample. Values outside the range are clamped
+    into the first/last bucket; exact min, max, sum and count are kept too.
+    """
+
+    def __init__(self, min_us=1, max_us=60000000, relative_error=0.01):
+        self.min_us = min_us
+        self.max_us = max_us
+        self.relative_error = relative_error
+        self.log_base = math.log(1 + 2 * relative_error)
+        self.bucket_count = int(math.ceil(math.log(max_us / min_us) / self.log_base)) + 1
+        self.counts = array('q', bytes(8 * self.bucket_count))
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def config(self):
+        return (self.min_us, self.max_us, self.relative_error)
+
+    def bucket_index(self, value_us):
+        if value_us <= self.min_us:
+            return 0
+        index = int(math.ceil(math.log(value_us / self.min_us) / self.log_base))
+        return min(index, self.bucket_count - 1)
+
+    def bucket_value_ms(self, index):
+        """Representative value of a bucket: the midpoint of its bounds, in ms"""
+        if index == 0:
+            return self.min_us / 1000.0
+        upper = self.min_us * math.exp(index * self.log_base)
+        lower = self.min_us * math.exp((index - 1) * self.log_base)
+        return (upper + lower) / 2 / 1000.0
+
+    def record(self, latency_ms, count=1):
+        """Record a latency sample in milliseconds"""
+        self.counts[self.bucket_index(latency_ms * 1000.0)] += count
+        self.count += count
+        self.total_ms += latency_ms * count
+        self.min_ms = latency_ms if self.min_ms is None else min(self.min_ms, latency_ms)
+        self.max_ms = latency_ms if self.max_ms is None else max(self.max_ms, latency_ms)
+
+    def merge(self, other):
+        """Add another histogram with the same configuration into this one"""
+        if other.config() != self.config():
+            raise ValueError(f"Cannot merge histograms with configs {self.config()} and {other.config()}")
+        for index, bucket in enumerate(other.counts):
+            if bucket:
+                self.counts[index] += bucket
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other.min_ms is not None:
+            self.min_ms = other.min_ms if self.min_ms is None else min(self.min_ms, other.min_ms)
+            self.max_ms = other.max_ms if self.max_ms is None else max(self.max_ms, other.max_ms)
+        return self
+
+    def count_at_or_below(self, value_ms):
+        """Samples in buckets whose upper bound is at most value_ms (within relative_error)"""
+        if self.max_ms is not None and value_ms >= self.max_ms:
+            return self.count
+        last = self.bucket_index(value_ms * 1000.0)
+        upper = self.min_us * math.exp(last * self.log_base)
+        # The bucket holding value_ms straddles it unless value_ms is its upper bound
+        if upper > value_ms * 1000.0 * (1 + 1e-9):
+            last -= 1
+        return sum(self.counts[:last + 1]) if last >= 0 else 0
+
+    def percentile(self, pct):
+        """Return the nearest-rank percentile in ms, clamped to the exact min/max"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                value = self.bucket_value_ms(index)
+                return round(min(max(value, self.min_ms), self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def summary(self):
+        """Summarise as the same keys latency_stats() returns"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3)
+        }
+
+    def to_dict(self):
+        """Serialise sparsely for sending between processes or hosts"""
+        return {
+            'config': list(self.config()),
+            'buckets': {index: bucket for index, bucket in enumerate(self.counts) if bucket},
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'min_ms': self.min_ms,
+            'max_ms': self.max_ms
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(*data['config'])
+        for index, bucket in data['buckets'].items():
+            histogram.counts[int(index)] = bucket
+        histogram.count = data['count']
+        histogram.total_ms = data['total_ms']
+        histogram.min_ms = data['min_ms']
+        histogram.max_ms = data['max_ms']
+        return histogram
+
+# Prometheus histogram bucket bounds in seconds, folded from the fine-grained buckets
+PROMETHEUS_BUCKETS_S = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10]
+
+def prometheus_labels(labels):
+    """Render a label dict as {name="value",...} with Prometheus escaping"""
+    escaped = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+class MetricsRegistry:
+    """Thread-safe request histograms per (method, endpoint, status) plus check counters.
+
+    Every series is one fixed-size LatencyHistogram, so memory depends on the
+    number of distinct endpoints and status codes, never on the sample count.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.checks = {}
+        self.lock = threading.Lock()
+
+    def record_timing(self, timing):
+        """Record a send_request() timing dict; transport errors get status 'error'"""
+        status = timing['status_code'] if timing['status_code'] is not None else 'error'
+        key = (timing['method'], f"/{timing['endpoint']}", str(status))
+        with self.lock:
+            if key not in self.requests:
+                self.requests[key] = LatencyHistogram()
+            self.requests[key].record(timing['latency_ms'])
+
+    def record_check(self, name, passed):
+        with self.lock:
+            passes, failures = self.checks.get(name, (0, 0))
+            self.checks[name] = (passes + 1, failures) if passed else (passes, failures + 1)
+
+    def merge(self, other):
+        """Add another registry's series into this one"""
+        with self.lock:
+            for key, histogram in other.requests.items():
+                if key in self.requests:
+                    self.requests[key].merge(histogram)
+                else:
+                    self.requests[key] = LatencyHistogram.from_dict(histogram.to_dict())
+            for name, (passes, failures) in other.checks.items():
+                total_passes, total_failures = self.checks.get(name, (0, 0))
+                self.checks[name] = (total_passes + passes, total_failures + failures)
+        return self
+
+    def endpoint_summary(self):
+        """Return {'METHOD /endpoint': latency summary} across all status codes"""
+        combined = {}
+        for (method, endpoint, _), histogram in self.requests.items():
+            key = f"{method} {endpoint}"
+            if key not in combined:
+                combined[key] = LatencyHistogram(*histogram.config())
+            combined[key].merge(histogram)
+        return {key: histogram.summary() for key, histogram in combined.items()}
+
+    def to_dict(self):
+        return {
+            'requests': [
+                {'method': method, 'endpoint': endpoint, 'status': status, 'histogram': histogram.to_dict()}
+                for (method, endpoint, status), histogram in self.requests.items()
+            ],
+            'checks': {name: list(counts) for name, counts in self.checks.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        registry = cls()
+        for series in data['requests']:
+            key = (series['method'], series['endpoint'], series['status'])
+            registry.requests[key] = LatencyHistogram.from_dict(series['histogram'])
+        registry.checks = {name: tuple(counts) for name, counts in data['checks'].items()}
+        return registry
+
+    def to_prometheus(self, labels=None):
+        """Render the registry in Prometheus text exposition format"""
+        labels = labels or {}
+        lines = [
+            "# HELP oku_http_request_duration_seconds API request latency by endpoint and status",
+            "# TYPE oku_http_request_duration_seconds histogram"
+        ]
+        for (method, endpoint, status), histogram in sorted(self.requests.items()):
+            series = dict(labels, method=method, endpoint=endpoint, status=status)
+            for bound in PROMETHEUS_BUCKETS_S:
+                le = prometheus_labels(dict(series, le=bound))
+                lines.append(f"oku_http_request_duration_seconds_bucket{le} {histogram.count_at_or_below(bound * 1000)}")
+            lines.append(f"oku_http_request_duration_seconds_bucket{prometheus_labels(dict(series, le='+Inf'))} {histogram.count}")
+            lines.append(f"oku_http_request_duration_seconds_sum{prometheus_labels(series)} {histogram.total_ms / 1000:.6f}")
+            lines.append(f"oku_http_request_duration_seconds_count{prometheus_labels(series)} {histogram.count}")
+
+        lines.append("# HELP oku_checks_total Test checks by name and result")
+        lines.append("# TYPE oku_checks_total counter")
+        for name, (passes, failures) in sorted(self.checks.items()):
+            lines.append(f"oku_checks_total{prometheus_labels(dict(labels, test=name, result='pass'))} {passes}")
+            lines.append(f"oku_checks_total{prometheus_labels(dict(labels, test=name, result='fail'))} {failures}")
+        return "\n".join(lines) + "\n"
+
+    def to_ndjson(self, labels=None):
+        """Render one JSON object per series, each tagged with the run labels"""
+        labels = labels or {}
+        lines = []
+        for (method, endpoint, status), histogram in sorted(self.requests.items()):
+            record = dict(labels, type='request', method=method, endpoint=endpoint, status=status)
+            record.update(histogram.summary())
+            record['histogram'] = histogram.to_dict()
+            lines.append(json.dumps(record))
+        for name, (passes, failures) in sorted(self.checks.items()):
+            lines.append(json.dumps(dict(labels, type='check', test=name, passed=passes, failed=failures)))
+        return "".join(line + "\n" for line in lines)
+
+def run_label(value):
+    """Parse a --run-label KEY=VALUE; KEY must be a valid Prometheus label name"""
+    key, separator, label_value = value.partition('=')
+    if not separator or not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', key):
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE with KEY a label name, got {value!r}")
+    return key, label_value
+
+def add_metrics_arguments(parser):
+    """Add the shared --metrics-* export options to a script's argument parser"""
+    parser.add_argument('--metrics-prom', help="Write Prometheus text metrics to this file")
+    parser.add_argument('--metrics-ndjson', help="Append newline-delimited JSON metrics to this file")
+    parser.add_argument('--run-label', action='append', default=[], type=run_label, metavar='KEY=VALUE',
+                        help="Extra label attached to every exported series (repeatable)")
+
+def export_metrics(registry, args, script):
+    """Write the registry to the files requested on the command line"""
+    if not (args.metrics_prom or args.metrics_ndjson):
+        return
+    labels = {'script': script, 'run_id': f"{script}-{int(time.time())}-{uuid.uuid4().hex[:6]}"}
+    labels.update(args.run_label)
+
+    if args.metrics_prom:
+        # Written via a temp file so a textfile collector never reads a partial file
+        temp_path = f"{args.metrics_prom}.tmp"
+        with open(temp_path, 'w') as handle:
+            handle.write(registry.to_prometheus(labels))
+        os.replace(temp_path, args.metrics_prom)
+        print(f"📈 Prometheus metrics written to {args.metrics_prom}")
+    if args.metrics_ndjson:
+        with open(args.metrics_ndjson, 'a') as handle:
+            handle.write(registry.to_ndjson(dict(labels, timestamp=datetime.now().isoformat(timespec='seconds'))))
+        print(f"📈 NDJSON metrics appended to {args.metrics_ndjson}")
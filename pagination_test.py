@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Listing Pagination Test
+Streams the full /api/bookings and /api/users listings to measure size, TTFB
+and parse memory, then walks the keyset-paginated versions and verifies they
+are complete, correctly ordered and constant-latency per page
+"""
+
+import argparse
+import codecs
+import json
+import re
+import sys
+import time
+import tracemalloc
+from statistics import median
+
+import requests
+
+from backend_test import OKUTransportAPITester, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+# name -> (endpoint, response key, cursor timestamp field)
+LISTINGS = {
+    'bookings': ('api/bookings', 'bookings', 'start_datetime'),
+    'users': ('api/users', 'users', 'createdAt')
+}
+
+class StreamingJSONArray:
+    """Incrementally decode the objects of one named array in a chunked JSON body.
+
+    Only the undecoded tail is buffered, so memory follows the largest row
+    rather than the whole response. Array elements must be objects, which
+    cannot be mistaken for complete values while still truncated.
+    """
+
+    SEPARATORS = re.compile(r'[\s,]*')
+
+    def __init__(self, key):
+        self.key_pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self.decoder = json.JSONDecoder()
+        self.bytes_read = 0
+
+    def iter_objects(self, chunks):
+        chunks = iter(chunks)
+        text = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        in_array = False
+
+        for chunk in chunks:
+            self.bytes_read += len(chunk)
+            buffer += text.decode(chunk)
+            if not in_array:
+                match = self.key_pattern.search(buffer)
+                if not match:
+                    continue
+                buffer = buffer[match.end():]
+                in_array = True
+
+            position = 0
+            while True:
+                position = self.SEPARATORS.match(buffer, position).end()
+                if position >= len(buffer):
+                    break
+                if buffer[position] == ']':
+                    # Array finished; drain the rest of the body so bytes_read is the full size
+                    for rest in chunks:
+                        self.bytes_read += len(rest)
+                    return
+                try:
+                    item, position = self.decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    break
+                yield item
+            buffer = buffer[position:]
+
+        raise ValueError("Response ended before the array was closed")
+
+class PaginationTester(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", timeout=120):
+        super().__init__(base_url)
+        self.timeout = timeout
+        self.admin = None
+
+    def setup_fixtures(self):
+        """Provision an admin, who sees every booking and user"""
+        print("\n🔧 Provisioning pagination admin...")
+        self.admin = self.provision_user("Company Admin", "page_admin")
+        return self.log_test("Pagination Fixtures", self.admin is not None,
+                             "Admin ready" if self.admin else "Could not provision admin")
+
+    def stream_listing(self, endpoint, key, timestamp_field):
+        """Stream the unpaginated listing and return its keys plus size, TTFB and parse memory"""
+        headers = {'Authorization': f"Bearer {self.admin['token']}"}
+        reader = StreamingJSONArray(key)
+        keys = []
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        ttfb = None
+        try:
+            with self.session.get(f"{self.base_url}/{endpoint}", headers=headers,
+                                  stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    return None
+                chunks = response.iter_content(chunk_size=64 * 1024)
+                first = next(chunks, b'')
+                ttfb = (time.perf_counter() - start) * 1000
+
+                def body():
+                    yield first
+                    yield from chunks
+
+                for item in reader.iter_objects(body()):
+                    keys.append((item[timestamp_field], item['id']))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Streaming error for {endpoint}: {str(e)}")
+            return None
+        finally:
+            _, stream_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        total_ms = (time.perf_counter() - start) * 1000
+
+        # Same listing parsed the naive way, for comparison
+        tracemalloc.start()
+        response, _ = self.send_request('GET', endpoint, token=self.admin['token'])
+        if response is not None and response.status_code == 200:
+            response.json()
+        _, buffered_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'rows': len(keys),
+            'keys': keys,
+            'response_mb': round(reader.bytes_read / 1024 / 1024, 3),
+            'ttfb_ms': round(ttfb, 2),
+            'total_ms': round(total_ms, 2),
+            'stream_parse_peak_mb': round(stream_peak / 1024 / 1024, 3),
+            'buffered_parse_peak_mb': round(buffered_peak / 1024 / 1024, 3)
+        }
+
+    def walk_pages(self, endpoint, key, timestamp_field, limit):
+        """Follow next_cursor to the end, returning row keys and per-page latencies"""
+        keys = []
+        latencies = []
+        cursor = None
+        while True:
+            query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+            response, timing = self.send_request('GET', f"{endpoint}{query}", token=self.admin['token'])
+            if response is None or response.status_code != 200:
+                return None, latencies
+            data = response.json()
+            latencies.append(timing['latency_ms'])
+            keys.extend((item[timestamp_field], item['id']) for item in data[key])
+            cursor = data.get('next_cursor')
+            if not cursor:
+                return keys, latencies
+
+    def check_listing(self, name, limit, max_latency_ratio, min_delta_ms):
+        """Verify the paged walk matches the full listing and page latency stays flat"""
+        endpoint, key, timestamp_field = LISTINGS[name]
+        print(f"\n🔍 Listing {name}: streaming full response, then pages of {limit}")
+
+        full = self.stream_listing(endpoint, key, timestamp_field)
+        if full is None:
+            return self.log_test(f"Stream {name}", False, "Full listing request failed")
+        print(f"   {full['rows']} rows, {full['response_mb']}MB, TTFB {full['ttfb_ms']}ms, "
+              f"total {full['total_ms']}ms")
+        print(f"   parse peak: streaming {full['stream_parse_peak_mb']}MB vs buffered {full['buffered_parse_peak_mb']}MB")
+
+        paged, latencies = self.walk_pages(endpoint, key, timestamp_field, limit)
+        if paged is None:
+            return self.log_test(f"Pagination {name}", False, f"Page {len(latencies) + 1} request failed")
+
+        duplicates = len(paged) - len(set(paged))
+        ordered = all(a > b for a, b in zip(paged, paged[1:]))
+        complete = paged == full['keys']
+        self.log_test(
+            f"Pagination Complete {name}",
+            complete and ordered and duplicates == 0,
+            f"{len(paged)}/{full['rows']} rows over {len(latencies)} pages, "
+            f"{duplicates} duplicates, strictly ordered={ordered}"
+        )
+
+        # Compare the last quarter of pages with the first: OFFSET paging grows, keyset should not
+        quarter = max(1, len(latencies) // 4)
+        first, last = median(latencies[:quarter]), median(latencies[-quarter:])
+        flat = last <= max(first * max_latency_ratio, first + min_delta_ms)
+        stats = latency_stats(latencies)
+        self.log_test(
+            f"Pagination Latency {name}",
+            flat,
+            f"first pages median {first:.2f}ms, last pages median {last:.2f}ms, "
+            f"p95 {stats['p95_ms']}ms over {len(latencies)} pages"
+        )
+
+        response, _ = self.send_request('GET', f"{endpoint}?limit={limit}&cursor=not-a-cursor",
+                                        token=self.admin['token'])
+        self.log_test(
+            f"Pagination Invalid Cursor {name}",
+            response is not None and response.status_code == 400,
+            f"Status: {response.status_code if response is not None else 'No response'}"
+        )
+
+        full.pop('keys')
+        return dict(full, pages=len(latencies), page_latency=stats,
+                    first_pages_median_ms=first, last_pages_median_ms=last)
+
+    def run_checks(self, names, limit, max_latency_ratio, min_delta_ms):
+        print("=" * 80)
+        print("📑 OKU TRANSPORT SYSTEM - LISTING PAGINATION TEST")
+        print("=" * 80)
+
+        if not self.setup_fixtures():
+            return None
+
+        listings = {name: self.check_listing(name, limit, max_latency_ratio, min_delta_ms) for name in names}
+        return {'listings': listings, 'results': self.test_results}
+
+def main():
+    """Main pagination test execution"""
+    parser = argparse.ArgumentParser(description="Streaming and keyset pagination test for listings")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--listings', default="bookings,users", help=f"Comma separated, from {sorted(LISTINGS)}")
+    parser.add_argument('--limit', type=int, default=100, help="Page size")
+    parser.add_argument('--max-latency-ratio', type=float, default=2.0,
+                        help="Allowed last/first page median latency ratio")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help="Ignore page latency drift smaller than this")
+    parser.add_argument('--timeout', type=float, default=120)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    names = args.listings.split(',')
+    unknown = [name for name in names if name not in LISTINGS]
+    if unknown:
+        parser.error(f"Unknown listings {unknown}")
+
+    tester = PaginationTester(args.base_url, args.timeout)
+    results = tester.run_checks(names, args.limit, args.max_latency_ratio, args.min_delta_ms)
+    tester.session.close()
+    export_metrics(tester.metrics, args, 'pagination_test')
+
+    if results and tester.tests_run == tester.tests_passed:
+        print("\n🎉 Pagination is complete and flat!")
+        return 0
+    else:
+        print(f"\n⚠️  {tester.tests_run - tester.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Query Plan and Index Advisor
+Runs EXPLAIN / EXPLAIN ANALYZE for the hot server.js statements against the
+live schema, flags full scans and filesorts, proposes composite indexes and
+times the queries before and after adding them on a scratch database copy
+"""
+
+import argparse
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from backend_test import DB_CONFIG, OKUTransportAPITester, get_db_connection, latency_stats
+
+ACTIVE_STATUSES = "('pending', 'approved', 'in_progress')"
+# The scratch database is dropped and recreated, so it must never name a real schema
+PROTECTED_SCHEMAS = {'mysql', 'information_schema', 'performance_schema', 'sys'}
+
+# Statements copied from server.js, with mysql.connector placeholders.
+# Each names the indexes that would serve it as (table, alias in the plan, name,
+# columns); the advisor only proposes those whose table shows a plan problem.
+HOT_QUERIES = [
+    {
+        'name': 'booking_conflict_check',
+        'source': 'POST /api/bookings (under the driver row lock, when the interval index finds no conflict)',
+        'sql': f"""SELECT id FROM tbbook
+                   WHERE driver_id = %s AND status IN {ACTIVE_STATUSES}
+                     AND NOT (%s <= start_datetime OR %s >= end_datetime)
+                   LIMIT 1""",
+        'params': lambda s: (s['driver_id'], s['window_end'], s['window_start']),
+        'candidate_indexes': [('tbbook', 'tbbook', 'idx_driver_status_time', ['driver_id', 'status', 'start_datetime', 'end_datetime'])]
+    },
+    {
+        'name': 'booking_index_load',
+        'source': 'getBookingIndex (POST /api/bookings, GET /api/driver/:driverId/availability)',
+        'sql': f"""SELECT id, start_datetime, end_datetime FROM tbbook
+                   WHERE driver_id = %s AND status IN {ACTIVE_STATUSES}""",
+        'params': lambda s: (s['driver_id'],),
+        'candidate_indexes': [('tbbook', 'tbbook', 'idx_driver_status_time', ['driver_id', 'status', 'start_datetime', 'end_datetime'])]
+    },
+    {
+        'name': 'driver_schedule',
+        'source': 'GET /api/driver/:driverId/schedule (cache miss)',
+        'sql': f"""SELECT b.id, b.start_datetime, b.end_datetime, b.status, b.pickup_location, b.dropoff_location,
+                          u.name as oku_name
+                   FROM tbbook b
+                   JOIN tbuser u ON b.oku_id = u.id
+                   WHERE b.driver_id = %s AND b.status IN {ACTIVE_STATUSES}
+                     AND b.start_datetime >= %s AND b.start_datetime < DATE_ADD(%s, INTERVAL 1 DAY)
+                   ORDER BY b.start_datetime ASC""",
+        'params': lambda s: (s['driver_id'], s['date'], s['date']),
+        'candidate_indexes': [('tbbook', 'b', 'idx_driver_status_time', ['driver_id', 'status', 'start_datetime', 'end_datetime'])]
+    },
+    {
+        'name': 'bookings_driver',
+        'source': 'GET /api/bookings (Driver)',
+        'sql': """SELECT b.*, u.name as oku_name, u.phone as oku_phone,
+                         acc.disability_type, acc.mobility_aid, acc.special_requirements
+                  FROM tbbook b
+                  JOIN tbuser u ON b.oku_id = u.id
+                  LEFT JOIN tbaccessibilities acc ON b.oku_id = acc.user_id
+                  WHERE b.driver_id = %s
+                  ORDER BY b.start_datetime DESC, b.id DESC""",
+        'params': lambda s: (s['driver_id'],),
+        'candidate_indexes': [('tbbook', 'b', 'idx_driver_time', ['driver_id', 'start_datetime', 'end_datetime'])]
+    },
+    {
+        'name': 'bookings_oku',
+        'source': 'GET /api/bookings (OKU User)',
+        'sql': """SELECT b.*, u.name as driver_name, u.phone as driver_phone,
+                         u.vehicleType, u.vehicleNumber, u.vehicleFeatures, u.status as driver_status
+                  FROM tbbook b
+                  JOIN tbuser u ON b.driver_id = u.id
+                  WHERE b.oku_id = %s
+                  ORDER BY b.start_datetime DESC, b.id DESC""",
+        'params': lambda s: (s['oku_id'],),
+        'candidate_indexes': [('tbbook', 'b', 'idx_oku_start', ['oku_id', 'start_datetime'])]
+    },
+    {
+        'name': 'bookings_admin',
+        'source': 'GET /api/bookings (Company Admin / JKM Officer)',
+        'sql': """SELECT b.*,
+                         oku.name as oku_name, oku.phone as oku_phone,
+                         driver.name as driver_name, driver.phone as driver_phone,
+                         driver.vehicleType, driver.vehicleNumber, driver.vehicleFeatures
+                  FROM tbbook b
+                  JOIN tbuser oku ON b.oku_id = oku.id
+                  JOIN tbuser driver ON b.driver_id = driver.id
+                  ORDER BY b.start_datetime DESC, b.id DESC""",
+        'params': lambda s: (),
+        'candidate_indexes': [('tbbook', 'b', 'idx_start', ['start_datetime'])]
+    },
+    {
+        'name': 'gps_latest',
+        'source': 'GET /api/gps/latest',
+        'sql': """SELECT l.gps_id as id, l.driver_id, l.booking_id, l.lat, l.lng, l.speed, l.heading, l.accuracy,
+                         l.timestamp, u.name as driver_name, u.vehicleType, u.vehicleNumber
+                  FROM gps_latest l
+                  JOIN tbuser u ON l.driver_id = u.id
+                  WHERE l.timestamp >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+                  ORDER BY l.timestamp DESC
+                  LIMIT 2000""",
+        'params': lambda s: (),
+        'candidate_indexes': [('gps_latest', 'l', 'idx_timestamp', ['timestamp'])]
+    }
+]
+
+SCRATCH_TABLES = ['tbuser', 'tbaccessibilities', 'assignments', 'tbbook', 'gps_tracking', 'gps_latest']
+
+class QueryAdvisor(OKUTransportAPITester):
+    def __init__(self, runs=10):
+        super().__init__()
+        self.runs = runs
+
+    def sample_parameters(self, cursor):
+        """Pick realistic parameter values from the busiest driver and OKU user"""
+        cursor.execute("SELECT driver_id FROM tbbook GROUP BY driver_id ORDER BY COUNT(*) DESC LIMIT 1")
+        driver = cursor.fetchone()
+        cursor.execute("SELECT oku_id FROM tbbook GROUP BY oku_id ORDER BY COUNT(*) DESC LIMIT 1")
+        oku = cursor.fetchone()
+
+        start = datetime.now() + timedelta(days=1)
+        return {
+            'driver_id': driver[0] if driver else 0,
+            'oku_id': oku[0] if oku else 0,
+            'window_start': start.strftime('%Y-%m-%d %H:%M:%S'),
+            'window_end': (start + timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S'),
+            'date': start.strftime('%Y-%m-%d')
+        }
+
+    def explain(self, cursor, query, params):
+        """Return the traditional EXPLAIN rows and any problems they show"""
+        cursor.execute(f"EXPLAIN {query['sql']}", query['params'](params))
+        columns = [column[0] for column in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        problems = []
+        for row in plan:
+            extra = row.get('Extra') or ''
+            if row.get('type') == 'ALL':
+                problems.append((row.get('table'), f"full scan of {row.get('table')} (~{row.get('rows')} rows)"))
+            if 'Using filesort' in extra:
+                problems.append((row.get('table'), f"filesort on {row.get('table')}"))
+            if 'Using temporary' in extra:
+                problems.append((row.get('table'), f"temporary table for {row.get('table')}"))
+        return plan, problems
+
+    def explain_analyze(self, cursor, query, params):
+        """Return EXPLAIN ANALYZE output where the server supports it (MySQL 8.0.18+)"""
+        try:
+            cursor.execute(f"EXPLAIN ANALYZE {query['sql']}", query['params'](params))
+            return "\n".join(str(row[0]) for row in cursor.fetchall())
+        except mysql.connector.Error:
+            return None
+
+    def time_query(self, cursor, query, params):
+        """Execute a statement self.runs times and return its latency stats"""
+        samples = []
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            cursor.execute(query['sql'], query['params'](params))
+            cursor.fetchall()
+            samples.append(round((time.perf_counter() - start) * 1000, 3))
+        return latency_stats(samples)
+
+    def existing_indexes(self, cursor, table):
+        """Return {index_name: [columns]} for a table"""
+        cursor.execute(f"SHOW INDEX FROM {table}")
+        columns = [column[0] for column in cursor.description]
+        indexes = {}
+        for row in cursor.fetchall():
+            entry = dict(zip(columns, row))
+            indexes.setdefault(entry['Key_name'], []).append(entry['Column_name'])
+        return indexes
+
+    def propose_indexes(self, cursor, query, problems):
+        """Propose candidate indexes for tables with plan problems that are not already indexed"""
+        problem_tables = {table for table, _ in problems}
+        proposals = []
+        for table, alias, name, columns in query['candidate_indexes']:
+            if alias not in problem_tables:
+                continue
+            if columns in self.existing_indexes(cursor, table).values():
+                continue
+            proposals.append((table, name, columns))
+        return proposals
+
+    def create_scratch_copy(self, cursor, scratch_db):
+        """Copy the hot tables into a scratch database so index experiments are safe"""
+        print(f"\n📦 Copying tables into scratch database {scratch_db}...")
+        cursor.execute(f"DROP DATABASE IF EXISTS {scratch_db}")
+        cursor.execute(f"CREATE DATABASE {scratch_db}")
+        for table in SCRATCH_TABLES:
+            started = time.perf_counter()
+            cursor.execute(f"CREATE TABLE {scratch_db}.{table} LIKE {DB_CONFIG['database']}.{table}")
+            cursor.execute(f"INSERT INTO {scratch_db}.{table} SELECT * FROM {DB_CONFIG['database']}.{table}")
+            print(f"   {table}: {cursor.rowcount:,} rows in {time.perf_counter() - started:.1f}s")
+
+    def run_advisor(self, scratch_db, keep_scratch):
+        """Explain every hot query, propose indexes and measure them on a scratch copy"""
+        print("=" * 80)
+        print("🧭 OKU TRANSPORT SYSTEM - QUERY PLAN AND INDEX ADVISOR")
+        print("=" * 80)
+
+        connection = get_db_connection()
+        connection.autocommit = True
+        cursor = connection.cursor()
+        report = []
+        try:
+            params = self.sample_parameters(cursor)
+            print(f"\nParameters: {params}")
+
+            for query in HOT_QUERIES:
+                print(f"\n🔍 {query['name']} ({query['source']})")
+                plan, problems = self.explain(cursor, query, params)
+                for row in plan:
+                    print(f"   {row.get('table')}: type={row.get('type')} key={row.get('key')} "
+                          f"rows={row.get('rows')} extra={row.get('Extra')}")
+
+                analyzed = self.explain_analyze(cursor, query, params)
+                if analyzed:
+                    print("   " + analyzed.replace("\n", "\n   "))
+
+                proposals = self.propose_indexes(cursor, query, problems)
+                for table, name, columns in proposals:
+                    print(f"   💡 CREATE INDEX {name} ON {table} ({', '.join(columns)});")
+
+                self.log_test(f"Query Plan {query['name']}", not problems,
+                              "; ".join(problem for _, problem in problems) or "index-only access, no filesort")
+                report.append({'query': query, 'plan': plan, 'problems': problems, 'proposals': proposals})
+
+            proposals = {(table, name): columns for entry in report for table, name, columns in entry['proposals']}
+            if proposals:
+                self.measure_on_scratch(cursor, scratch_db, report, proposals, params)
+                if not keep_scratch:
+                    cursor.execute(f"DROP DATABASE IF EXISTS {scratch_db}")
+        finally:
+            cursor.close()
+            connection.close()
+
+        return report
+
+    def measure_on_scratch(self, cursor, scratch_db, report, proposals, params):
+        """Time each query on the scratch copy before and after adding the proposed indexes"""
+        self.create_scratch_copy(cursor, scratch_db)
+        cursor.execute(f"USE {scratch_db}")
+
+        print("\n⏱️  Timing before indexes...")
+        for entry in report:
+            entry['before'] = self.time_query(cursor, entry['query'], params)
+
+        for (table, name), columns in proposals.items():
+            started = time.perf_counter()
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+            print(f"   built {name} on {table} in {time.perf_counter() - started:.1f}s")
+
+        print("\n⏱️  Timing after indexes...")
+        for entry in report:
+            entry['after'] = self.time_query(cursor, entry['query'], params)
+            before, after = entry['before'], entry['after']
+            print(f"   {entry['query']['name']}: p50 {before['p50_ms']}ms -> {after['p50_ms']}ms, "
+                  f"p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+
+        cursor.execute(f"USE {DB_CONFIG['database']}")
+
+def main():
+    """Main advisor execution"""
+    parser = argparse.ArgumentParser(description="Query plan and index advisor")
+    parser.add_argument('--runs', type=int, default=10, help="Timed executions per query")
+    parser.add_argument('--scratch-db', default=f"{DB_CONFIG['database']}_advisor_scratch")
+    parser.add_argument('--keep-scratch', action='store_true', help="Leave the scratch database in place")
+    args = parser.parse_args()
+    # Interpolated into DROP DATABASE, so only a plain identifier that is not a live schema
+    if not re.fullmatch(r'[A-Za-z0-9_]{1,64}', args.scratch_db):
+        parser.error("--scratch-db must be a plain identifier (letters, digits, underscores)")
+    if args.scratch_db.lower() in PROTECTED_SCHEMAS | {DB_CONFIG['database'].lower()}:
+        parser.error(f"--scratch-db {args.scratch_db} would drop a real schema")
+
+    advisor = QueryAdvisor(runs=args.runs)
+    advisor.run_advisor(args.scratch_db, args.keep_scratch)
+    advisor.session.close()
+    return 0 if advisor.tests_run == advisor.tests_passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Driver Schedule Benchmark
+Builds weekly schedules for a fleet, sweeps GET /api/driver/:id/schedule over
+drivers x dates concurrently, reports latency by bookings-per-day density and
+verifies the server's per-date schedule cache never serves stale results
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+ACTIVE_STATUSES = ('pending', 'approved', 'in_progress')
+# (label, lowest, highest) bookings per driver-day
+DENSITY_BUCKETS = [('0', 0, 0), ('1', 1, 1), ('2', 2, 2), ('3-4', 3, 4), ('5-8', 5, 8), ('9+', 9, None)]
+
+def density_bucket(count):
+    for label, low, high in DENSITY_BUCKETS:
+        if count >= low and (high is None or count <= high):
+            return label
+
+class ScheduleBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=20):
+        super().__init__(base_url, pool_size=concurrency)
+        self.concurrency = concurrency
+        self.admin = None
+        self.drivers = []  # [{'id': ..., 'oku': provisioned OKU user or None}]
+        self.dates = []
+
+    def build_fleet(self, driver_count, days, max_per_day):
+        """Provision drivers with assigned OKU users and a week of bookings at varied density"""
+        print(f"\n🔧 Building {driver_count} driver schedules over {days} days...")
+
+        self.admin = self.provision_user("Company Admin", "sched_admin")
+        if not self.admin:
+            return self.log_test("Schedule Fixtures", False, "Could not provision admin user")
+
+        first_day = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.dates = [(first_day + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days)]
+
+        jobs = []
+        for index in range(driver_count):
+            driver = self.provision_user("Driver", "sched_driver", admin_token=self.admin['token'])
+            oku = self.provision_user("OKU User", "sched_oku")
+            if not (driver and oku):
+                continue
+            assignment = {
+                "oku_id": oku['id'],
+                "driver_id": driver['id'],
+                "effective_from": datetime.now().strftime('%Y-%m-%d'),
+                "effective_to": (first_day + timedelta(days=days)).strftime('%Y-%m-%d'),
+                "notes": "Schedule benchmark assignment"
+            }
+            self.send_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+            self.drivers.append({'id': driver['id'], 'oku': oku})
+
+            # Spread drivers across densities 0..max_per_day; slots are 90 minutes apart from 07:00
+            per_day = index % (max_per_day + 1)
+            for offset in range(days):
+                for slot in range(per_day):
+                    start = first_day + timedelta(days=offset, hours=7, minutes=90 * slot)
+                    jobs.append((oku, driver['id'], start))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            statuses = list(executor.map(lambda job: self.create_booking(*job)[0], jobs))
+        created = sum(1 for status in statuses if status == 200)
+
+        return self.log_test(
+            "Schedule Fixtures",
+            len(self.drivers) == driver_count and created == len(jobs),
+            f"{len(self.drivers)}/{driver_count} drivers, {created}/{len(jobs)} bookings"
+        )
+
+    def use_seeded(self, driver_count, start_date, days):
+        """Sweep the drivers with the most active bookings already in the database"""
+        print(f"\n🔧 Selecting {driver_count} busiest seeded drivers...")
+
+        self.admin = self.provision_user("Company Admin", "sched_admin")
+        if not self.admin:
+            return self.log_test("Schedule Fixtures", False, "Could not provision admin user")
+
+        placeholders = ', '.join(['%s'] * len(ACTIVE_STATUSES))
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"""SELECT driver_id FROM tbbook WHERE status IN ({placeholders})
+                    GROUP BY driver_id ORDER BY COUNT(*) DESC LIMIT %s""",
+                (*ACTIVE_STATUSES, driver_count)
+            )
+            self.drivers = [{'id': row[0], 'oku': None} for row in cursor.fetchall()]
+            cursor.close()
+        finally:
+            connection.close()
+
+        first_day = datetime.strptime(start_date, '%Y-%m-%d')
+        self.dates = [(first_day + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(days)]
+        return self.log_test("Schedule Fixtures", len(self.drivers) > 0,
+                             f"{len(self.drivers)} seeded drivers from {start_date}")
+
+    def create_booking(self, oku, driver_id, start, minutes=60):
+        """Book a driver slot as the assigned OKU user; return (status, booking id)"""
+        booking = {
+            "driver_id": driver_id,
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (start + timedelta(minutes=minutes)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Schedule Pickup",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Schedule Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Schedule benchmark",
+            "special_instructions": ""
+        }
+        response, _ = self.send_request('POST', 'api/bookings', booking, token=oku['token'])
+        if response is None:
+            return None, None
+        return response.status_code, response.json().get('bookingId') if response.status_code == 200 else None
+
+    def fetch_schedule(self, driver_id, date):
+        """Return (schedule rows or None, timing dict with the X-Cache header added)"""
+        response, timing = self.send_request('GET', f"api/driver/{driver_id}/schedule?date={date}",
+                                             token=self.admin['token'])
+        timing['cache'] = response.headers.get('X-Cache') if response is not None else None
+        if response is None or response.status_code != 200:
+            return None, timing
+        return response.json().get('schedule', []), timing
+
+    def sweep(self, passes):
+        """Fetch every driver x date `passes` times; the first pass is the cold one"""
+        jobs = [(driver['id'], date) for driver in self.drivers for date in self.dates]
+        reports = []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for number in range(1, passes + 1):
+                started = time.perf_counter()
+                fetched = list(executor.map(lambda job: self.fetch_schedule(*job), jobs))
+                elapsed = time.perf_counter() - started
+
+                by_density = {}
+                errors = hits = 0
+                for schedule, timing in fetched:
+                    if schedule is None:
+                        errors += 1
+                        continue
+                    hits += timing['cache'] == 'HIT'
+                    by_density.setdefault(density_bucket(len(schedule)), []).append(timing['latency_ms'])
+
+                report = {
+                    'pass': number,
+                    'requests': len(jobs),
+                    'errors': errors,
+                    'requests_per_sec': round(len(jobs) / elapsed, 2) if elapsed > 0 else 0,
+                    'cache_hit_ratio': round(hits / len(jobs), 3) if jobs else 0,
+                    'latency': latency_stats([timing['latency_ms'] for _, timing in fetched]),
+                    'by_density': {label: latency_stats(by_density[label])
+                                   for label, _, _ in DENSITY_BUCKETS if label in by_density}
+                }
+                reports.append(report)
+
+                print(f"\n🔁 Pass {number}: {report['requests']} schedules, {report['requests_per_sec']} req/s, "
+                      f"hit ratio {report['cache_hit_ratio']:.0%}, errors {errors}, "
+                      f"p50 {report['latency'].get('p50_ms')}ms, p95 {report['latency'].get('p95_ms')}ms")
+                for label, stats in report['by_density'].items():
+                    print(f"   {label:>4} bookings/day: {stats['count']} req, p50 {stats['p50_ms']}ms, "
+                          f"p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms")
+
+                self.log_test(f"Schedule Sweep Pass {number}", errors == 0,
+                              f"{errors} failed of {len(jobs)} schedule requests")
+        return reports
+
+    def check_fresh(self, step, driver_id, date, booking_id, expected_status):
+        """Fetch straight after a write; expected_status None means the booking must be gone"""
+        schedule, timing = self.fetch_schedule(driver_id, date)
+        if schedule is None:
+            return self.log_test(f"Schedule Cache {step}", False, f"Schedule request failed for driver {driver_id}")
+
+        entry = next((row for row in schedule if row['id'] == booking_id), None)
+        found = entry['status'] if entry else None
+        return self.log_test(
+            f"Schedule Cache {step}",
+            found == expected_status,
+            f"driver {driver_id} {date}: booking {booking_id} status {found}, expected {expected_status} "
+            f"(served {timing['cache'] or 'uncached'})"
+        )
+
+    def validate_cache(self, samples):
+        """Cancel, restore and (for built fleets) create bookings behind a warm cache entry"""
+        print(f"\n🧪 Validating schedule cache freshness on {samples} driver-days...")
+
+        checked = 0
+        for driver in self.drivers:
+            for date in self.dates:
+                if checked >= samples:
+                    return checked
+                schedule, _ = self.fetch_schedule(driver['id'], date)
+                if not schedule:
+                    continue
+                # Second read should now be served from the cache
+                _, timing = self.fetch_schedule(driver['id'], date)
+                self.log_test("Schedule Cache Warm", timing['cache'] == 'HIT',
+                              f"driver {driver['id']} {date} served {timing['cache'] or 'uncached'}")
+
+                booking = schedule[0]
+                endpoint = f"api/bookings/{booking['id']}/status"
+                self.send_request('PUT', endpoint, {"status": "cancelled"}, token=self.admin['token'])
+                self.check_fresh("After Cancel", driver['id'], date, booking['id'], None)
+                self.send_request('PUT', endpoint, {"status": booking['status']}, token=self.admin['token'])
+                self.check_fresh("After Restore", driver['id'], date, booking['id'], booking['status'])
+
+                if driver['oku']:
+                    # 21:30 is after every generated slot, so this never conflicts
+                    start = datetime.strptime(f"{date} 21:30", '%Y-%m-%d %H:%M')
+                    status, booking_id = self.create_booking(driver['oku'], driver['id'], start, minutes=30)
+                    if status == 200:
+                        self.check_fresh("After Create", driver['id'], date, booking_id, 'pending')
+                    else:
+                        self.log_test("Schedule Cache After Create", False, f"Booking create returned {status}")
+                checked += 1
+        return checked
+
+    def run_benchmark(self, passes, samples):
+        print("=" * 80)
+        print("🗓️  OKU TRANSPORT SYSTEM - DRIVER SCHEDULE BENCHMARK")
+        print("=" * 80)
+        print(f"{len(self.drivers)} drivers x {len(self.dates)} dates, {self.concurrency} concurrent requests")
+
+        reports = self.sweep(passes)
+        checked = self.validate_cache(samples) if samples else 0
+        if samples and not checked:
+            self.log_test("Schedule Cache Validation", False, "No driver-day with bookings to validate against")
+        return {'passes': reports, 'validated_driver_days': checked, 'results': self.test_results}
+
+def main():
+    """Main driver schedule benchmark execution"""
+    parser = argparse.ArgumentParser(description="Driver schedule sweep and cache validation")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=20)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--max-per-day', type=int, default=8, help="Highest bookings/day density to build")
+    parser.add_argument('--seeded', action='store_true', help="Sweep seed_data.py drivers instead of building a fleet")
+    parser.add_argument('--start-date', default=datetime.now().strftime('%Y-%m-%d'), help="First date for --seeded")
+    parser.add_argument('--passes', type=int, default=3, help="Sweeps over every driver x date")
+    parser.add_argument('--validate', type=int, default=5, help="Driver-days to check for stale cache entries")
+    parser.add_argument('--concurrency', type=int, default=20)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if not 0 <= args.max_per_day <= 9:
+        parser.error("--max-per-day must be between 0 and 9 so generated slots end before 21:30")
+
+    benchmark = ScheduleBenchmark(args.base_url, concurrency=args.concurrency)
+    if args.seeded:
+        ready = benchmark.use_seeded(args.drivers, args.start_date, args.days)
+    else:
+        ready = benchmark.build_fleet(args.drivers, args.days, args.max_per_day)
+    if not ready:
+        return 1
+
+    benchmark.run_benchmark(args.passes, args.validate)
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'schedule_benchmark')
+
+    if benchmark.tests_run == benchmark.tests_passed:
+        print("\n🎉 Schedules served fresh!")
+        return 0
+    else:
+        print(f"\n⚠️  {benchmark.tests_run - benchmark.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Bulk Synthetic Data Seeder
+Generates production-scale users, accessibility profiles, assignments,
+bookings and GPS history matching database/schema.sql and loads them with
+batched multi-row inserts or LOAD DATA LOCAL INFILE
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend_test import get_db_connection
+
+# bcrypt hash of "password123" so seeded users can log in through /api/login
+SEEDED_PASSWORD_HASH = "$2b$10$y7Q8SsUR1TqHuHHIQtbsl.lVk4dt3yUFbWYPB5K/xV0tAX2MG5d16"
+
+USER_TYPE_WEIGHTS = [
+    ("OKU User", 0.80),
+    ("Driver", 0.15),
+    ("Company Admin", 0.03),
+    ("JKM Officer", 0.02)
+]
+DRIVER_STATUS_WEIGHTS = [("approved", 0.85), ("pending", 0.10), ("rejected", 0.05)]
+VEHICLE_TYPES = ["MPV", "Van", "Sedan", "Wheelchair Van"]
+VEHICLE_FEATURES = ["wheelchair_accessible", "ramp", "lift", "air_conditioning", "extra_legroom", "oxygen_support"]
+MOBILITY_AIDS = ["wheelchair", "walker", "crutches", "none"]
+DISABILITY_TYPES = ["Physical", "Visual", "Hearing", "Learning", "Multiple"]
+
+BASE_LAT = 5.3307
+BASE_LNG = 103.1324
+
+TABLE_COLUMNS = {
+    'tbuser': ['id', 'name', 'userType', 'email', 'phone', 'password', 'status', 'licenseNumber',
+               'vehicleType', 'vehicleNumber', 'vehicleFeatures', 'createdAt'],
+    'tbaccessibilities': ['user_id', 'disability_type', 'mobility_aid', 'preferred_vehicle', 'vehicle_features'],
+    'assignments': ['oku_id', 'driver_id', 'assigned_by', 'effective_from', 'effective_to', 'notes'],
+    'tbbook': ['oku_id', 'driver_id', 'booking_type', 'start_datetime', 'end_datetime',
+               'pickup_location', 'pickup_lat', 'pickup_lng', 'dropoff_location', 'dropoff_lat',
+               'dropoff_lng', 'purpose', 'status', 'estimated_duration'],
+    'gps_tracking': ['driver_id', 'lat', 'lng', 'speed', 'heading', 'accuracy', 'timestamp']
+}
+
+def weighted_choice(rng, weights):
+    """Pick a value from [(value, weight)] pairs"""
+    point = rng.random()
+    for value, weight in weights:
+        point -= weight
+        if point < 0:
+            return value
+    return weights[-1][0]
+
+class ProgressReporter:
+    """Prints rows loaded and throughput for one table at a fixed interval"""
+
+    def __init__(self, table, total, interval_s=5):
+        self.table = table
+        self.total = total
+        self.interval_s = interval_s
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.last_report = self.started
+
+    def advance(self, rows):
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval_s:
+            self.last_report = now
+            rate = self.rows / (now - self.started)
+            print(f"   {self.table}: {self.rows:,}/{self.total:,} rows ({rate:,.0f} rows/s)")
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed > 0 else 0
+        print(f"✅ {self.table}: {self.rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        return {'rows': self.rows, 'elapsed_s': round(elapsed, 2), 'rows_per_sec': round(rate, 1)}
+
+class DataSeeder:
+    def __init__(self, seed=42, batch_size=5000, method="insert"):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.method = method
+        self.connection = get_db_connection(allow_local_infile=(method == "load-data"))
+        self.cursor = self.connection.cursor()
+        self.now = datetime.now().replace(microsecond=0)
+        self.oku_ids = []
+        self.driver_ids = []
+        self.approved_driver_ids = []
+        self.admin_ids = []
+        self.driver_oku = {}
+        self.report = {}
+
+    def close(self):
+        self.cursor.close()
+        self.connection.close()
+
+    def load_rows(self, table, rows, total):
+        """Load a row generator into table in batches and report throughput"""
+        progress = ProgressReporter(table, total)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.flush_batch(table, batch)
+                progress.advance(len(batch))
+                batch = []
+        if batch:
+            self.flush_batch(table, batch)
+            progress.advance(len(batch))
+        self.report[table] = progress.finish()
+
+    def flush_batch(self, table, batch):
+        """Write one batch with a multi-row INSERT or LOAD DATA LOCAL INFILE"""
+        columns = TABLE_COLUMNS[table]
+        if self.method == "load-data":
+            with tempfile.NamedTemporaryFile('w', newline='', suffix='.csv', delete=False) as handle:
+                writer = csv.writer(handle)
+                for row in batch:
+                    writer.writerow(['NULL' if value is None else value for value in row])
+                path = handle.name
+            try:
+                self.cursor.execute(
+                    f"""LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+                        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                        LINES TERMINATED BY '\\r\\n' ({', '.join(columns)})""",
+                    (path,)
+                )
+            finally:
+                os.unlink(path)
+        else:
+            # mysql.connector rewrites executemany INSERTs into one multi-row statement
+            placeholders = ', '.join(['%s'] * len(columns))
+            self.cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                batch
+            )
+        self.connection.commit()
+
+    def generate_users(self, count, role=None):
+        """Yield tbuser rows with explicit ids so later tables can reference them; role fixes every userType"""
+        self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tbuser")
+        first_id = self.cursor.fetchone()[0] + 1
+
+        for user_id in range(first_id, first_id + count):
+            user_type = role or weighted_choice(self.rng, USER_TYPE_WEIGHTS)
+            created = self.now - timedelta(days=self.rng.randint(0, 730), seconds=self.rng.randint(0, 86399))
+            license_number = vehicle_type = vehicle_number = features = None
+
+            if user_type == "Driver":
+                status = weighted_choice(self.rng, DRIVER_STATUS_WEIGHTS)
+                license_number = f"D{self.rng.randint(100000000, 999999999)}"
+                vehicle_type = self.rng.choice(VEHICLE_TYPES)
+                vehicle_number = f"T{chr(65 + self.rng.randint(0, 25))}{chr(65 + self.rng.randint(0, 25))}{self.rng.randint(1000, 9999)}"
+                features = json.dumps(self.rng.sample(VEHICLE_FEATURES, self.rng.randint(1, 4)))
+                self.driver_ids.append(user_id)
+                if status == "approved":
+                    self.approved_driver_ids.append(user_id)
+            else:
+                status = "active"
+                if user_type == "OKU User":
+                    self.oku_ids.append(user_id)
+                else:
+                    self.admin_ids.append(user_id)
+
+            yield (
+                user_id, f"Seed {user_type} {user_id}", user_type, f"seed_{user_id}@seed.example.com",
+                f"01{self.rng.randint(10000000, 99999999)}", SEEDED_PASSWORD_HASH, status,
+                license_number, vehicle_type, vehicle_number, features,
+                created.strftime('%Y-%m-%d %H:%M:%S')
+            )
+
+    def generate_accessibilities(self):
+        """Yield one accessibility profile per OKU user"""
+        for oku_id in self.oku_ids:
+            aid = self.rng.choice(MOBILITY_AIDS)
+            needs = ["wheelchair_accessible", "ramp"] if aid == "wheelchair" else self.rng.sample(VEHICLE_FEATURES, self.rng.randint(0, 2))
+            yield (
+                oku_id, self.rng.choice(DISABILITY_TYPES), aid,
+                self.rng.choice(VEHICLE_TYPES), json.dumps(needs)
+            )
+
+    def generate_assignments(self):
+        """Yield one active primary assignment per OKU user to an approved driver"""
+        for oku_id in self.oku_ids:
+            driver_id = self.rng.choice(self.approved_driver_ids)
+            self.driver_oku.setdefault(driver_id, []).append(oku_id)
+            effective_from = self.now.date() - timedelta(days=self.rng.randint(0, 365))
+            yield (
+                oku_id, driver_id, self.rng.choice(self.admin_ids),
+                effective_from.isoformat(), (effective_from + timedelta(days=365)).isoformat(),
+                "Seeded assignment"
+            )
+
+    def generate_bookings(self, count, history_days=180, future_days=30):
+        """Yield non-overlapping bookings per driver across past and future dates"""
+        drivers = list(self.driver_oku)
+        per_driver = math.ceil(count / len(drivers))
+        window_start = self.now - timedelta(days=history_days)
+        window_end = self.now + timedelta(days=future_days)
+        # Average gap (minus the mean 105 minute duration) that spreads per_driver bookings across the window
+        mean_gap_min = max(30, (window_end - window_start).total_seconds() / 60 / per_driver - 105)
+
+        produced = 0
+        for driver_id in drivers:
+            cursor_time = window_start + timedelta(minutes=self.rng.randint(0, 600))
+            for _ in range(per_driver):
+                if produced >= count:
+                    return
+                duration = self.rng.randint(30, 180)
+                start = cursor_time + timedelta(minutes=int(self.rng.expovariate(1 / mean_gap_min)))
+                end = start + timedelta(minutes=duration)
+                cursor_time = end
+
+                if end < self.now:
+                    status = weighted_choice(self.rng, [("completed", 0.85), ("cancelled", 0.10), ("rejected", 0.05)])
+                elif start <= self.now:
+                    status = "in_progress"
+                else:
+                    status = weighted_choice(self.rng, [("approved", 0.6), ("pending", 0.4)])
+
+                yield (
+                    self.rng.choice(self.driver_oku[driver_id]), driver_id,
+                    "monthly" if self.rng.random() < 0.05 else "daily",
+                    start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S'),
+                    "Seed Pickup", round(BASE_LAT + self.rng.uniform(-0.05, 0.05), 8),
+                    round(BASE_LNG + self.rng.uniform(-0.05, 0.05), 8),
+                    "Seed Dropoff", round(BASE_LAT + self.rng.uniform(-0.05, 0.05), 8),
+                    round(BASE_LNG + self.rng.uniform(-0.05, 0.05), 8),
+                    "Medical appointment", status, duration
+                )
+                produced += 1
+
+    def generate_gps(self, count, interval_s=10):
+        """Yield random-walk fixes per approved driver, ending at the current time"""
+        drivers = self.approved_driver_ids
+        per_driver = math.ceil(count / len(drivers))
+
+        produced = 0
+        for driver_id in drivers:
+            lat = BASE_LAT + self.rng.uniform(-0.05, 0.05)
+            lng = BASE_LNG + self.rng.uniform(-0.05, 0.05)
+            heading = self.rng.uniform(0, 360)
+            timestamp = self.now - timedelta(seconds=per_driver * interval_s)
+            for _ in range(per_driver):
+                if produced >= count:
+                    return
+                speed = max(0.0, self.rng.gauss(35, 12))
+                heading = (heading + self.rng.gauss(0, 15)) % 360
+                step_deg = (speed / 3.6) * interval_s / 111320.0
+                lat += step_deg * math.cos(math.radians(heading))
+                lng += step_deg * math.sin(math.radians(heading))
+                timestamp += timedelta(seconds=interval_s)
+                yield (
+                    driver_id, round(lat, 8), round(lng, 8), round(speed, 2), round(heading, 2),
+                    round(self.rng.uniform(3, 15), 2), timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                )
+                produced += 1
+
+    def seed(self, users, bookings, gps_rows):
+        """Seed all tables in foreign-key order"""
+        print("=" * 80)
+        print("🌱 OKU TRANSPORT SYSTEM - BULK DATA SEEDER")
+        print("=" * 80)
+
+        # Ids are generated consistently, so skip per-row FK and unique checks during the load
+        self.cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        try:
+            self.load_rows('tbuser', self.generate_users(users), users)
+            if not (self.oku_ids and self.approved_driver_ids and self.admin_ids):
+                raise ValueError("Not enough users to build assignments; increase --users")
+            self.load_rows('tbaccessibilities', self.generate_accessibilities(), len(self.oku_ids))
+            self.load_rows('assignments', self.generate_assignments(), len(self.oku_ids))
+            self.load_rows('tbbook', self.generate_bookings(bookings), bookings)
+            self.load_rows('gps_tracking', self.generate_gps(gps_rows), gps_rows)
+        finally:
+            self.cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+
+        total_rows = sum(table['rows'] for table in self.report.values())
+        total_time = sum(table['elapsed_s'] for table in self.report.values())
+        print(f"\n📊 Seeded {total_rows:,} rows in {total_time:.1f}s")
+        return self.report
+
+def main():
+    """Main seeder execution"""
+    parser = argparse.ArgumentParser(description="Bulk synthetic data seeder")
+    parser.add_argument('--users', type=int, default=200000)
+    parser.add_argument('--bookings', type=int, default=2000000)
+    parser.add_argument('--gps-rows', type=int, default=20000000)
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for deterministic data")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    args = parser.parse_args()
+
+    seeder = DataSeeder(seed=args.seed, batch_size=args.batch_size, method=args.method)
+    try:
+        seeder.seed(args.users, args.bookings, args.gps_rows)
+    finally:
+        seeder.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
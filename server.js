@@ -8,6 +8,8 @@ const multer = require('multer');
 const path = require('path');
 const bcrypt = require('bcrypt');
 const jwt = require('jsonwebtoken');
+const { DriverIntervals, toMillis, toWallClock } = require('./bookingIndex');
+const { WriteBehindBuffer } = require('./gpsWriteBehind');
 
 const app = express();
 const server = http.createServer(app);
@@ -132,6 +134,361 @@ const authenticateToken = (req, res, next) => {
   });
 };
 
+// Keyset pagination: opt in with ?limit=N, then pass back ?cursor=<next_cursor>.
+// Cursors encode the (timestamp, id) of the last row so every page is one index range scan.
+const MAX_PAGE_SIZE = 500;
+
+const encodeCursor = (timestamp, id) =>
+  Buffer.from(JSON.stringify([timestamp, id])).toString('base64url');
+
+const parsePage = (query) => {
+  if (query.limit === undefined) {
+    return null;
+  }
+
+  const limit = Number(query.limit);
+  if (!Number.isInteger(limit) || limit < 1 || limit > MAX_PAGE_SIZE) {
+    throw new RangeError(`limit must be an integer between 1 and ${MAX_PAGE_SIZE}`);
+  }
+
+  let after = null;
+  if (query.cursor) {
+    try {
+      const [timestamp, id] = JSON.parse(Buffer.from(query.cursor, 'base64url').toString());
+      after = { timestamp: new Date(timestamp), id };
+    } catch (e) {
+      after = null;
+    }
+    if (!after || isNaN(after.timestamp) || !Number.isInteger(after.id)) {
+      throw new RangeError('Invalid cursor');
+    }
+  }
+
+  return { limit, after };
+};
+
+// Condition selecting rows strictly after the cursor in (timestamp DESC, id DESC) order
+const keysetCondition = (timestampColumn, idColumn, after) => ({
+  clause: `(${timestampColumn} < ? OR (${timestampColumn} = ? AND ${idColumn} < ?))`,
+  params: [after.timestamp, after.timestamp, after.id]
+});
+
+// Trim the extra look-ahead row and build the cursor for the next page
+const keysetPage = (rows, page, timestampField) => {
+  if (rows.length <= page.limit) {
+    return { rows, nextCursor: null };
+  }
+  const pageRows = rows.slice(0, page.limit);
+  const last = pageRows[pageRows.length - 1];
+  return { rows: pageRows, nextCursor: encodeCursor(last[timestampField], last.id) };
+};
+
+// Per-driver, per-date schedule cache. A driver's entries are dropped whenever one of
+// their bookings is created or changes status; the TTL is a backstop for writes made
+// outside this process (seeders, other instances, direct SQL).
+const SCHEDULE_CACHE_TTL_MS = 60 * 1000;
+const SCHEDULE_CACHE_MAX_ENTRIES = 10000;
+const scheduleCache = new Map(); // driverId -> Map(date or 'upcoming' -> { rows, expiresAt })
+// Bumped on every invalidation so a query that raced a booking write never caches stale rows
+const scheduleGenerations = new Map(); // driverId -> invalidation count
+let scheduleCacheEntries = 0;
+
+// A real YYYY-MM-DD day. Date.parse rolls 2026-02-30 over into March, so the day must
+// survive a round trip unchanged
+const isCalendarDate = (value) => {
+  const millis = typeof value === 'string' && /^\d{4}-\d{2}-\d{2}$/.test(value) ? toMillis(`${value} 00:00:00`) : null;
+  return millis !== null && toWallClock(millis).startsWith(value);
+};
+
+const scheduleGeneration = (driverId) => scheduleGenerations.get(String(driverId)) || 0;
+
+const getCachedSchedule = (driverId, dateKey) => {
+  const entry = scheduleCache.get(String(driverId))?.get(dateKey);
+  return entry && entry.expiresAt > Date.now() ? entry.rows : null;
+};
+
+const invalidateSchedule = (driverId) => {
+  scheduleGenerations.set(String(driverId), scheduleGeneration(driverId) + 1);
+  const entries = scheduleCache.get(String(driverId));
+  if (entries) {
+    scheduleCacheEntries -= entries.size;
+    scheduleCache.delete(String(driverId));
+  }
+};
+
+const cacheSchedule = (driverId, dateKey, rows, generation) => {
+  if (generation !== scheduleGeneration(driverId)) {
+    return;
+  }
+  // Evict least recently filled drivers first (Map keeps insertion order)
+  while (scheduleCacheEntries >= SCHEDULE_CACHE_MAX_ENTRIES && scheduleCache.size > 0) {
+    invalidateSchedule(scheduleCache.keys().next().value);
+  }
+  const key = String(driverId);
+  if (!scheduleCache.has(key)) {
+    scheduleCache.set(key, new Map());
+  }
+  const entries = scheduleCache.get(key);
+  if (!entries.has(dateKey)) {
+    scheduleCacheEntries++;
+  }
+  entries.set(dateKey, { rows, expiresAt: Date.now() + SCHEDULE_CACHE_TTL_MS });
+};
+
+// Per-driver interval index of active bookings (see bookingIndex.js), used for conflict checks
+// and availability instead of a tbbook range query. Kept current by booking create and status
+// change; the TTL reloads drivers whose bookings were written outside this process. An entry
+// with an INSERT in flight is never reloaded, so its held slot cannot disappear.
+const BOOKING_INDEX_TTL_MS = 60 * 1000;
+const ACTIVE_BOOKING_STATUSES = ['pending', 'approved', 'in_progress'];
+const bookingIndexes = new Map(); // driverId -> { intervals, expiresAt, inflight }
+
+const getBookingIndex = async (connection, driverId) => {
+  const key = String(driverId);
+  const isUsable = (entry) => entry && (entry.expiresAt > Date.now() || entry.inflight > 0);
+  if (isUsable(bookingIndexes.get(key))) {
+    return bookingIndexes.get(key);
+  }
+  
+  const [rows] = await connection.execute(
+    `SELECT id, start_datetime, end_datetime FROM tbbook
+     WHERE driver_id = ? AND status IN ('pending', 'approved', 'in_progress')`,
+    [driverId]
+  );
+  // Another request may have loaded (and already updated) this driver while we waited
+  if (isUsable(bookingIndexes.get(key))) {
+    return bookingIndexes.get(key);
+  }
+  const entry = {
+    intervals: new DriverIntervals(rows.map(row => ({
+      id: row.id, start: toMillis(row.start_datetime), end: toMillis(row.end_datetime)
+    }))),
+    expiresAt: Date.now() + BOOKING_INDEX_TTL_MS,
+    inflight: 0
+  };
+  bookingIndexes.set(key, entry);
+  return entry;
+};
+
+// Apply a status change to an already indexed driver; unindexed drivers load fresh when next used
+const updateBookingIndex = (driverId, bookingId, status, start, end) => {
+  const entry = bookingIndexes.get(String(driverId));
+  if (!entry) {
+    return;
+  }
+  entry.intervals.remove(bookingId);
+  if (ACTIVE_BOOKING_STATUSES.includes(status)) {
+    entry.intervals.add(bookingId, start, end);
+  }
+};
+
+// Copy a freshly inserted gps_tracking row into gps_latest. The gps_id guard makes
+// concurrent upserts for one driver commute: whichever runs last, the newest fix wins.
+// gps_id is assigned last so the guards before it still compare against the old row.
+const upsertLatestPosition = (connection, gpsId) => connection.execute(
+  `INSERT INTO gps_latest (driver_id, gps_id, booking_id, lat, lng, speed, heading, accuracy, timestamp)
+   SELECT g.driver_id, g.id, g.booking_id, g.lat, g.lng, g.speed, g.heading, g.accuracy, g.timestamp
+   FROM gps_tracking g WHERE g.id = ?
+   ON DUPLICATE KEY UPDATE
+     gps_latest.booking_id = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(booking_id), gps_latest.booking_id),
+     gps_latest.lat = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(lat), gps_latest.lat),
+     gps_latest.lng = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(lng), gps_latest.lng),
+     gps_latest.speed = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(speed), gps_latest.speed),
+     gps_latest.heading = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(heading), gps_latest.heading),
+     gps_latest.accuracy = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(accuracy), gps_latest.accuracy),
+     gps_latest.timestamp = IF(VALUES(gps_id) > gps_latest.gps_id, VALUES(timestamp), gps_latest.timestamp),
+     gps_latest.gps_id = GREATEST(gps_latest.gps_id, VALUES(gps_id))`,
+  [gpsId]
+);
+
+const GPS_BATCH_MAX_FIXES = 500;
+const GPS_FIX_COLUMNS = 'driver_id, lat, lng, speed, heading, accuracy, booking_id, timestamp';
+
+// Batched fixes may be back-dated (buffered while a driver was offline), so a batch only moves
+// gps_latest when its fix is newer by timestamp, gps_id breaking ties. gps_id is assigned
+// before timestamp and timestamp last, so every guard still compares against the old row.
+const NEWER_FIX = `(VALUES(timestamp) > gps_latest.timestamp OR
+  (VALUES(timestamp) = gps_latest.timestamp AND VALUES(gps_id) > gps_latest.gps_id))`;
+
+// Check one client-supplied fix and normalise its timestamp to a 'YYYY-MM-DD HH:MM:SS'
+// wall-clock string; returns null when the fix is unusable
+const parseFix = (fix) => {
+  const millis = toMillis(fix?.timestamp);
+  const lat = Number(fix?.lat);
+  const lng = Number(fix?.lng);
+  if (millis === null || !Number.isFinite(lat) || !Number.isFinite(lng) ||
+      Math.abs(lat) > 90 || Math.abs(lng) > 180) {
+    return null;
+  }
+  return {
+    lat,
+    lng,
+    speed: fix.speed ?? null,
+    heading: fix.heading ?? null,
+    accuracy: fix.accuracy ?? null,
+    booking_id: fix.booking_id ?? null,
+    timestamp: toWallClock(millis)
+  };
+};
+
+// Store fixes with one multi-row INSERT and move each driver's gps_latest row to the newest of
+// them, in one transaction. Returns the newest fix per driver, for the broadcast
+const insertFixes = async (connection, fixes) => {
+  const newest = new Map();
+  for (const fix of fixes) {
+    const current = newest.get(fix.driver_id);
+    if (!current || fix.timestamp >= current.timestamp) {
+      newest.set(fix.driver_id, fix);
+    }
+  }
+  const latest = [...newest.values()];
+
+  await connection.beginTransaction();
+  try {
+    const [result] = await connection.query(
+      `INSERT INTO gps_tracking (${GPS_FIX_COLUMNS}) VALUES ${fixes.map(() => '(?, ?, ?, ?, ?, ?, ?, ?)').join(', ')}`,
+      fixes.flatMap(fix => [
+        fix.driver_id, fix.lat, fix.lng, fix.speed, fix.heading, fix.accuracy, fix.booking_id, fix.timestamp
+      ])
+    );
+    // Rows at or after the first new id, found by (driver_id, timestamp) through idx_driver_time
+    await connection.query(
+      `INSERT INTO gps_latest (driver_id, gps_id, booking_id, lat, lng, speed, heading, accuracy, timestamp)
+       SELECT g.driver_id, g.id, g.booking_id, g.lat, g.lng, g.speed, g.heading, g.accuracy, g.timestamp
+       FROM gps_tracking g
+       JOIN (SELECT driver_id, MAX(id) AS id FROM gps_tracking
+             WHERE id >= ? AND (driver_id, timestamp) IN (${latest.map(() => '(?, ?)').join(', ')})
+             GROUP BY driver_id) newest ON g.id = newest.id
+       ON DUPLICATE KEY UPDATE
+         gps_latest.booking_id = IF(${NEWER_FIX}, VALUES(booking_id), gps_latest.booking_id),
+         gps_latest.lat = IF(${NEWER_FIX}, VALUES(lat), gps_latest.lat),
+         gps_latest.lng = IF(${NEWER_FIX}, VALUES(lng), gps_latest.lng),
+         gps_latest.speed = IF(${NEWER_FIX}, VALUES(speed), gps_latest.speed),
+         gps_latest.heading = IF(${NEWER_FIX}, VALUES(heading), gps_latest.heading),
+         gps_latest.accuracy = IF(${NEWER_FIX}, VALUES(accuracy), gps_latest.accuracy),
+         gps_latest.gps_id = IF(${NEWER_FIX}, VALUES(gps_id), gps_latest.gps_id),
+         gps_latest.timestamp = IF(VALUES(timestamp) > gps_latest.timestamp, VALUES(timestamp), gps_latest.timestamp)`,
+      [result.insertId, ...latest.flatMap(fix => [fix.driver_id, fix.timestamp])]
+    );
+    await connection.commit();
+    return { firstId: result.insertId, stored: result.affectedRows, latest };
+  } catch (error) {
+    await connection.rollback();
+    throw error;
+  }
+};
+
+// Receipt time as a local wall-clock string, which is what CURRENT_TIMESTAMP stores for a
+// database on the same host
+const localWallClock = (date = new Date()) => toWallClock(date.getTime() - date.getTimezoneOffset() * 60 * 1000);
+
+// Fixes streamed over the socket are stored in bulk behind the live broadcast
+const gpsWriteBehind = new WriteBehindBuffer(async (fixes) => {
+  const connection = await getDbConnection();
+  try {
+    await insertFixes(connection, fixes);
+  } finally {
+    await connection.end();
+  }
+}, { maxBatch: GPS_BATCH_MAX_FIXES, flushIntervalMs: 250, maxPending: 20000, retryDelayMs: 1000 });
+gpsWriteBehind.onError = (error) => console.error('GPS write-behind flush error:', error);
+
+// Live map fan-out. Sockets subscribe to slippy-map tiles (their viewport), to one driver or
+// booking, or (admins) to the whole fleet, and a GPS update only goes to those rooms. The
+// tracking rooms are prefixed so they never receive driver_<id> booking notifications
+const GPS_TILE_ZOOM = 14; // ~2.4km tiles around Kuala Terengganu
+const MAX_TILE_SUBSCRIPTIONS = 256;
+const GPS_ALL_ROOM = 'gps_all';
+const MAX_TILE_LAT = 85.0511;
+
+const tileOf = (lat, lng) => {
+  const n = 2 ** GPS_TILE_ZOOM;
+  const latRad = Math.max(-MAX_TILE_LAT, Math.min(MAX_TILE_LAT, lat)) * Math.PI / 180;
+  const x = Math.floor((lng + 180) / 360 * n);
+  const y = Math.floor((1 - Math.log(Math.tan(latRad) + 1 / Math.cos(latRad)) / Math.PI) / 2 * n);
+  return { x: Math.max(0, Math.min(n - 1, x)), y: Math.max(0, Math.min(n - 1, y)) };
+};
+
+const tileRoom = (x, y) => `tile_${GPS_TILE_ZOOM}_${x}_${y}`;
+
+// Rooms covering a { north, south, east, west } viewport, or null for an invalid or oversized one
+const tileRoomsFor = (bounds) => {
+  const { north, south, east, west } = Object.fromEntries(
+    ['north', 'south', 'east', 'west'].map(side => [side, Number(bounds?.[side])])
+  );
+  if (![north, south, east, west].every(Number.isFinite) || north < south || east < west ||
+      Math.abs(west) > 180 || Math.abs(east) > 180) {
+    return null;
+  }
+  const topLeft = tileOf(north, west);
+  const bottomRight = tileOf(south, east);
+  if ((bottomRight.x - topLeft.x + 1) * (bottomRight.y - topLeft.y + 1) > MAX_TILE_SUBSCRIPTIONS) {
+    return null;
+  }
+  const rooms = [];
+  for (let x = topLeft.x; x <= bottomRight.x; x++) {
+    for (let y = topLeft.y; y <= bottomRight.y; y++) {
+      rooms.push(tileRoom(x, y));
+    }
+  }
+  return rooms;
+};
+
+const socketStats = { gpsUpdates: 0 };
+
+// Live map update; one per driver however many fixes arrived together. Chained rooms are a
+// union, so a socket watching both the tile and the driver still gets one copy
+const broadcastLocation = (locationData) => {
+  const lat = Number(locationData.lat);
+  const lng = Number(locationData.lng);
+  let target = io.to(GPS_ALL_ROOM).to(`track_driver_${locationData.driver_id}`);
+  if (Number.isFinite(lat) && Number.isFinite(lng)) {
+    const { x, y } = tileOf(lat, lng);
+    target = target.to(tileRoom(x, y));
+  }
+  if (locationData.booking_id) {
+    target = target.to(`track_booking_${locationData.booking_id}`);
+  }
+  target.emit('gps_update', locationData);
+  socketStats.gpsUpdates++;
+};
+
+// Whether a socket's user may follow one driver's or one booking's live position
+const canTrackDriver = async (user, driverId) => {
+  if (['Company Admin', 'JKM Officer'].includes(user.role) || (user.role === 'Driver' && user.id === driverId)) {
+    return true;
+  }
+  if (user.role !== 'OKU User') {
+    return false;
+  }
+  const connection = await getDbConnection();
+  try {
+    const [rows] = await connection.execute(
+      'SELECT id FROM assignments WHERE oku_id = ? AND driver_id = ? AND status = "active" LIMIT 1',
+      [user.id, driverId]
+    );
+    return rows.length > 0;
+  } finally {
+    await connection.end();
+  }
+};
+
+const canTrackBooking = async (user, bookingId) => {
+  if (['Company Admin', 'JKM Officer'].includes(user.role)) {
+    return true;
+  }
+  const connection = await getDbConnection();
+  try {
+    const [rows] = await connection.execute(
+      'SELECT id FROM tbbook WHERE id = ? AND (oku_id = ? OR driver_id = ?)',
+      [bookingId, user.id, user.id]
+    );
+    return rows.length > 0;
+  } finally {
+    await connection.end();
+  }
+};
+
 // ===== API ROUTES =====
 
 // User Authentication
@@ -140,52 +497,54 @@ app.post('/api/login', async (req, res) => {
     const { email, password } = req.body;
     const connection = await getDbConnection();
     
-    const [rows] = await connection.execute(
-      'SELECT * FROM tbuser WHERE email = ?',
-      [email]
-    );
-    
-    if (rows.length === 0) {
-      return res.status(401).json({ message: 'Invalid credentials' });
-    }
-    
-    const user = rows[0];
-    const passwordMatch = await bcrypt.compare(password, user.password);
-    
-    if (!passwordMatch) {
-      return res.status(401).json({ message: 'Invalid credentials' });
-    }
-    
-    // Check driver approval status
-    if (user.userType === 'Driver' && user.status !== 'approved') {
-      const statusMessages = {
-        'pending': 'Your driver application is pending approval',
-        'rejected': 'Your driver application has been rejected'
-      };
-      return res.status(403).json({ 
-        message: statusMessages[user.status] || 'Account not active' 
+    try {
+      const [rows] = await connection.execute(
+        'SELECT * FROM tbuser WHERE email = ?',
+        [email]
+      );
+      
+      if (rows.length === 0) {
+        return res.status(401).json({ message: 'Invalid credentials' });
+      }
+      
+      const user = rows[0];
+      const passwordMatch = await bcrypt.compare(password, user.password);
+      
+      if (!passwordMatch) {
+        return res.status(401).json({ message: 'Invalid credentials' });
+      }
+      
+      // Check driver approval status
+      if (user.userType === 'Driver' && user.status !== 'approved') {
+        const statusMessages = {
+          'pending': 'Your driver application is pending approval',
+          'rejected': 'Your driver application has been rejected'
+        };
+        return res.status(403).json({ 
+          message: statusMessages[user.status] || 'Account not active' 
+        });
+      }
+      
+      const token = jwt.sign(
+        { id: user.id, email: user.email, role: user.userType },
+        JWT_SECRET,
+        { expiresIn: '24h' }
+      );
+      
+      res.json({
+        message: 'Login successful',
+        token,
+        user: {
+          id: user.id,
+          name: user.name,
+          email: user.email,
+          role: user.userType,
+          status: user.status
+        }
       });
+    } finally {
+      await connection.end();
     }
-    
-    const token = jwt.sign(
-      { id: user.id, email: user.email, role: user.userType },
-      JWT_SECRET,
-      { expiresIn: '24h' }
-    );
-    
-    res.json({
-      message: 'Login successful',
-      token,
-      user: {
-        id: user.id,
-        name: user.name,
-        email: user.email,
-        role: user.userType,
-        status: user.status
-      }
-    });
-    
-    await connection.end();
   } catch (error) {
     console.error('Login error:', error);
     res.status(500).json({ message: 'Internal server error' });
@@ -369,9 +728,25 @@ app.post('/api/assignments', authenticateToken, async (req, res) => {
 // Get driver schedule (for OKU users to see availability)
 app.get('/api/driver/:driverId/schedule', authenticateToken, async (req, res) => {
   try {
-    const { driverId } = req.params;
+    // Normalised so '7' and '07' share one cache entry and invalidation generation
+    const driverId = /^\d+$/.test(req.params.driverId) ? parseInt(req.params.driverId, 10) : NaN;
     const { date } = req.query; // Optional date filter
     
+    if (!Number.isInteger(driverId)) {
+      return res.status(400).json({ message: 'driverId must be a numeric id' });
+    }
+    if (date !== undefined && !isCalendarDate(date)) {
+      return res.status(400).json({ message: 'date must be a valid YYYY-MM-DD date' });
+    }
+    
+    const dateKey = date || 'upcoming';
+    const cached = getCachedSchedule(driverId, dateKey);
+    if (cached) {
+      res.set('X-Cache', 'HIT');
+      return res.json({ schedule: cached });
+    }
+    
+    const generation = scheduleGeneration(driverId);
     const connection = await getDbConnection();
     
     let query = `
@@ -384,16 +759,19 @@ app.get('/api/driver/:driverId/schedule', authenticateToken, async (req, res) =>
     
     const params = [driverId];
     
+    // Ranges rather than DATE(b.start_datetime) so idx_driver_time can be used
     if (date) {
-      query += ' AND DATE(b.start_datetime) = ?';
-      params.push(date);
+      query += ' AND b.start_datetime >= ? AND b.start_datetime < DATE_ADD(?, INTERVAL 1 DAY)';
+      params.push(date, date);
     } else {
-      query += ' AND DATE(b.start_datetime) >= CURDATE()';
+      query += ' AND b.start_datetime >= CURDATE()';
     }
     
     query += ' ORDER BY b.start_datetime ASC';
     
     const [rows] = await connection.execute(query, params);
+    cacheSchedule(driverId, dateKey, rows, generation);
+    res.set('X-Cache', 'MISS');
     res.json({ schedule: rows });
     
     await connection.end();
@@ -403,11 +781,59 @@ app.get('/api/driver/:driverId/schedule', authenticateToken, async (req, res) =>
   }
 });
 
+// Free and busy periods of a driver over a range of days, from the interval index
+app.get('/api/driver/:driverId/availability', authenticateToken, async (req, res) => {
+  try {
+    // Normalised so '7' and '07' share the index entry that booking writes keep current
+    const driverId = /^\d+$/.test(req.params.driverId) ? parseInt(req.params.driverId, 10) : NaN;
+    const { from } = req.query;
+    const days = req.query.days === undefined ? 7 : Number(req.query.days);
+    
+    if (!Number.isInteger(driverId)) {
+      return res.status(400).json({ message: 'driverId must be a numeric id' });
+    }
+    if (!from || !/^\d{4}-\d{2}-\d{2}$/.test(from) || toMillis(`${from} 00:00:00`) === null) {
+      return res.status(400).json({ message: 'from must be YYYY-MM-DD' });
+    }
+    if (!Number.isInteger(days) || days < 1 || days > 31) {
+      return res.status(400).json({ message: 'days must be an integer between 1 and 31' });
+    }
+    
+    const connection = await getDbConnection();
+    const bookingIndex = await getBookingIndex(connection, driverId);
+    await connection.end();
+    
+    const start = toMillis(`${from} 00:00:00`);
+    const end = start + days * 24 * 60 * 60 * 1000;
+    const { busy, free } = bookingIndex.intervals.slots(start, end);
+    const format = (slot) => ({ start: toWallClock(slot.start), end: toWallClock(slot.end) });
+    
+    res.json({
+      from: toWallClock(start),
+      to: toWallClock(end),
+      busy: busy.map(format),
+      free: free.map(format)
+    });
+  } catch (error) {
+    console.error('Driver availability error:', error);
+    res.status(500).json({ message: 'Internal server error' });
+  }
+});
+
 // Get bookings
 app.get('/api/bookings', authenticateToken, async (req, res) => {
   try {
+    let page;
+    try {
+      page = parsePage(req.query);
+    } catch (error) {
+      return res.status(400).json({ message: error.message });
+    }
+
     const connection = await getDbConnection();
-    let query, params;
+    let query;
+    const conditions = [];
+    const params = [];
     
     if (req.user.role === 'Driver') {
       query = `
@@ -416,20 +842,18 @@ app.get('/api/bookings', authenticateToken, async (req, res) => {
         FROM tbbook b
         JOIN tbuser u ON b.oku_id = u.id
         LEFT JOIN tbaccessibilities acc ON b.oku_id = acc.user_id
-        WHERE b.driver_id = ?
-        ORDER BY b.start_datetime DESC
       `;
-      params = [req.user.id];
+      conditions.push('b.driver_id = ?');
+      params.push(req.user.id);
     } else if (req.user.role === 'OKU User') {
       query = `
         SELECT b.*, u.name as driver_name, u.phone as driver_phone, 
                u.vehicleType, u.vehicleNumber, u.vehicleFeatures, u.status as driver_status
         FROM tbbook b
         JOIN tbuser u ON b.driver_id = u.id
-        WHERE b.oku_id = ?
-        ORDER BY b.start_datetime DESC
       `;
-      params = [req.user.id];
+      conditions.push('b.oku_id = ?');
+      params.push(req.user.id);
     } else {
       query = `
         SELECT b.*, 
@@ -439,13 +863,30 @@ app.get('/api/bookings', authenticateToken, async (req, res) => {
         FROM tbbook b
         JOIN tbuser oku ON b.oku_id = oku.id
         JOIN tbuser driver ON b.driver_id = driver.id
-        ORDER BY b.start_datetime DESC
       `;
-      params = [];
+    }
+
+    if (page && page.after) {
+      const keyset = keysetCondition('b.start_datetime', 'b.id', page.after);
+      conditions.push(keyset.clause);
+      params.push(...keyset.params);
+    }
+    if (conditions.length > 0) {
+      query += ` WHERE ${conditions.join(' AND ')}`;
+    }
+    query += ' ORDER BY b.start_datetime DESC, b.id DESC';
+    if (page) {
+      // Validated integer; fetch one extra row to know whether another page exists
+      query += ` LIMIT ${page.limit + 1}`;
     }
     
     const [rows] = await connection.execute(query, params);
-    res.json({ bookings: rows });
+    if (page) {
+      const { rows: bookings, nextCursor } = keysetPage(rows, page, 'start_datetime');
+      res.json({ bookings, next_cursor: nextCursor });
+    } else {
+      res.json({ bookings: rows });
+    }
     
     await connection.end();
   } catch (error) {
@@ -464,70 +905,109 @@ app.post('/api/bookings', authenticateToken, async (req, res) => {
       purpose, special_instructions 
     } = req.body;
     
-    const connection = await getDbConnection();
-    
-    // Check if assignment exists
-    const [assignments] = await connection.execute(
-      'SELECT id FROM assignments WHERE oku_id = ? AND driver_id = ? AND status = "active"',
-      [req.user.id, driver_id]
-    );
-    
-    if (assignments.length === 0) {
-      return res.status(400).json({ message: 'No assignment exists with this driver' });
+    const start = toMillis(start_datetime);
+    const end = toMillis(end_datetime);
+    if (start === null || end === null) {
+      return res.status(400).json({ message: 'start_datetime and end_datetime must be YYYY-MM-DD HH:MM:SS' });
     }
     
-    // Check driver status
-    const [drivers] = await connection.execute(
-      'SELECT status FROM tbuser WHERE id = ? AND userType = "Driver"',
-      [driver_id]
-    );
-    
-    if (drivers.length === 0 || drivers[0].status !== 'approved') {
-      return res.status(400).json({ message: 'Driver not available' });
-    }
-    
-    // Check for booking conflicts
-    const [conflicts] = await connection.execute(
-      `SELECT id FROM tbbook 
-       WHERE driver_id = ? 
-         AND status IN ('pending', 'approved', 'in_progress')
-         AND NOT (? <= start_datetime OR ? >= end_datetime)`,
-      [driver_id, end_datetime, start_datetime]
-    );
-    
-    if (conflicts.length > 0) {
-      return res.status(409).json({ 
-        message: 'Driver already booked at that date/time. Please choose another slot.' 
+    const connection = await getDbConnection();
+    try {
+      // Check if assignment exists
+      const [assignments] = await connection.execute(
+        'SELECT id FROM assignments WHERE oku_id = ? AND driver_id = ? AND status = "active"',
+        [req.user.id, driver_id]
+      );
+      
+      if (assignments.length === 0) {
+        return res.status(400).json({ message: 'No assignment exists with this driver' });
+      }
+      
+      // The driver row lock serialises bookings of one driver across server instances; the
+      // range query under it stays authoritative for rows written outside this process
+      await connection.beginTransaction();
+      let result;
+      let bookingIndex;
+      try {
+        const [drivers] = await connection.execute(
+          'SELECT status FROM tbuser WHERE id = ? AND userType = "Driver" FOR UPDATE',
+          [driver_id]
+        );
+        if (drivers.length === 0 || drivers[0].status !== 'approved') {
+          await connection.rollback();
+          return res.status(400).json({ message: 'Driver not available' });
+        }
+        
+        // Check for booking conflicts against the driver's interval index; most conflicts end here
+        bookingIndex = await getBookingIndex(connection, driver_id);
+        if (bookingIndex.intervals.overlaps(start, end)) {
+          await connection.rollback();
+          return res.status(409).json({ 
+            message: 'Driver already booked at that date/time. Please choose another slot.' 
+          });
+        }
+        
+        // Hold the slot while the INSERT is in flight so concurrent requests for this driver see it
+        const hold = Symbol('booking hold');
+        bookingIndex.intervals.add(hold, start, end);
+        bookingIndex.inflight++;
+        try {
+          const [conflicts] = await connection.execute(
+            `SELECT id FROM tbbook
+             WHERE driver_id = ? AND status IN ('pending', 'approved', 'in_progress')
+               AND NOT (? <= start_datetime OR ? >= end_datetime)
+             LIMIT 1`,
+            [driver_id, end_datetime, start_datetime]
+          );
+          if (conflicts.length > 0) {
+            await connection.rollback();
+            // The index missed a booking, so reload it once no INSERT holds a slot in it
+            bookingIndex.expiresAt = 0;
+            return res.status(409).json({ 
+              message: 'Driver already booked at that date/time. Please choose another slot.' 
+            });
+          }
+          
+          [result] = await connection.execute(
+            `INSERT INTO tbbook (
+              oku_id, driver_id, booking_type, start_datetime, end_datetime,
+              pickup_location, pickup_lat, pickup_lng, 
+              dropoff_location, dropoff_lat, dropoff_lng,
+              purpose, special_instructions
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+            [
+              req.user.id, driver_id, booking_type, start_datetime, end_datetime,
+              pickup_location, pickup_lat, pickup_lng,
+              dropoff_location, dropoff_lat, dropoff_lng,
+              purpose, special_instructions
+            ]
+          );
+          await connection.commit();
+        } finally {
+          bookingIndex.intervals.remove(hold);
+          bookingIndex.inflight--;
+        }
+      } catch (error) {
+        await connection.rollback();
+        throw error;
+      }
+      bookingIndex.intervals.add(result.insertId, start, end);
+      
+      invalidateSchedule(driver_id);
+      
+      // Emit real-time notification to driver
+      io.to(`driver_${driver_id}`).emit('new_booking', {
+        bookingId: result.insertId,
+        message: 'New booking request received'
       });
+      
+      res.json({
+        message: 'Booking created successfully',
+        bookingId: result.insertId
+      });
+    } finally {
+      await connection.end();
     }
-    
-    const [result] = await connection.execute(
-      `INSERT INTO tbbook (
-        oku_id, driver_id, booking_type, start_datetime, end_datetime,
-        pickup_location, pickup_lat, pickup_lng, 
-        dropoff_location, dropoff_lat, dropoff_lng,
-        purpose, special_instructions
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-      [
-        req.user.id, driver_id, booking_type, start_datetime, end_datetime,
-        pickup_location, pickup_lat, pickup_lng,
-        dropoff_location, dropoff_lat, dropoff_lng,
-        purpose, special_instructions
-      ]
-    );
-    
-    // Emit real-time notification to driver
-    io.to(`driver_${driver_id}`).emit('new_booking', {
-      bookingId: result.insertId,
-      message: 'New booking request received'
-    });
-    
-    res.json({
-      message: 'Booking created successfully',
-      bookingId: result.insertId
-    });
-    
-    await connection.end();
   } catch (error) {
     console.error('Create booking error:', error);
     res.status(500).json({ message: 'Internal server error' });
@@ -561,12 +1041,15 @@ app.put('/api/bookings/:id/status', authenticateToken, async (req, res) => {
     
     // Get booking details for real-time notification
     const [booking] = await connection.execute(
-      'SELECT oku_id, driver_id FROM tbbook WHERE id = ?',
+      'SELECT oku_id, driver_id, start_datetime, end_datetime FROM tbbook WHERE id = ?',
       [bookingId]
     );
     
     if (booking.length > 0) {
-      io.to(`oku_${booking[0].oku_id}`).emit('booking_update', {
+      invalidateSchedule(booking[0].driver_id);
+      updateBookingIndex(booking[0].driver_id, Number(bookingId), status,
+                         toMillis(booking[0].start_datetime), toMillis(booking[0].end_datetime));
+      io.to(`oku_user_${booking[0].oku_id}`).emit('booking_update', {
         bookingId,
         status,
         message: `Booking ${status}`
@@ -591,6 +1074,13 @@ app.get('/api/users', authenticateToken, async (req, res) => {
     }
     
     const { type, status } = req.query;
+    let page;
+    try {
+      page = parsePage(req.query);
+    } catch (error) {
+      return res.status(400).json({ message: error.message });
+    }
+
     const connection = await getDbConnection();
     
     let query = 'SELECT * FROM tbuser WHERE 1=1';
@@ -609,7 +1099,16 @@ app.get('/api/users', authenticateToken, async (req, res) => {
       params.push(status);
     }
     
-    query += ' ORDER BY createdAt DESC';
+    if (page && page.after) {
+      const keyset = keysetCondition('createdAt', 'id', page.after);
+      query += ` AND ${keyset.clause}`;
+      params.push(...keyset.params);
+    }
+    
+    query += ' ORDER BY createdAt DESC, id DESC';
+    if (page) {
+      query += ` LIMIT ${page.limit + 1}`;
+    }
     
     const [rows] = await connection.execute(query, params);
     
@@ -619,7 +1118,12 @@ app.get('/api/users', authenticateToken, async (req, res) => {
       return user;
     });
     
-    res.json({ users });
+    if (page) {
+      const { rows: pageUsers, nextCursor } = keysetPage(users, page, 'createdAt');
+      res.json({ users: pageUsers, next_cursor: nextCursor });
+    } else {
+      res.json({ users });
+    }
     await connection.end();
   } catch (error) {
     console.error('Users fetch error:', error);
@@ -774,55 +1278,118 @@ app.post('/api/gps/update', authenticateToken, async (req, res) => {
     
     const { lat, lng, speed, heading, accuracy, booking_id } = req.body;
     const connection = await getDbConnection();
-    
-    const [result] = await connection.execute(
-      'INSERT INTO gps_tracking (driver_id, lat, lng, speed, heading, accuracy, booking_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
-      [req.user.id, lat, lng, speed, heading, accuracy, booking_id]
-    );
-    
-    // Get driver details for real-time update
-    const [driverRows] = await connection.execute(
-      'SELECT name, vehicleType, vehicleNumber FROM tbuser WHERE id = ?',
-      [req.user.id]
-    );
-    
-    // Emit real-time location to connected users
-    const locationData = {
-      driver_id: req.user.id,
-      lat,
-      lng,
-      speed,
-      heading,
-      accuracy,
-      timestamp: new Date(),
-      booking_id,
-      driver_name: driverRows[0]?.name,
-      vehicleType: driverRows[0]?.vehicleType,
-      vehicleNumber: driverRows[0]?.vehicleNumber
-    };
-    
-    io.emit('gps_update', locationData);
-    
-    res.json({ message: 'GPS location updated successfully' });
-    await connection.end();
+    try {
+      // The fix and its gps_latest row commit together, so readers never see one without the other
+      await connection.beginTransaction();
+      let result;
+      try {
+        [result] = await connection.execute(
+          'INSERT INTO gps_tracking (driver_id, lat, lng, speed, heading, accuracy, booking_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
+          [req.user.id, lat, lng, speed, heading, accuracy, booking_id]
+        );
+        await upsertLatestPosition(connection, result.insertId);
+        await connection.commit();
+      } catch (error) {
+        await connection.rollback();
+        throw error;
+      }
+      
+      // Get driver details for real-time update
+      const [driverRows] = await connection.execute(
+        'SELECT name, vehicleType, vehicleNumber FROM tbuser WHERE id = ?',
+        [req.user.id]
+      );
+      
+      // Emit real-time location to connected users
+      const locationData = {
+        driver_id: req.user.id,
+        lat,
+        lng,
+        speed,
+        heading,
+        accuracy,
+        timestamp: new Date(),
+        booking_id,
+        driver_name: driverRows[0]?.name,
+        vehicleType: driverRows[0]?.vehicleType,
+        vehicleNumber: driverRows[0]?.vehicleNumber
+      };
+      
+      broadcastLocation(locationData);
+
+      res.json({ message: 'GPS location updated successfully', gpsId: result.insertId });
+    } finally {
+      await connection.end();
+    }
   } catch (error) {
     console.error('GPS update error:', error);
     res.status(500).json({ message: 'Internal server error' });
   }
 });
 
-// Get latest GPS locations
+// Upload timestamped fixes in one request, e.g. ones buffered while the driver had no coverage.
+// Stored with one multi-row INSERT; only the newest fix is broadcast
+app.post('/api/gps/batch', authenticateToken, async (req, res) => {
+  try {
+    if (req.user.role !== 'Driver') {
+      return res.status(403).json({ message: 'Only drivers can update GPS' });
+    }
+
+    const { fixes } = req.body;
+    if (!Array.isArray(fixes) || fixes.length === 0 || fixes.length > GPS_BATCH_MAX_FIXES) {
+      return res.status(400).json({ message: `fixes must be an array of 1 to ${GPS_BATCH_MAX_FIXES} fixes` });
+    }
+    const parsed = fixes.map(parseFix);
+    const invalid = parsed.indexOf(null);
+    if (invalid !== -1) {
+      return res.status(400).json({
+        message: `fixes[${invalid}] needs numeric lat/lng and a YYYY-MM-DD HH:MM:SS timestamp`
+      });
+    }
+
+    const connection = await getDbConnection();
+    try {
+      const { firstId, stored, latest } = await insertFixes(
+        connection, parsed.map(fix => ({ ...fix, driver_id: req.user.id }))
+      );
+
+      const [driverRows] = await connection.execute(
+        'SELECT name, vehicleType, vehicleNumber FROM tbuser WHERE id = ?',
+        [req.user.id]
+      );
+      broadcastLocation({
+        ...latest[0],
+        driver_name: driverRows[0]?.name,
+        vehicleType: driverRows[0]?.vehicleType,
+        vehicleNumber: driverRows[0]?.vehicleNumber
+      });
+
+      res.json({ message: 'GPS fixes stored successfully', stored, firstId });
+    } finally {
+      await connection.end();
+    }
+  } catch (error) {
+    console.error('GPS batch error:', error);
+    res.status(500).json({ message: 'Internal server error' });
+  }
+});
+
+// One row per driver now, so the cap is a whole fleet rather than the old 100 raw fixes
+const GPS_LATEST_LIMIT = 2000;
+
+// Get latest GPS locations: one current fix per driver seen in the last hour
 app.get('/api/gps/latest', authenticateToken, async (req, res) => {
   try {
     const connection = await getDbConnection();
     
     const [rows] = await connection.execute(
-      `SELECT g.*, u.name as driver_name, u.vehicleType, u.vehicleNumber 
-       FROM gps_tracking g
-       JOIN tbuser u ON g.driver_id = u.id
-       WHERE g.timestamp >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
-       ORDER BY g.timestamp DESC
-       LIMIT 100`
+      `SELECT l.gps_id as id, l.driver_id, l.booking_id, l.lat, l.lng, l.speed, l.heading, l.accuracy,
+              l.timestamp, u.name as driver_name, u.vehicleType, u.vehicleNumber
+       FROM gps_latest l
+       JOIN tbuser u ON l.driver_id = u.id
+       WHERE l.timestamp >= DATE_SUB(NOW(), INTERVAL 1 HOUR)
+       ORDER BY l.timestamp DESC
+       LIMIT ${GPS_LATEST_LIMIT}`
     );
     
     res.json({ locations: rows });
@@ -833,8 +1400,111 @@ app.get('/api/gps/latest', authenticateToken, async (req, res) => {
   }
 });
 
+// Get one driver's current fix by primary key
+app.get('/api/gps/latest/:driverId', authenticateToken, async (req, res) => {
+  try {
+    const connection = await getDbConnection();
+    
+    const [rows] = await connection.execute(
+      `SELECT l.gps_id as id, l.driver_id, l.booking_id, l.lat, l.lng, l.speed, l.heading, l.accuracy,
+              l.timestamp, u.name as driver_name, u.vehicleType, u.vehicleNumber
+       FROM gps_latest l
+       JOIN tbuser u ON l.driver_id = u.id
+       WHERE l.driver_id = ?`,
+      [req.params.driverId]
+    );
+    await connection.end();
+    
+    if (rows.length === 0) {
+      return res.status(404).json({ message: 'No GPS fix for driver' });
+    }
+    res.json({ location: rows[0] });
+  } catch (error) {
+    console.error('GPS latest driver error:', error);
+    res.status(500).json({ message: 'Internal server error' });
+  }
+});
+
+// GPS history for one driver and day: raw fixes inside the retention window plus the
+// per-minute tracks gps_compaction.py rolled older fixes up into
+app.get('/api/gps/history/:driverId', authenticateToken, async (req, res) => {
+  try {
+    const { driverId } = req.params;
+    const { date } = req.query;
+    
+    const isSelf = req.user.role === 'Driver' && String(req.user.id) === String(driverId);
+    if (!isSelf && !['Company Admin', 'JKM Officer'].includes(req.user.role)) {
+      return res.status(403).json({ message: 'Insufficient permissions' });
+    }
+    
+    if (!date || !/^\d{4}-\d{2}-\d{2}$/.test(date)) {
+      return res.status(400).json({ message: 'date must be YYYY-MM-DD' });
+    }
+    
+    const connection = await getDbConnection();
+    
+    const [fixes] = await connection.execute(
+      `SELECT lat, lng, speed, heading, accuracy, booking_id, timestamp
+       FROM gps_tracking
+       WHERE driver_id = ? AND timestamp >= ? AND timestamp < DATE_ADD(?, INTERVAL 1 DAY)
+       ORDER BY timestamp ASC`,
+      [driverId, date, date]
+    );
+    
+    const [tracks] = await connection.execute(
+      `SELECT minute_start, fix_count, min_speed, max_speed, booking_id, path
+       FROM gps_tracks
+       WHERE driver_id = ? AND minute_start >= ? AND minute_start < DATE_ADD(?, INTERVAL 1 DAY)
+       ORDER BY minute_start ASC`,
+      [driverId, date, date]
+    );
+    
+    res.json({ fixes, tracks });
+    await connection.end();
+  } catch (error) {
+    console.error('GPS history error:', error);
+    res.status(500).json({ message: 'Internal server error' });
+  }
+});
+
+// Write-behind queue depth and flush timings
+app.get('/api/gps/write-behind', authenticateToken, (req, res) => {
+  if (!['Company Admin', 'JKM Officer'].includes(req.user.role)) {
+    return res.status(403).json({ message: 'Insufficient permissions' });
+  }
+  res.json({ writeBehind: gpsWriteBehind.stats() });
+});
+
+// Socket server load, for fan-out benchmarks: cumulative CPU microseconds since start
+app.get('/api/socket/stats', authenticateToken, (req, res) => {
+  if (!['Company Admin', 'JKM Officer'].includes(req.user.role)) {
+    return res.status(403).json({ message: 'Insufficient permissions' });
+  }
+  res.json({
+    sockets: io.engine.clientsCount,
+    cpu: process.cpuUsage(),
+    uptimeMs: Math.round(process.uptime() * 1000),
+    gpsUpdates: socketStats.gpsUpdates
+  });
+});
+
 // ===== SOCKET.IO FOR REAL-TIME FEATURES =====
 
+// Sockets may present the login JWT as auth.token. Ones without a valid token still connect,
+// but only an authenticated driver's gps_location fixes are stored
+io.use((socket, next) => {
+  const token = socket.handshake.auth?.token;
+  if (!token) {
+    return next();
+  }
+  jwt.verify(token, JWT_SECRET, (err, user) => {
+    if (!err) {
+      socket.data.user = user;
+    }
+    next();
+  });
+});
+
 io.on('connection', (socket) => {
   console.log('User connected:', socket.id);
   
@@ -845,9 +1515,94 @@ io.on('connection', (socket) => {
     console.log(`User ${userData.id} joined room: ${room}`);
   });
   
-  // Handle real-time GPS updates
-  socket.on('gps_location', (data) => {
-    socket.broadcast.emit('gps_update', data);
+  // Live map subscriptions; each replies through the optional ack with what was joined
+  socket.on('subscribe_tiles', (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    if (!socket.data.user) {
+      return reply({ ok: false, message: 'Authentication required' });
+    }
+    const rooms = tileRoomsFor(data?.bounds);
+    if (!rooms) {
+      return reply({ ok: false, message: `bounds must be a valid viewport of at most ${MAX_TILE_SUBSCRIPTIONS} tiles` });
+    }
+    // A new viewport replaces the old one
+    for (const room of socket.rooms) {
+      if (room.startsWith('tile_') && !rooms.includes(room)) {
+        socket.leave(room);
+      }
+    }
+    socket.join(rooms);
+    reply({ ok: true, zoom: GPS_TILE_ZOOM, tiles: rooms });
+  });
+
+  socket.on('subscribe_driver', async (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    const driverId = parseInt(data?.driverId, 10);
+    try {
+      if (!socket.data.user || !Number.isInteger(driverId) || !(await canTrackDriver(socket.data.user, driverId))) {
+        return reply({ ok: false, message: 'Not allowed to track this driver' });
+      }
+      socket.join(`track_driver_${driverId}`);
+      reply({ ok: true, room: `track_driver_${driverId}` });
+    } catch (error) {
+      console.error('Subscribe driver error:', error);
+      reply({ ok: false, message: 'Internal server error' });
+    }
+  });
+
+  socket.on('subscribe_booking', async (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    const bookingId = parseInt(data?.bookingId, 10);
+    try {
+      if (!socket.data.user || !Number.isInteger(bookingId) || !(await canTrackBooking(socket.data.user, bookingId))) {
+        return reply({ ok: false, message: 'Not allowed to track this booking' });
+      }
+      socket.join(`track_booking_${bookingId}`);
+      reply({ ok: true, room: `track_booking_${bookingId}` });
+    } catch (error) {
+      console.error('Subscribe booking error:', error);
+      reply({ ok: false, message: 'Internal server error' });
+    }
+  });
+
+  // The whole fleet, for the admin map
+  socket.on('subscribe_all', (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    if (!['Company Admin', 'JKM Officer'].includes(socket.data.user?.role)) {
+      return reply({ ok: false, message: 'Insufficient permissions' });
+    }
+    socket.join(GPS_ALL_ROOM);
+    reply({ ok: true, room: GPS_ALL_ROOM });
+  });
+
+  socket.on('unsubscribe', (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    for (const room of socket.rooms) {
+      if (room === GPS_ALL_ROOM || room.startsWith('tile_') || room.startsWith('track_')) {
+        socket.leave(room);
+      }
+    }
+    reply({ ok: true });
+  });
+
+  // Handle real-time GPS updates. A driver's fix is broadcast at once and stored by the
+  // write-behind buffer; the optional ack reports { ok: true } only once it is in gps_tracking
+  socket.on('gps_location', (data, ack) => {
+    const reply = typeof ack === 'function' ? ack : () => {};
+    const user = socket.data.user;
+    if (user?.role !== 'Driver') {
+      return reply({ ok: false, message: 'Only authenticated drivers can store GPS' });
+    }
+
+    const fix = parseFix({ ...data, timestamp: data?.timestamp ?? localWallClock() });
+    if (!fix) {
+      return reply({ ok: false, message: 'Fix needs numeric lat/lng and an optional YYYY-MM-DD HH:MM:SS timestamp' });
+    }
+    fix.driver_id = user.id;
+    if (!gpsWriteBehind.push(fix, () => reply({ ok: true }))) {
+      return reply({ ok: false, message: 'GPS ingest is behind, retry later', retryAfterMs: gpsWriteBehind.retryDelayMs });
+    }
+    broadcastLocation(fix);
   });
   
   socket.on('disconnect', () => {
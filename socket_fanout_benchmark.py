@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Socket.IO Fan-out Benchmark
+Opens many Socket.IO subscribers, triggers gps_update / new_booking /
+booking_update through the REST API and measures end-to-end delivery latency
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+
+import socketio
+
+from backend_test import OKUTransportAPITester, latency_stats
+
+BASE_LAT = 5.3307
+BASE_LNG = 103.1324
+
+class FanoutSubscriber:
+    """One Socket.IO client that joins a room, follows one driver's position and timestamps every delivery"""
+
+    def __init__(self, room_user, token, tracked_driver_id):
+        self.room_user = room_user
+        self.token = token
+        self.tracked_driver_id = tracked_driver_id
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.received = []
+
+        self.client.on('gps_update', self.on_gps_update)
+        self.client.on('new_booking', self.on_new_booking)
+        self.client.on('booking_update', self.on_booking_update)
+
+    async def on_gps_update(self, data):
+        self.received.append((('gps_update', round(float(data.get('lat', 0)), 7)), time.perf_counter()))
+
+    async def on_new_booking(self, data):
+        self.received.append((('new_booking', str(data.get('bookingId'))), time.perf_counter()))
+
+    async def on_booking_update(self, data):
+        self.received.append((('booking_update', str(data.get('bookingId'))), time.perf_counter()))
+
+    async def connect(self, base_url):
+        await self.client.connect(base_url, transports=['websocket'], auth={'token': self.token})
+        reply = await self.client.call('subscribe_driver', {'driverId': self.tracked_driver_id})
+        if not (reply and reply.get('ok')):
+            raise RuntimeError(f"subscribe_driver refused: {reply}")
+        if self.room_user:
+            await self.client.emit('join_room', {'id': self.room_user['id'], 'role': self.room_user['role']})
+
+    async def disconnect(self):
+        if self.client.connected:
+            await self.client.disconnect()
+
+class SocketFanoutBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001"):
+        super().__init__(base_url)
+        self.admin = None
+        self.driver = None
+        self.oku = None
+        self.trigger_seq = 0
+        self.booking_slot = 0
+
+    def setup_fixtures(self):
+        """Provision an admin, an approved driver and an OKU user assigned to it"""
+        print("\n🔧 Provisioning fan-out fixtures...")
+
+        self.admin = self.provision_user("Company Admin", "fanout_admin")
+        if self.admin:
+            self.driver = self.provision_user("Driver", "fanout_driver", admin_token=self.admin['token'])
+            self.oku = self.provision_user("OKU User", "fanout_oku")
+
+        if not (self.admin and self.driver and self.oku):
+            return self.log_test("Fan-out Fixtures", False, "Could not provision admin, driver and OKU user")
+
+        assignment = {
+            "oku_id": self.oku['id'],
+            "driver_id": self.driver['id'],
+            "effective_from": datetime.now().strftime('%Y-%m-%d'),
+            "effective_to": (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d'),
+            "notes": "Fan-out benchmark assignment"
+        }
+        response, _ = self.send_request('POST', 'api/assignments', assignment, token=self.admin['token'])
+        return self.log_test(
+            "Fan-out Fixtures",
+            response is not None and response.status_code == 200,
+            f"Driver {self.driver['id']} assigned to OKU user {self.oku['id']}"
+        )
+
+    def trigger_gps(self):
+        """Post a GPS fix with a unique latitude and return (key, sent_at)"""
+        self.trigger_seq += 1
+        lat = round(BASE_LAT + self.trigger_seq * 1e-6, 7)
+        fix = {"lat": lat, "lng": BASE_LNG, "speed": 30.0, "heading": 90.0, "accuracy": 5.0, "booking_id": None}
+
+        sent_at = time.perf_counter()
+        response, _ = self.send_request('POST', 'api/gps/update', fix, token=self.driver['token'])
+        if response is None or response.status_code != 200:
+            return None
+        return ('gps_update', lat), sent_at
+
+    def trigger_booking(self):
+        """Create a non-overlapping booking and return its new_booking key"""
+        self.booking_slot += 1
+        start = datetime.now() + timedelta(days=2, hours=3 * self.booking_slot)
+        booking = {
+            "driver_id": self.driver['id'],
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Fan-out Pickup",
+            "pickup_lat": BASE_LAT,
+            "pickup_lng": BASE_LNG,
+            "dropoff_location": "Fan-out Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Fan-out benchmark",
+            "special_instructions": ""
+        }
+
+        sent_at = time.perf_counter()
+        response, _ = self.send_request('POST', 'api/bookings', booking, token=self.oku['token'])
+        if response is None or response.status_code != 200:
+            return None
+        return ('new_booking', str(response.json().get('bookingId'))), sent_at
+
+    def trigger_status_update(self, booking_id):
+        """Approve a booking as the driver and return its booking_update key"""
+        sent_at = time.perf_counter()
+        response, _ = self.send_request('PUT', f'api/bookings/{booking_id}/status',
+                                        {"status": "approved"}, token=self.driver['token'])
+        if response is None or response.status_code != 200:
+            return None
+        return ('booking_update', str(booking_id)), sent_at
+
+    async def connect_subscribers(self, count, connect_concurrency):
+        """Connect subscribers split across global, driver room and OKU room listeners"""
+        room_users = [
+            None,
+            {'id': self.driver['id'], 'role': 'Driver'},
+            {'id': self.oku['id'], 'role': 'OKU User'}
+        ]
+        # gps_update is scoped to subscribers, so every client follows the fixture driver as an admin
+        subscribers = [FanoutSubscriber(room_users[i % 3], self.admin['token'], self.driver['id']) for i in range(count)]
+        semaphore = asyncio.Semaphore(connect_concurrency)
+
+        async def connect(subscriber):
+            async with semaphore:
+                try:
+                    await subscriber.connect(self.base_url)
+                    return True
+                except Exception:
+                    return False
+
+        connected = await asyncio.gather(*(connect(s) for s in subscribers))
+        return [s for s, ok in zip(subscribers, connected) if ok]
+
+    async def run_level(self, count, events_per_type, settle_s, connect_concurrency):
+        """Measure delivery latency and throughput for one subscriber count"""
+        print(f"\n📡 {count} subscribers, {events_per_type} events per type")
+        subscribers = await self.connect_subscribers(count, connect_concurrency)
+        # Give join_room emits time to be processed before triggering
+        await asyncio.sleep(1)
+
+        sent = {}
+        window_start = time.perf_counter()
+        for _ in range(events_per_type):
+            for trigger in (self.trigger_gps, self.trigger_booking):
+                result = await asyncio.to_thread(trigger)
+                if result:
+                    sent[result[0]] = result[1]
+                    if result[0][0] == 'new_booking':
+                        update = await asyncio.to_thread(self.trigger_status_update, result[0][1])
+                        if update:
+                            sent[update[0]] = update[1]
+
+        await asyncio.sleep(settle_s)
+        await asyncio.gather(*(s.disconnect() for s in subscribers))
+
+        # Who should receive what: gps_update goes to every driver follower, the rest to room members
+        expected_by_type = {
+            'gps_update': len(subscribers),
+            'new_booking': sum(1 for s in subscribers if s.room_user and s.room_user['role'] == 'Driver'),
+            'booking_update': sum(1 for s in subscribers if s.room_user and s.room_user['role'] == 'OKU User')
+        }
+
+        latencies = {event: [] for event in expected_by_type}
+        last_delivery = window_start
+        for subscriber in subscribers:
+            for key, received_at in subscriber.received:
+                if key in sent:
+                    latencies[key[0]].append(round((received_at - sent[key]) * 1000, 2))
+                    last_delivery = max(last_delivery, received_at)
+
+        delivery_window = last_delivery - window_start
+        level = {'subscribers': len(subscribers), 'requested_subscribers': count, 'events': {}}
+        for event, samples in latencies.items():
+            triggered = sum(1 for key in sent if key[0] == event)
+            expected = triggered * expected_by_type[event]
+            stats = latency_stats(samples)
+            level['events'][event] = {
+                'triggered': triggered,
+                'expected_deliveries': expected,
+                'deliveries': len(samples),
+                'latency': stats
+            }
+            print(f"   {event}: {len(samples)}/{expected} delivered, "
+                  f"p50 {stats.get('p50_ms')}ms, p95 {stats.get('p95_ms')}ms, p99 {stats.get('p99_ms')}ms")
+            self.log_test(f"Fan-out {event} @ {count}", len(samples) == expected,
+                          f"{len(samples)}/{expected} deliveries")
+
+        total = sum(len(samples) for samples in latencies.values())
+        level['messages_per_sec'] = round(total / delivery_window, 2) if delivery_window > 0 else 0
+        print(f"   {level['messages_per_sec']} messages/sec delivered across {len(subscribers)} subscribers")
+        return level
+
+    async def run_benchmark(self, levels, events_per_type, settle_s, connect_concurrency):
+        """Run the fan-out benchmark for each subscriber count"""
+        print("=" * 80)
+        print("📡 OKU TRANSPORT SYSTEM - SOCKET.IO FAN-OUT BENCHMARK")
+        print("=" * 80)
+
+        if not self.setup_fixtures():
+            return None
+
+        results = []
+        for count in levels:
+            results.append(await self.run_level(count, events_per_type, settle_s, connect_concurrency))
+        return {'levels': results, 'results': self.test_results}
+
+def main():
+    """Main fan-out benchmark execution"""
+    parser = argparse.ArgumentParser(description="Socket.IO fan-out latency benchmark")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--subscribers', default="100,500,1000,2000", help="Comma separated subscriber counts")
+    parser.add_argument('--events', type=int, default=20, help="Events triggered per type per level")
+    parser.add_argument('--settle', type=float, default=3, help="Seconds to wait for late deliveries")
+    parser.add_argument('--connect-concurrency', type=int, default=200)
+    args = parser.parse_args()
+
+    benchmark = SocketFanoutBenchmark(args.base_url)
+    levels = [int(count) for count in args.subscribers.split(',')]
+    results = asyncio.run(benchmark.run_benchmark(levels, args.events, args.settle, args.connect_concurrency))
+    benchmark.session.close()
+
+    return 0 if results and benchmark.tests_run == benchmark.tests_passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Socket GPS Write-Behind Harness
+Streams gps_location fixes from many authenticated driver sockets at a high
+rate, then checks gps_tracking holds every acknowledged fix exactly once and
+gps_latest each driver's newest one, reporting emit-to-ack (flush) latency
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import socketio
+
+from backend_test import OKUTransportAPITester, get_db_connection, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+BASE_LAT = 5.3307
+BASE_LNG = 103.1324
+# A fix's sequence number is encoded in its longitude, exact in DECIMAL(11,8)
+SEQ_STEP_DEG = 1e-6
+
+class StreamingDriver:
+    """One driver socket sending sequence-numbered fixes and recording each ack"""
+
+    def __init__(self, driver, index):
+        self.driver = driver
+        self.lat = round(BASE_LAT + index * 1e-4, 7)
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.acked = {}  # seq -> emit-to-ack latency ms
+        self.unacked = set()  # timed out: may or may not have been stored
+        self.busy_retries = 0
+
+    async def connect(self, base_url):
+        await self.client.connect(base_url, transports=['websocket'], auth={'token': self.driver['token']})
+
+    async def send(self, seq, ack_timeout_s):
+        """Emit one fix, resending after the advertised delay while the server pushes back"""
+        fix = {
+            "lat": self.lat,
+            "lng": round(BASE_LNG + seq * SEQ_STEP_DEG, 8),
+            "speed": 30.0,
+            "heading": 90.0,
+            "accuracy": 5.0,
+            "booking_id": None
+        }
+        started = time.perf_counter()
+        while True:
+            try:
+                reply = await self.client.call('gps_location', fix, timeout=ack_timeout_s)
+            except socketio.exceptions.TimeoutError:
+                self.unacked.add(seq)
+                return
+            if reply and reply.get('ok'):
+                self.acked[seq] = round((time.perf_counter() - started) * 1000, 2)
+                return
+            if not reply or 'retryAfterMs' not in reply:
+                self.unacked.add(seq)
+                return
+            self.busy_retries += 1
+            await asyncio.sleep(reply['retryAfterMs'] / 1000)
+
+    async def stream(self, fixes, rate, ack_timeout_s):
+        """Send fixes at rate per second without waiting for earlier acks"""
+        tasks = []
+        started = time.perf_counter()
+        for seq in range(fixes):
+            delay = started + seq / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(seq, ack_timeout_s)))
+        await asyncio.gather(*tasks)
+
+    async def disconnect(self):
+        if self.client.connected:
+            await self.client.disconnect()
+
+class SocketGPSHarness(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001"):
+        super().__init__(base_url)
+        self.admin = None
+        self.streamers = []
+
+    def setup_drivers(self, driver_count):
+        """Provision an admin to read flush stats and approved drivers to stream"""
+        print(f"\n🔧 Provisioning {driver_count} streaming drivers...")
+        self.admin = self.provision_user("Company Admin", "socket_gps_admin")
+        if not self.admin:
+            return self.log_test("Socket GPS Fixtures", False, "Could not provision admin user")
+
+        for index in range(driver_count):
+            driver = self.provision_user("Driver", "socket_gps_driver", admin_token=self.admin['token'])
+            if driver:
+                self.streamers.append(StreamingDriver(driver, index))
+        return self.log_test("Socket GPS Fixtures", len(self.streamers) > 0,
+                             f"{len(self.streamers)}/{driver_count} drivers ready")
+
+    def write_behind_stats(self):
+        response, _ = self.send_request('GET', 'api/gps/write-behind', token=self.admin['token'])
+        if response is None or response.status_code != 200:
+            return None
+        return response.json()['writeBehind']
+
+    async def stream_all(self, fixes, rate, ack_timeout_s):
+        connected = await asyncio.gather(*(s.connect(self.base_url) for s in self.streamers), return_exceptions=True)
+        failed = [error for error in connected if isinstance(error, Exception)]
+        self.log_test("Driver Sockets Connected", not failed,
+                      f"{len(self.streamers) - len(failed)}/{len(self.streamers)} connected")
+        if failed:
+            await asyncio.gather(*(s.disconnect() for s in self.streamers))
+            return None
+
+        started = time.perf_counter()
+        await asyncio.gather(*(s.stream(fixes, rate, ack_timeout_s) for s in self.streamers))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*(s.disconnect() for s in self.streamers))
+        return elapsed
+
+    def stored_fixes(self):
+        """{driver_id: {seq: copies}} for the streamed drivers, plus gps_latest mismatches"""
+        driver_ids = [s.driver['id'] for s in self.streamers]
+        placeholders = ', '.join(['%s'] * len(driver_ids))
+        connection = get_db_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"""SELECT driver_id, lng, COUNT(*) FROM gps_tracking
+                    WHERE driver_id IN ({placeholders}) GROUP BY driver_id, lng""",
+                driver_ids
+            )
+            stored = {driver_id: {} for driver_id in driver_ids}
+            for driver_id, lng, copies in cursor.fetchall():
+                seq = round((float(lng) - BASE_LNG) / SEQ_STEP_DEG)
+                stored[driver_id][seq] = copies
+
+            # gps_latest must be the newest row by (timestamp, id), the batch upsert's rule
+            cursor.execute(
+                f"""SELECT l.driver_id FROM gps_latest l
+                    WHERE l.driver_id IN ({placeholders})
+                      AND l.gps_id = (SELECT g.id FROM gps_tracking g WHERE g.driver_id = l.driver_id
+                                      ORDER BY g.timestamp DESC, g.id DESC LIMIT 1)""",
+                driver_ids
+            )
+            current = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+        finally:
+            connection.close()
+        return stored, [driver_id for driver_id in driver_ids if driver_id not in current]
+
+    def verify(self, fixes):
+        stored, stale_latest = self.stored_fixes()
+        missing = duplicated = unexpected = unacked_stored = 0
+        for streamer in self.streamers:
+            copies = stored[streamer.driver['id']]
+            for seq in range(fixes):
+                count = copies.get(seq, 0)
+                if seq in streamer.acked:
+                    missing += count == 0
+                    duplicated += count > 1
+                elif count:
+                    unacked_stored += 1
+                    duplicated += count > 1
+            unexpected += sum(1 for seq in copies if not 0 <= seq < fixes)
+
+        acked = sum(len(s.acked) for s in self.streamers)
+        unacked = sum(len(s.unacked) for s in self.streamers)
+        self.log_test("Every Fix Acknowledged", unacked == 0,
+                      f"{acked}/{acked + unacked} acknowledged")
+        self.log_test("Acknowledged Fixes Stored Once", missing == 0 and duplicated == 0 and unexpected == 0,
+                      f"{missing} missing, {duplicated} duplicated, {unexpected} unexpected rows")
+        if unacked_stored:
+            print(f"   {unacked_stored} fixes were stored although their ack timed out")
+        self.log_test("gps_latest Holds Newest Fix", not stale_latest,
+                      f"{len(self.streamers) - len(stale_latest)}/{len(self.streamers)} drivers current")
+        return {'acked': acked, 'unacked': unacked, 'missing': missing, 'duplicated': duplicated,
+                'unacked_but_stored': unacked_stored, 'stale_latest': len(stale_latest)}
+
+    def run(self, driver_count, fixes, rate, ack_timeout_s):
+        print("=" * 80)
+        print("🛰️  OKU TRANSPORT SYSTEM - SOCKET GPS WRITE-BEHIND HARNESS")
+        print("=" * 80)
+
+        if not self.setup_drivers(driver_count):
+            return None
+        before = self.write_behind_stats()
+
+        print(f"\n🚀 Streaming {fixes} fixes x {len(self.streamers)} drivers at {rate}/s each")
+        elapsed = asyncio.run(self.stream_all(fixes, rate, ack_timeout_s))
+        if elapsed is None:
+            return None
+        after = self.write_behind_stats()
+
+        latencies = [ms for s in self.streamers for ms in s.acked.values()]
+        stats = latency_stats(latencies)
+        report = {'drivers': len(self.streamers), 'fixes_per_driver': fixes, 'elapsed_s': round(elapsed, 2),
+                  'acked_per_sec': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0,
+                  'busy_retries': sum(s.busy_retries for s in self.streamers), 'ack_latency': stats}
+        print(f"   {len(latencies)} acks in {elapsed:.1f}s ({report['acked_per_sec']}/s), "
+              f"{report['busy_retries']} backpressure retries")
+        print(f"   emit-to-ack (flush) latency: p50 {stats.get('p50_ms')}ms, p95 {stats.get('p95_ms')}ms, "
+              f"p99 {stats.get('p99_ms')}ms, max {stats.get('max_ms')}ms")
+        if before and after:
+            flushes = after['flushes'] - before['flushes']
+            report['server'] = {
+                'flushes': flushes,
+                'rows_per_flush': round((after['stored'] - before['stored']) / flushes, 1) if flushes else None,
+                'failed_flushes': after['failures'] - before['failures'],
+                'rejected': after['rejected'] - before['rejected'],
+                'max_flush_ms': after['maxFlushMs'],
+                'max_queue_wait_ms': after['maxWaitMs']
+            }
+            print(f"   server: {flushes} flushes, {report['server']['rows_per_flush']} rows/flush, "
+                  f"{report['server']['failed_flushes']} failed, {report['server']['rejected']} rejected, "
+                  f"slowest flush {after['maxFlushMs']}ms")
+
+        report['verification'] = self.verify(fixes)
+        return report
+
+def main():
+    """Main harness execution"""
+    parser = argparse.ArgumentParser(description="Verify write-behind persistence of socket GPS fixes")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--drivers', type=int, default=50)
+    parser.add_argument('--fixes', type=int, default=200, help="Fixes per driver")
+    parser.add_argument('--rate', type=float, default=20, help="Fixes per second per driver")
+    parser.add_argument('--ack-timeout', type=float, default=30, help="Seconds to wait for each fix's ack")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    harness = SocketGPSHarness(args.base_url)
+    report = harness.run(args.drivers, args.fixes, args.rate, args.ack_timeout)
+    harness.session.close()
+    export_metrics(harness.metrics, args, 'socket_gps_harness')
+
+    failed = harness.tests_run - harness.tests_passed
+    if report and failed == 0:
+        print("\n🎉 Every socket fix was stored exactly once!")
+        return 0
+    print(f"\n⚠️  {failed} check(s) failed!")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
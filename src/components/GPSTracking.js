@@ -16,8 +16,17 @@ const GPSTracking = ({ bookingId = null, showMap = true }) => {
     // Load recent GPS locations
     loadRecentLocations();
 
-    // Listen for real-time GPS updates
+    // Listen for real-time GPS updates of this booking, or of the signed-in driver
     if (socket) {
+      const subscribe = () => {
+        if (bookingId) {
+          socket.emit('subscribe_booking', { bookingId });
+        } else if (user?.role === 'Driver') {
+          socket.emit('subscribe_driver', { driverId: user.id });
+        }
+      };
+      subscribe();
+      socket.on('connect', subscribe);
       socket.on('gps_update', (data) => {
         setLocations(prev => [data, ...prev.slice(0, 99)]);
         
@@ -28,6 +37,7 @@ const GPSTracking = ({ bookingId = null, showMap = true }) => {
       });
 
       return () => {
+        socket.off('connect', subscribe);
         socket.off('gps_update');
       };
     }
@@ -11,6 +11,7 @@ const LiveMap = () => {
   const [drivers, setDrivers] = useState([]);
   const [isTracking, setIsTracking] = useState(false);
   const [currentLocation, setCurrentLocation] = useState(null);
+  const subscribeViewportRef = useRef(() => {});
 
   useEffect(() => {
     // Load Leaflet CSS and JS
@@ -33,6 +34,8 @@ const LiveMap = () => {
         }).addTo(map);
         
         mapInstanceRef.current = map;
+        map.on('moveend', () => subscribeViewportRef.current());
+        subscribeViewportRef.current();
         
         // Load initial GPS locations
         loadGPSLocations();
@@ -56,18 +59,42 @@ const LiveMap = () => {
     };
   }, []);
 
-  // Listen for real-time GPS updates
+  // Listen for real-time GPS updates from drivers inside the visible map area. The server
+  // refuses viewports spanning too many tiles; zoomed out that far, admins take the whole fleet
   useEffect(() => {
     if (socket) {
+      subscribeViewportRef.current = () => {
+        const map = mapInstanceRef.current;
+        if (!map) return;
+        const bounds = map.getBounds();
+        socket.emit('subscribe_tiles', {
+          bounds: {
+            north: bounds.getNorth(),
+            south: bounds.getSouth(),
+            east: bounds.getEast(),
+            west: bounds.getWest()
+          }
+        }, (reply) => {
+          if (!reply?.ok && ['Company Admin', 'JKM Officer'].includes(user?.role)) {
+            socket.emit('subscribe_all', {});
+          }
+        });
+      };
+      const subscribe = () => subscribeViewportRef.current();
+      subscribe();
+      // Rooms are per connection, so subscribe again after a reconnect
+      socket.on('connect', subscribe);
       socket.on('gps_update', (locationData) => {
         updateDriverMarker(locationData);
       });
 
       return () => {
+        socket.off('connect', subscribe);
         socket.off('gps_update');
+        subscribeViewportRef.current = () => {};
       };
     }
-  }, [socket]);
+  }, [socket, user]);
 
   const loadGPSLocations = async () => {
     try {
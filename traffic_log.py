@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Traffic Log
+Append-only NDJSON capture of request/response pairs (gzip when the path ends
+in .gz) and the reader used by traffic_replay.py to re-issue them
+"""
+
+import base64
+import gzip
+import json
+import threading
+
+REDACTED = "<redacted>"
+SECRET_FIELDS = ('password',)
+
+def token_identity(token):
+    """Describe a bearer token without storing it: {'id', 'role'}, 'invalid', or None"""
+    if not token:
+        return None
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return {'id': claims['id'], 'role': claims['role']}
+    except (IndexError, ValueError, KeyError, TypeError):
+        return 'invalid'
+
+def redact(body):
+    if isinstance(body, dict):
+        return {key: REDACTED if key in SECRET_FIELDS else value for key, value in body.items()}
+    return body
+
+def open_log(path, mode):
+    return gzip.open(path, mode + 't', encoding='utf-8') if path.endswith('.gz') else open(path, mode, encoding='utf-8')
+
+class TrafficRecorder:
+    """Thread-safe appender of one JSON line per request; tokens and passwords never hit disk"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = open_log(path, 'a')
+        self.lock = threading.Lock()
+        self.records = 0
+
+    def record(self, started_at, method, endpoint, body, token, timing):
+        line = json.dumps({
+            't': round(started_at, 6),
+            'method': method,
+            'endpoint': endpoint,
+            'body': redact(body),
+            'auth': token_identity(token),
+            'status': timing['status_code'],
+            'latency_ms': timing['latency_ms']
+        }, separators=(',', ':'), default=str)
+        with self.lock:
+            self.handle.write(line + "\n")
+            self.records += 1
+
+    def close(self):
+        with self.lock:
+            self.handle.close()
+
+def read_traffic(path):
+    """Load a traffic log, ordered by original start time"""
+    with open_log(path, 'r') as handle:
+        records = [json.loads(line) for line in handle if line.strip()]
+    records.sort(key=lambda record: record['t'])
+    return records
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Traffic Replayer
+Re-issues a traffic log captured with --record against a local server.js at
+1x, Nx or as-fast-as-possible speed, preserving the original inter-arrival
+times, and compares replayed latency and status codes with the recording
+"""
+
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend_test import OKUTransportAPITester, endpoint_key, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+from traffic_log import REDACTED, read_traffic
+
+REPLAY_PASSWORD = "password123"
+INVALID_TOKEN = "invalid.jwt.token"
+# Paths whose numeric segment is a user id, so it can follow the identity mapping
+USER_PATH = re.compile(r'^(api/drivers?/)(\d+)(/.*)$')
+USER_FIELDS = ('driver_id', 'oku_id')
+
+class TrafficReplayer(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", concurrency=50):
+        super().__init__(base_url, pool_size=concurrency)
+        self.concurrency = concurrency
+        self.identities = {}  # recorded user id -> local provisioned user
+
+    def map_identities(self, records):
+        """Provision one local user per recorded identity, with the same role"""
+        recorded = {}
+        for record in records:
+            if isinstance(record['auth'], dict):
+                recorded[record['auth']['id']] = record['auth']['role']
+        print(f"\n🔧 Mapping {len(recorded)} recorded identities to local users...")
+
+        admin = self.provision_user("Company Admin", "replay_admin")
+        if not admin:
+            return self.log_test("Replay Identities", False, "Could not provision admin user")
+
+        for user_id, role in recorded.items():
+            user = self.provision_user(role, "replay_user", admin_token=admin['token'])
+            if user:
+                self.identities[user_id] = user
+
+        return self.log_test(
+            "Replay Identities",
+            len(self.identities) == len(recorded),
+            f"{len(self.identities)}/{len(recorded)} identities mapped"
+        )
+
+    def token_for(self, auth):
+        if auth is None:
+            return ''
+        if auth == 'invalid':
+            return INVALID_TOKEN
+        user = self.identities.get(auth['id'])
+        return user['token'] if user else ''
+
+    def local_user_id(self, user_id):
+        user = self.identities.get(int(user_id))
+        return user['id'] if user else user_id
+
+    def prepare(self, record):
+        """Rewrite a recorded request for this server: local user ids and a usable password"""
+        endpoint = record['endpoint']
+        match = USER_PATH.match(endpoint)
+        if match:
+            endpoint = f"{match.group(1)}{self.local_user_id(match.group(2))}{match.group(3)}"
+
+        body = record['body']
+        if isinstance(body, dict):
+            body = dict(body)
+            for field in USER_FIELDS:
+                if isinstance(body.get(field), int):
+                    body[field] = self.local_user_id(body[field])
+            body = {key: REPLAY_PASSWORD if value == REDACTED else value for key, value in body.items()}
+        return record['method'], endpoint, body, self.token_for(record['auth'])
+
+    def replay(self, records, speed):
+        """Dispatch records on the original timeline divided by speed; speed 0 sends back to back"""
+        origin = records[0]['t']
+        results = []
+
+        def send(record, scheduled_at):
+            lag_ms = round((time.perf_counter() - scheduled_at) * 1000, 2)
+            method, endpoint, body, token = self.prepare(record)
+            _, timing = self.send_request(method, endpoint, body, token=token)
+            return record, timing, lag_ms
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            for record in records:
+                offset = (record['t'] - origin) / speed if speed > 0 else 0
+                scheduled_at = started + offset
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(send, record, scheduled_at))
+            results = [future.result() for future in futures]
+        return results, time.perf_counter() - started
+
+    def report(self, records, results, elapsed, speed):
+        """Compare the replay with the recording per endpoint"""
+        recorded_span = records[-1]['t'] - records[0]['t']
+        lags = [lag for _, _, lag in results]
+        matched = sum(1 for record, timing, _ in results if record['status'] == timing['status_code'])
+
+        print("\n" + "=" * 80)
+        print("📊 REPLAY SUMMARY")
+        print("=" * 80)
+        print(f"Requests: {len(records)}, recorded over {recorded_span:.2f}s, replayed in {elapsed:.2f}s "
+              f"({'max speed' if speed <= 0 else f'{speed}x'})")
+        print(f"Status codes matching the recording: {matched}/{len(results)}")
+        lag_stats = latency_stats(lags)
+        print(f"Dispatch lag behind schedule: p50 {lag_stats['p50_ms']}ms, p95 {lag_stats['p95_ms']}ms")
+
+        endpoints = {}
+        for record, timing, _ in results:
+            key = f"{record['method']} /{endpoint_key(record['endpoint'])}"
+            entry = endpoints.setdefault(key, {'recorded': [], 'replayed': [], 'mismatched': 0})
+            entry['recorded'].append(record['latency_ms'])
+            entry['replayed'].append(timing['latency_ms'])
+            entry['mismatched'] += record['status'] != timing['status_code']
+
+        print("\n⏱️  RECORDED vs REPLAYED LATENCY:")
+        comparison = {}
+        for key, entry in sorted(endpoints.items()):
+            recorded, replayed = latency_stats(entry['recorded']), latency_stats(entry['replayed'])
+            comparison[key] = {'recorded': recorded, 'replayed': replayed, 'status_mismatches': entry['mismatched']}
+            print(f"   {key}: {recorded['count']} req, p50 {recorded['p50_ms']} -> {replayed['p50_ms']}ms, "
+                  f"p95 {recorded['p95_ms']} -> {replayed['p95_ms']}ms, {entry['mismatched']} status mismatches")
+
+        return {
+            'requests': len(records),
+            'recorded_span_s': round(recorded_span, 3),
+            'replay_elapsed_s': round(elapsed, 3),
+            'speed': speed,
+            'status_matches': matched,
+            'dispatch_lag': lag_stats,
+            'endpoints': comparison
+        }
+
+def main():
+    """Main traffic replay execution"""
+    parser = argparse.ArgumentParser(description="Replay a recorded traffic log against server.js")
+    parser.add_argument('log', help="Traffic log written with --record")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--speed', type=float, default=1.0, help="Time compression factor; 0 replays as fast as possible")
+    parser.add_argument('--concurrency', type=int, default=50, help="Maximum requests in flight")
+    parser.add_argument('--min-status-match', type=float, default=0.95,
+                        help="Fail when fewer replayed status codes match the recording")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    records = read_traffic(args.log)
+    if not records:
+        print(f"No requests in {args.log}")
+        return 1
+
+    replayer = TrafficReplayer(args.base_url, concurrency=args.concurrency)
+    if not replayer.map_identities(records):
+        return 1
+
+    print(f"\n▶️  Replaying {len(records)} requests at {'max speed' if args.speed <= 0 else f'{args.speed}x'}...")
+    results, elapsed = replayer.replay(records, args.speed)
+    summary = replayer.report(records, results, elapsed, args.speed)
+    replayer.session.close()
+    export_metrics(replayer.metrics, args, 'traffic_replay')
+
+    match_ratio = summary['status_matches'] / summary['requests']
+    replayer.log_test("Replay Status Match", match_ratio >= args.min_status_match,
+                      f"{match_ratio:.1%} of replayed status codes match the recording")
+    return 0 if replayer.tests_run == replayer.tests_passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
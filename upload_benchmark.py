@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Driver Onboarding Upload Benchmark
+Streams generated JPEG/PNG documents through PUT /api/driver/profile from many
+concurrent drivers and reports throughput, latency, client memory and disk writes
+"""
+
+import argparse
+import os
+import random
+import resource
+import struct
+import sys
+import time
+import tracemalloc
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from backend_test import OKUTransportAPITester, latency_stats
+from metrics import add_metrics_arguments, export_metrics
+
+# Document fields accepted by upload.fields() in server.js, with the format generated for each
+UPLOAD_FIELDS = [
+    ('licensePhoto', 'jpeg'),
+    ('vehiclePhoto', 'png'),
+    ('icPhoto', 'jpeg'),
+    ('selfiePhoto', 'png')
+]
+# multer limits.fileSize in server.js
+SERVER_FILE_LIMIT = 5 * 1024 * 1024
+MIN_FILE_SIZE = 1024
+BLOCK_SIZE = 64 * 1024
+
+PROFILE_FIELDS = {
+    "licenseNumber": "D123456789",
+    "vehicleType": "MPV",
+    "vehicleNumber": "ABC1234",
+    "vehicleFeatures": '["wheelchair_accessible", "air_conditioning"]',
+    "experience": "5 years",
+    "languages": "English, Malay",
+    "emergencyContact": "Emergency Contact",
+    "emergencyPhone": "0123456789",
+    "address": "Upload Benchmark Address"
+}
+
+def split_payload(total, overhead, max_payload):
+    """Yield segment payload sizes so that sum(size + overhead) == total exactly"""
+    while total > 0:
+        size = min(max_payload, total - overhead)
+        leftover = total - size - overhead
+        # A tail shorter than one segment header cannot be encoded, so borrow from this segment
+        if 0 < leftover < overhead:
+            size -= overhead
+        yield size
+        total -= size + overhead
+
+class ImagePayload:
+    """A structurally valid JPEG or PNG of an exact byte size, generated chunk by chunk.
+
+    Filler is sliced from one shared random block, so no upload is ever
+    materialised in memory and iterating again restarts from the beginning.
+    """
+
+    JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'
+    JPEG_TRAILER = b'\xff\xd9'
+    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self, kind, size, block):
+        self.kind = kind
+        self.size = size
+        self.block = block
+
+    def __len__(self):
+        return self.size
+
+    def filler(self, size):
+        offset = 0
+        while offset < size:
+            take = min(len(self.block), size - offset)
+            yield self.block[:take]
+            offset += take
+
+    def png_chunk(self, chunk_type, data):
+        crc = zlib.crc32(data, zlib.crc32(chunk_type))
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+    def jpeg_chunks(self):
+        yield self.JPEG_HEADER
+        body = self.size - len(self.JPEG_HEADER) - len(self.JPEG_TRAILER)
+        # Filler travels in COM segments: FF FE + 2 byte length + up to 65533 bytes
+        for size in split_payload(body, 4, 65533):
+            yield b'\xff\xfe' + struct.pack('>H', size + 2)
+            yield from self.filler(size)
+        yield self.JPEG_TRAILER
+
+    def png_chunks(self):
+        # 1x1 8-bit greyscale image, padded with private ancillary okUd chunks
+        header = (self.PNG_SIGNATURE
+                  + self.png_chunk(b'IHDR', struct.pack('>IIBBBBB', 1, 1, 8, 0, 0, 0, 0))
+                  + self.png_chunk(b'IDAT', zlib.compress(b'\x00\x00')))
+        trailer = self.png_chunk(b'IEND', b'')
+        yield header
+        for size in split_payload(self.size - len(header) - len(trailer), 12, BLOCK_SIZE):
+            data = self.block[:size]
+            yield self.png_chunk(b'okUd', data)
+        yield trailer
+
+    def __iter__(self):
+        return self.jpeg_chunks() if self.kind == 'jpeg' else self.png_chunks()
+
+class MultipartUpload:
+    """multipart/form-data body with a precomputed Content-Length, streamed part by part"""
+
+    def __init__(self, fields, files):
+        self.boundary = uuid.uuid4().hex
+        self.parts = []
+        for name, value in fields.items():
+            self.parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            )
+        for name, payload in files:
+            extension = 'jpg' if payload.kind == 'jpeg' else 'png'
+            self.parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                f'filename="{name}.{extension}"\r\nContent-Type: image/{payload.kind}\r\n\r\n'.encode()
+            )
+            self.parts.append(payload)
+            self.parts.append(b'\r\n')
+        self.parts.append(f'--{self.boundary}--\r\n'.encode())
+        self.length = sum(len(part) for part in self.parts)
+
+    @property
+    def content_type(self):
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self):
+        # requests reads this to send Content-Length instead of chunked encoding
+        return self.length
+
+    def __iter__(self):
+        for part in self.parts:
+            if isinstance(part, bytes):
+                yield part
+            else:
+                yield from part
+
+def directory_usage(path):
+    """Return (files, bytes) currently stored under path"""
+    files = total = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                files += 1
+                total += entry.stat().st_size
+    return files, total
+
+def peak_rss_mb():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+class UploadBenchmark(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", file_size=4 * 1024 * 1024,
+                 uploads_dir=None, timeout=60, seed=42, pool_size=10):
+        super().__init__(base_url, pool_size=pool_size)
+        self.file_size = file_size
+        self.uploads_dir = uploads_dir
+        self.timeout = timeout
+        self.block = random.Random(seed).randbytes(BLOCK_SIZE)
+        self.drivers = []
+
+    def setup_drivers(self, driver_count):
+        """Provision approved drivers to onboard concurrently"""
+        print(f"\n🔧 Provisioning {driver_count} drivers...")
+
+        admin = self.provision_user("Company Admin", "upload_admin")
+        if not admin:
+            return self.log_test("Upload Fixtures", False, "Could not provision admin user")
+
+        for _ in range(driver_count):
+            driver = self.provision_user("Driver", "upload_driver", admin_token=admin['token'])
+            if driver:
+                self.drivers.append(driver)
+
+        return self.log_test(
+            "Upload Fixtures",
+            len(self.drivers) == driver_count,
+            f"{len(self.drivers)}/{driver_count} drivers ready"
+        )
+
+    def build_upload(self):
+        files = [(name, ImagePayload(kind, self.file_size, self.block)) for name, kind in UPLOAD_FIELDS]
+        return MultipartUpload(PROFILE_FIELDS, files)
+
+    def send_upload(self, driver):
+        """Stream one onboarding upload and return its timing, shaped like send_request()"""
+        upload = self.build_upload()
+        headers = {'Authorization': f"Bearer {driver['token']}", 'Content-Type': upload.content_type}
+
+        start = time.perf_counter()
+        try:
+            response = self.session.put(f"{self.base_url}/api/driver/profile", data=upload,
+                                        headers=headers, timeout=self.timeout)
+            status_code = response.status_code
+            error = None if status_code == 200 else response.text[:200]
+        except requests.exceptions.RequestException as e:
+            status_code = None
+            error = str(e)
+
+        timing = {
+            'method': 'PUT',
+            'endpoint': 'api/driver/profile',
+            'status_code': status_code,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'error': error,
+            'bytes': len(upload)
+        }
+        self.metrics.record_timing(timing)
+        return timing
+
+    def run_stage(self, concurrency, rounds):
+        """Run `rounds` onboardings on each of `concurrency` drivers at once"""
+        drivers = self.drivers[:concurrency]
+        disk_before = directory_usage(self.uploads_dir) if self.uploads_dir else None
+        rss_before = peak_rss_mb()
+        tracemalloc.start()
+
+        stage_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            timings = list(executor.map(self.send_upload, drivers * rounds))
+        elapsed = time.perf_counter() - stage_start
+
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        succeeded = [t for t in timings if t['status_code'] == 200]
+        sent_bytes = sum(t['bytes'] for t in succeeded)
+        stage = {
+            'concurrency': concurrency,
+            'uploads': len(timings),
+            'errors': len(timings) - len(succeeded),
+            'elapsed_s': round(elapsed, 3),
+            'upload_mb_per_s': round(sent_bytes / elapsed / 1024 / 1024, 2) if elapsed > 0 else 0,
+            'onboardings_per_s': round(len(succeeded) / elapsed, 2) if elapsed > 0 else 0,
+            'latency': latency_stats([t['latency_ms'] for t in succeeded]),
+            'client_traced_peak_mb': round(traced_peak / 1024 / 1024, 2),
+            'client_rss_growth_mb': round(peak_rss_mb() - rss_before, 2),
+            'sample_errors': sorted({t['error'] for t in timings if t['error']})[:3]
+        }
+
+        if disk_before:
+            files_after, bytes_after = directory_usage(self.uploads_dir)
+            stage['disk_files_written'] = files_after - disk_before[0]
+            stage['disk_mb_written'] = round((bytes_after - disk_before[1]) / 1024 / 1024, 2)
+            stage['disk_mb_per_s'] = round(stage['disk_mb_written'] / elapsed, 2) if elapsed > 0 else 0
+        return stage
+
+    def run_ramp(self, levels, rounds, max_p95_ms):
+        """Ramp concurrent onboardings until uploads fail or p95 exceeds max_p95_ms"""
+        print("=" * 80)
+        print("📤 OKU TRANSPORT SYSTEM - DRIVER ONBOARDING UPLOAD BENCHMARK")
+        print("=" * 80)
+        print(f"{len(UPLOAD_FIELDS)} files x {self.file_size / 1024 / 1024:.2f}MB per onboarding")
+
+        stages = []
+        ceiling = None
+        for concurrency in levels:
+            print(f"\n🚀 Stage: {concurrency} concurrent onboardings x {rounds} rounds")
+            stage = self.run_stage(concurrency, rounds)
+            stages.append(stage)
+
+            stats = stage['latency']
+            print(f"   {stage['upload_mb_per_s']}MB/s up, {stage['onboardings_per_s']} onboardings/s, "
+                  f"p50 {stats.get('p50_ms')}ms, p95 {stats.get('p95_ms')}ms, errors {stage['errors']}")
+            print(f"   client traced peak {stage['client_traced_peak_mb']}MB, "
+                  f"RSS growth {stage['client_rss_growth_mb']}MB")
+            if 'disk_mb_per_s' in stage:
+                print(f"   disk: {stage['disk_files_written']} files, {stage['disk_mb_written']}MB "
+                      f"({stage['disk_mb_per_s']}MB/s)")
+            for error in stage['sample_errors']:
+                print(f"   error: {error}")
+
+            expected_files = stage['uploads'] * len(UPLOAD_FIELDS)
+            disk_ok = 'disk_files_written' not in stage or stage['disk_files_written'] >= expected_files
+            sustained = (stage['errors'] == 0 and disk_ok
+                         and stats.get('p95_ms') is not None and stats['p95_ms'] <= max_p95_ms)
+            self.log_test(f"Onboarding x{concurrency}", sustained,
+                          f"{stage['errors']} errors, p95 {stats.get('p95_ms')}ms (limit {max_p95_ms}ms)")
+            if not sustained:
+                break
+            ceiling = concurrency
+
+        print("\n📊 UPLOAD SUMMARY")
+        print(f"Highest sustained concurrent onboardings: {ceiling if ceiling else 'none'}")
+        return {'stages': stages, 'sustained_concurrency': ceiling, 'results': self.test_results}
+
+def main():
+    """Main upload benchmark execution"""
+    parser = argparse.ArgumentParser(description="Streaming driver onboarding upload benchmark")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--file-size-kb', type=int, default=4096, help="Size of each of the four documents")
+    parser.add_argument('--levels', default="1,5,10,20,40", help="Comma separated concurrent onboardings")
+    parser.add_argument('--rounds', type=int, default=2, help="Onboardings per driver per stage")
+    parser.add_argument('--max-p95-ms', type=float, default=10000)
+    parser.add_argument('--uploads-dir', help="Server uploads/ directory, when on this host, for disk stats")
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=42)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    file_size = args.file_size_kb * 1024
+    if not MIN_FILE_SIZE <= file_size <= SERVER_FILE_LIMIT:
+        parser.error(f"--file-size-kb must be between {MIN_FILE_SIZE // 1024} and {SERVER_FILE_LIMIT // 1024}")
+
+    levels = [int(level) for level in args.levels.split(',')]
+    benchmark = UploadBenchmark(args.base_url, file_size, args.uploads_dir, args.timeout, args.seed,
+                               pool_size=max(levels))
+    if not benchmark.setup_drivers(max(levels)):
+        return 1
+
+    results = benchmark.run_ramp(levels, args.rounds, args.max_p95_ms)
+    benchmark.session.close()
+    export_metrics(benchmark.metrics, args, 'upload_benchmark')
+
+    return 0 if results['sustained_concurrency'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+OKU Transport System - Day-in-the-Life Workload Replayer
+Replays a compressed 24-hour traffic profile from a JSON config: virtual OKU
+users, drivers, admins and JKM officers arrive per the hourly curve, run
+think-time paced sessions (drivers also stream GPS) and are held to per-role SLOs
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from backend_test import OKUTransportAPITester, get_db_connection
+from gps_load_test import VirtualDriver
+from metrics import LatencyHistogram, add_metrics_arguments, export_metrics
+
+DEFAULT_PROFILE = "workload_profile.json"
+DEFAULT_GPS_INTERVAL_S = 10
+ROLES = ['OKU User', 'Driver', 'Company Admin', 'JKM Officer']
+# Simulated hours with fewer requests than this are reported but not judged against the SLO
+MIN_HOURLY_SAMPLES = 20
+
+def load_profile(path):
+    """Read and sanity-check a workload profile"""
+    with open(path) as handle:
+        profile = json.load(handle)
+    if len(profile['hourly_load']) != 24:
+        raise ValueError("hourly_load must have 24 entries")
+    unknown = set(profile['roles']) - set(ROLES)
+    if unknown:
+        raise ValueError(f"Unknown roles {sorted(unknown)}; userType must be one of {ROLES}")
+    total = sum(role['ratio'] for role in profile['roles'].values())
+    if abs(total - 1.0) > 0.01:
+        raise ValueError(f"Role ratios sum to {total:.2f}, expected 1.0")
+    return profile
+
+def read_gps_interval():
+    """gps_update_interval from system_settings, or the schema default if the DB is unreachable"""
+    try:
+        connection = get_db_connection()
+    except mysql.connector.Error:
+        return DEFAULT_GPS_INTERVAL_S
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT setting_value FROM system_settings WHERE setting_key = 'gps_update_interval'")
+        row = cursor.fetchone()
+        cursor.close()
+        return float(row[0]) if row else DEFAULT_GPS_INTERVAL_S
+    finally:
+        connection.close()
+
+class RoleStats:
+    """Latency histograms and error counts for one role, overall and per simulated hour"""
+
+    def __init__(self):
+        self.overall = LatencyHistogram()
+        self.hourly = {}
+        self.requests = {}
+        self.errors = {}
+        self.actions = {}
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def record(self, hour, action, timing, ok):
+        with self.lock:
+            self.overall.record(timing['latency_ms'])
+            if hour not in self.hourly:
+                self.hourly[hour] = LatencyHistogram()
+            self.hourly[hour].record(timing['latency_ms'])
+            self.requests[hour] = self.requests.get(hour, 0) + 1
+            if not ok:
+                self.errors[hour] = self.errors.get(hour, 0) + 1
+            self.actions[action] = self.actions.get(action, 0) + 1
+
+    def error_rate(self, hour=None):
+        if hour is None:
+            requests, errors = sum(self.requests.values()), sum(self.errors.values())
+        else:
+            requests, errors = self.requests.get(hour, 0), self.errors.get(hour, 0)
+        return errors / requests if requests else 0.0
+
+class WorkloadReplayer(OKUTransportAPITester):
+    def __init__(self, base_url="http://localhost:8001", profile=None, seed=42):
+        super().__init__(base_url, pool_size=max(10, profile['peak_users']))
+        self.profile = profile
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.accounts = {role: [] for role in ROLES}
+        self.assigned_driver = {}  # OKU user id -> driver id
+        self.stats = {role: RoleStats() for role in ROLES}
+        self.active = {role: 0 for role in ROLES}
+        self.active_lock = threading.Lock()
+        self.gps_interval_s = profile.get('gps_update_interval_s') or read_gps_interval()
+        self.started = None
+        self.deadline = None
+
+    def setup_accounts(self):
+        """Provision enough accounts per role for the peak hour, plus pending drivers to approve"""
+        print("\n🔧 Provisioning role account pools...")
+
+        admin = self.provision_user("Company Admin", "day_admin")
+        if not admin:
+            return self.log_test("Workload Fixtures", False, "Could not provision admin user")
+        self.accounts['Company Admin'].append(admin)
+
+        wanted = {role: math.ceil(self.profile['peak_users'] * config['ratio'])
+                  for role, config in self.profile['roles'].items()}
+        wanted['Company Admin'] = max(0, wanted.get('Company Admin', 0) - 1)
+        jobs = [role for role, count in wanted.items() for _ in range(count)]
+
+        def provision(role):
+            prefix = "day_" + role.lower().replace(' ', '_')
+            return role, self.provision_user(role, prefix, admin_token=admin['token'])
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            for role, account in executor.map(provision, jobs):
+                if account:
+                    self.accounts[role].append(account)
+            # Registered but never approved, so admins have a queue to work through
+            pending = list(executor.map(lambda _: self.send_request('POST', 'api/register', {
+                "name": "Pending Driver",
+                "email": f"day_pending_{self.rng.getrandbits(48):012x}@example.com",
+                "phone": "0123456789",
+                "password": "password123",
+                "userType": "Driver"
+            })[0], range(self.profile.get('pending_drivers', 0))))
+
+        drivers = self.accounts['Driver']
+        for index, oku in enumerate(self.accounts['OKU User']):
+            if not drivers:
+                break
+            driver = drivers[index % len(drivers)]
+            assignment = {
+                "oku_id": oku['id'],
+                "driver_id": driver['id'],
+                "effective_from": datetime.now().strftime('%Y-%m-%d'),
+                "effective_to": (datetime.now() + timedelta(days=60)).strftime('%Y-%m-%d'),
+                "notes": "Workload replay assignment"
+            }
+            response, _ = self.send_request('POST', 'api/assignments', assignment, token=admin['token'])
+            if response is not None and response.status_code == 200:
+                self.assigned_driver[oku['id']] = driver['id']
+
+        ready = all(len(self.accounts[role]) >= count for role, count in wanted.items())
+        registered = sum(1 for response in pending if response is not None and response.status_code == 200)
+        return self.log_test(
+            "Workload Fixtures",
+            ready,
+            ", ".join(f"{role}: {len(self.accounts[role])}" for role in ROLES)
+            + f", pending drivers: {registered}"
+        )
+
+    def call(self, account, method, endpoint, data=None, ok_statuses=(200,)):
+        """Send as a virtual user; every action_* returns a list of (timing, ok) pairs"""
+        response, timing = self.send_request(method, endpoint, data, token=account['token'])
+        ok = response is not None and response.status_code in ok_statuses
+        return response, [(timing, ok)]
+
+    def action_list_bookings(self, account, rng):
+        return self.call(account, 'GET', 'api/bookings?limit=50')[1]
+
+    def action_list_assignments(self, account, rng):
+        return self.call(account, 'GET', 'api/assignments')[1]
+
+    def action_view_profile(self, account, rng):
+        return self.call(account, 'GET', 'api/profile')[1]
+
+    def action_latest_gps(self, account, rng):
+        return self.call(account, 'GET', 'api/gps/latest')[1]
+
+    def action_profile_status(self, account, rng):
+        return self.call(account, 'GET', 'api/driver/profile/status')[1]
+
+    def action_list_users(self, account, rng):
+        return self.call(account, 'GET', 'api/users?limit=100')[1]
+
+    def action_list_pending_drivers(self, account, rng):
+        return self.call(account, 'GET', 'api/users?type=driver&status=pending&limit=20')[1]
+
+    def action_driver_schedule(self, account, rng):
+        driver_id = account['id'] if account['userType'] == 'Driver' else self.assigned_driver.get(account['id'])
+        if driver_id is None:
+            return []
+        date = (datetime.now() + timedelta(days=rng.randint(0, 6))).strftime('%Y-%m-%d')
+        return self.call(account, 'GET', f"api/driver/{driver_id}/schedule?date={date}")[1]
+
+    def action_create_booking(self, account, rng):
+        driver_id = self.assigned_driver.get(account['id'])
+        if driver_id is None:
+            return []
+        start = (datetime.now() + timedelta(days=rng.randint(1, 30))).replace(
+            hour=rng.randint(7, 19), minute=rng.choice((0, 30)), second=0, microsecond=0)
+        booking = {
+            "driver_id": driver_id,
+            "booking_type": "daily",
+            "start_datetime": start.strftime('%Y-%m-%d %H:%M:%S'),
+            "end_datetime": (start + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S'),
+            "pickup_location": "Workload Pickup",
+            "pickup_lat": 5.3307,
+            "pickup_lng": 103.1324,
+            "dropoff_location": "Workload Dropoff",
+            "dropoff_lat": 5.3408,
+            "dropoff_lng": 103.1425,
+            "purpose": "Day-in-the-life replay",
+            "special_instructions": ""
+        }
+        # 409 is the correct answer when the driver is already booked in that slot
+        return self.call(account, 'POST', 'api/bookings', booking, ok_statuses=(200, 409))[1]
+
+    def action_accept_booking(self, account, rng):
+        response, results = self.call(account, 'GET', 'api/bookings?limit=20')
+        if response is None or response.status_code != 200:
+            return results
+        pending = [b for b in response.json().get('bookings', []) if b.get('status') == 'pending']
+        if pending:
+            booking = rng.choice(pending)
+            results += self.call(account, 'PUT', f"api/bookings/{booking['id']}/status", {"status": "approved"})[1]
+        return results
+
+    def action_approve_driver(self, account, rng):
+        response, results = self.call(account, 'GET', 'api/users?type=driver&status=pending&limit=20')
+        if response is None or response.status_code != 200:
+            return results
+        pending = response.json().get('users', [])
+        if pending:
+            driver = rng.choice(pending)
+            results += self.call(account, 'PUT', f"api/drivers/{driver['id']}/status", {"status": "approved"})[1]
+        return results
+
+    def simulated_hour(self):
+        hour_s = self.profile['day_seconds'] / 24
+        return min(23, int((time.perf_counter() - self.started) / hour_s))
+
+    def record(self, role, action, results):
+        hour = self.simulated_hour()
+        for timing, ok in results:
+            self.stats[role].record(hour, action, timing, ok)
+
+    def run_session(self, role, account, rng):
+        """One virtual user session: weighted actions separated by think time, plus GPS for drivers"""
+        config = self.profile['roles'][role]
+        compression = 86400 / self.profile['day_seconds']
+        length_s = rng.uniform(*config['session_minutes']) * 60 / compression
+        session_end = min(time.perf_counter() + length_s, self.deadline)
+
+        names = list(config['actions'])
+        weights = [config['actions'][name] for name in names]
+        virtual = VirtualDriver(account, rng) if config.get('gps') else None
+        session_start = time.perf_counter()
+        next_action = session_start
+        next_gps = session_start if virtual else None
+
+        try:
+            while True:
+                now = time.perf_counter()
+                if now >= session_end:
+                    break
+                if next_gps is not None and now >= next_gps:
+                    fix = virtual.fix_at(now - session_start)
+                    self.record(role, 'gps_update', self.call(account, 'POST', 'api/gps/update', fix)[1])
+                    next_gps += self.gps_interval_s
+                if now >= next_action:
+                    action = rng.choices(names, weights)[0]
+                    self.record(role, action, getattr(self, f"action_{action}")(account, rng))
+                    next_action = time.perf_counter() + rng.uniform(*config['think_time_s'])
+
+                wake = min(t for t in (next_action, next_gps, session_end) if t is not None)
+                time.sleep(max(0, wake - time.perf_counter()))
+        finally:
+            with self.active_lock:
+                self.active[role] -= 1
+
+    def replay(self, tick_s=0.5):
+        """Follow the hourly curve, topping up each role's concurrent sessions every tick"""
+        print("=" * 80)
+        print("🌅 OKU TRANSPORT SYSTEM - DAY-IN-THE-LIFE WORKLOAD REPLAY")
+        print("=" * 80)
+        print(f"24h compressed into {self.profile['day_seconds']}s, peak {self.profile['peak_users']} users, "
+              f"GPS every {self.gps_interval_s}s")
+
+        self.started = time.perf_counter()
+        self.deadline = self.started + self.profile['day_seconds']
+        threads = []
+        session_number = 0
+        last_hour = -1
+
+        while time.perf_counter() < self.deadline:
+            hour = self.simulated_hour()
+            target = self.profile['peak_users'] * self.profile['hourly_load'][hour]
+            for role, config in self.profile['roles'].items():
+                if not self.accounts[role]:
+                    continue
+                with self.active_lock:
+                    missing = round(target * config['ratio']) - self.active[role]
+                    self.active[role] += max(0, missing)
+                for _ in range(missing):
+                    session_number += 1
+                    rng = random.Random(f"{self.seed}-{session_number}")
+                    account = rng.choice(self.accounts[role])
+                    thread = threading.Thread(target=self.run_session, args=(role, account, rng), daemon=True)
+                    thread.start()
+                    threads.append(thread)
+                    self.stats[role].sessions += 1
+
+            if hour != last_hour:
+                with self.active_lock:
+                    active = dict(self.active)
+                print(f"   {hour:02d}:00  target {target:.0f} users, active "
+                      + ", ".join(f"{role} {count}" for role, count in active.items()))
+                last_hour = hour
+            time.sleep(tick_s)
+
+        for thread in threads:
+            thread.join()
+
+    def report(self):
+        """Print per-role SLO compliance, overall and for the worst simulated hour"""
+        print("\n" + "=" * 80)
+        print("📊 PER-ROLE SLO COMPLIANCE")
+        print("=" * 80)
+
+        elapsed = time.perf_counter() - self.started
+        roles = {}
+        for role, stats in self.stats.items():
+            if not stats.overall.count:
+                continue
+            slo = self.profile['roles'][role]['slo']
+            summary = stats.overall.summary()
+            error_rate = stats.error_rate()
+
+            hourly = {}
+            for hour in sorted(stats.hourly):
+                hourly[hour] = {'p95_ms': stats.hourly[hour].percentile(95),
+                                'requests': stats.requests[hour],
+                                'error_rate': round(stats.error_rate(hour), 4)}
+            breaching = [hour for hour, data in hourly.items()
+                         if data['requests'] >= MIN_HOURLY_SAMPLES
+                         and (data['p95_ms'] > slo['p95_ms'] or data['error_rate'] > slo['error_rate'])]
+
+            roles[role] = {
+                'sessions': stats.sessions,
+                'requests': summary['count'],
+                'requests_per_sec': round(summary['count'] / elapsed, 2),
+                'latency': summary,
+                'error_rate': round(error_rate, 4),
+                'slo': slo,
+                'hourly': hourly,
+                'breaching_hours': breaching,
+                'actions': stats.actions
+            }
+
+            print(f"\n👤 {role}: {stats.sessions} sessions, {summary['count']} requests "
+                  f"({roles[role]['requests_per_sec']}/s)")
+            print(f"   p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms (SLO {slo['p95_ms']}ms), "
+                  f"p99 {summary['p99_ms']}ms, errors {error_rate:.2%} (SLO {slo['error_rate']:.2%})")
+            print("   hourly p95: " + " ".join(f"{hour:02d}h={data['p95_ms']}" for hour, data in hourly.items()))
+            self.log_test(
+                f"SLO {role}",
+                summary['p95_ms'] <= slo['p95_ms'] and error_rate <= slo['error_rate'] and not breaching,
+                f"p95 {summary['p95_ms']}ms, errors {error_rate:.2%}, "
+                f"{len(breaching)} simulated hour(s) out of SLO {breaching if breaching else ''}".rstrip()
+            )
+        return {'elapsed_s': round(elapsed, 2), 'roles': roles, 'results': self.test_results}
+
+def main():
+    """Main workload replay execution"""
+    parser = argparse.ArgumentParser(description="Day-in-the-life workload replayer with role mixes")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, help="Workload profile JSON")
+    parser.add_argument('--day-seconds', type=float, help="Override the profile's compressed day length")
+    parser.add_argument('--peak-users', type=int, help="Override the profile's peak concurrent users")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the per-role report to this JSON file")
+    parser.add_argument('--record', help="Append the replayed day's traffic to this traffic log")
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    if args.day_seconds:
+        profile['day_seconds'] = args.day_seconds
+    if args.peak_users:
+        profile['peak_users'] = args.peak_users
+
+    replayer = WorkloadReplayer(args.base_url, profile, args.seed)
+    if not replayer.setup_accounts():
+        return 1
+
+    # Fixture provisioning is left out of the recording; only the day itself is captured
+    if args.record:
+        replayer.enable_recording(args.record)
+    replayer.replay()
+    results = replayer.report()
+    replayer.session.close()
+    if replayer.recorder:
+        replayer.recorder.close()
+    export_metrics(replayer.metrics, args, 'workload_replay')
+
+    if args.output:
+        results = dict(results, profile=profile)
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    if replayer.tests_run == replayer.tests_passed:
+        print("\n🎉 Every role met its SLO!")
+        return 0
+    else:
+        print(f"\n⚠️  {replayer.tests_run - replayer.tests_passed} check(s) failed!")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())